@@ -0,0 +1,81 @@
+"""
+Time taken to convert an aggregate to JSON ready and database ready values.
+
+    python benchmarks/converters.py [item count]
+
+Prints the microseconds per call of make_jsonify_ready on the data of an aggregate and of DBAdapter.make_db_ready on
+the aggregate, an aggregate holding a value object, money, a list attribute and item count child entities. Run it
+on two revisions to compare them.
+"""
+import os
+import sys
+import timeit
+from _pydecimal import Decimal
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from flaskd3.common.money import Money  # noqa: E402
+from flaskd3.common.utils.json_utils import make_jsonify_ready  # noqa: E402
+from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter  # noqa: E402
+from flaskd3.types.base_entity import BaseEntity  # noqa: E402
+from flaskd3.types.base_enum import BaseEnum  # noqa: E402
+from flaskd3.types.type_info import TypeInfo, ValueObjectField  # noqa: E402
+from flaskd3.types.value_object import ValueObject  # noqa: E402
+
+
+class BenchStatus(BaseEnum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class BenchSize(ValueObject):
+    width = ValueObjectField(int)
+    height = ValueObjectField(int, required=False, default=0)
+
+
+class BenchItem(BaseEntity):
+    item_id = TypeInfo(str, primary_key=True)
+    quantity = TypeInfo(int)
+    price = TypeInfo(Money)
+
+
+class BenchOrder(BaseEntity):
+    order_id = TypeInfo(str, primary_key=True)
+    name = TypeInfo(str)
+    status = TypeInfo(BenchStatus)
+    size = TypeInfo(BenchSize, required=False)
+    created = TypeInfo(datetime, required=False)
+    tags = TypeInfo(str, many=True, unique=True)
+    items = TypeInfo(BenchItem, many=True)
+
+
+def build(item_count):
+    return BenchOrder(
+        order_id="O-1",
+        name="order",
+        status=BenchStatus.OPEN,
+        size=BenchSize(width=1, height=2),
+        created=datetime(2020, 1, 1),
+        tags=["red", "blue"],
+        items=[
+            BenchItem(item_id="O1-%d" % item, quantity=item, price=Money(Decimal("12.50"), "INR"))
+            for item in range(1, item_count + 1)
+        ],
+    )
+
+
+def microseconds_per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(item_count):
+    aggregate = build(item_count)
+    data = aggregate.data()
+    number = max(1, 100000 // (item_count + 1))
+    print("make_jsonify_ready: %.1f us" % microseconds_per_call(lambda: make_jsonify_ready(data), number))
+    print("make_db_ready:      %.1f us" % microseconds_per_call(lambda: DBAdapter.make_db_ready(aggregate), number))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
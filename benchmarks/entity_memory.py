@@ -0,0 +1,141 @@
+"""
+Memory taken by entities, built directly and hydrated from the database.
+
+    python benchmarks/entity_memory.py [count]
+
+Prints the bytes retained per aggregate, an aggregate holding a value object, a list attribute and three child
+entities. Run it on two revisions to compare them.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from flask import Flask  # noqa: E402
+
+from flaskd3.infrastructure.database.sqlalchemy.orm_base import DeleteMixin, ListTyeDataInfo, VersionMixin  # noqa: E402
+from flaskd3.infrastructure.database.sqlalchemy.sql_base_aggregate_repository import (  # noqa: E402
+    SQLABaseAggregateRepository,
+)
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db  # noqa: E402
+from flaskd3.types.base_entity import BaseEntity  # noqa: E402
+from flaskd3.types.base_enum import BaseEnum  # noqa: E402
+from flaskd3.types.type_info import TypeInfo, ValueObjectField  # noqa: E402
+from flaskd3.types.value_object import ValueObject  # noqa: E402
+
+
+class BenchStatus(BaseEnum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class BenchSize(ValueObject):
+    width = ValueObjectField(int)
+    height = ValueObjectField(int, required=False, default=0)
+
+
+class BenchTagModel(db.Model):
+    __tablename__ = "bench_tag"
+    order_id = db.Column(db.String(64), primary_key=True)
+    tag = db.Column(db.String(64), primary_key=True)
+
+
+class BenchOrderModel(db.Model, DeleteMixin, VersionMixin):
+    __tablename__ = "bench_order"
+    order_id = db.Column(db.String(64), primary_key=True)
+    name = db.Column(db.String(64))
+    status = db.Column(db.String(64))
+    size = db.Column(db.JSON)
+    created = db.Column(db.DateTime)
+    list_type_attribute_info = {"tags": ListTyeDataInfo(BenchTagModel, "tag")}
+
+
+class BenchItemModel(db.Model, DeleteMixin, VersionMixin):
+    __tablename__ = "bench_item"
+    order_id = db.Column(db.String(64), primary_key=True)
+    item_id = db.Column(db.String(64), primary_key=True)
+    quantity = db.Column(db.Integer)
+
+
+class BenchItem(BaseEntity):
+    item_id = TypeInfo(str, primary_key=True)
+    quantity = TypeInfo(int)
+
+
+class BenchOrder(BaseEntity):
+    order_id = TypeInfo(str, primary_key=True)
+    name = TypeInfo(str)
+    status = TypeInfo(BenchStatus)
+    size = TypeInfo(BenchSize, required=False)
+    created = TypeInfo(datetime, required=False)
+    tags = TypeInfo(str, many=True, unique=True)
+    items = TypeInfo(BenchItem, many=True)
+
+
+class _DBService(object):
+    def get_db(self):
+        return db
+
+
+class _RepoProvider(object):
+    def get_db_service(self, db_type):
+        return _DBService()
+
+
+class BenchOrderRepository(SQLABaseAggregateRepository):
+    name = "bench_order_repository"
+    aggregate_class = BenchOrder
+    entity_map = {BenchOrder.__name__: BenchOrderModel, BenchItem.__name__: BenchItemModel}
+
+
+def build(count):
+    return [
+        BenchOrder(
+            order_id="O-%d" % index,
+            name="order",
+            status=BenchStatus.OPEN,
+            size=BenchSize(width=index, height=2),
+            created=datetime(2020, 1, 1),
+            tags=["tag"],
+            items=[BenchItem(item_id="O%d-%d" % (index, item), quantity=item) for item in range(1, 4)],
+        )
+        for index in range(count)
+    ]
+
+
+def retained_per_item(make):
+    gc.collect()
+    tracemalloc.start()
+    objs = make()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return retained / len(objs)
+
+
+def main(count):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        repository = BenchOrderRepository(_RepoProvider())
+        repository.save_all(build(count))
+        db.session.commit()
+        db.session.expunge_all()
+        print("constructed: %.0f bytes per aggregate" % retained_per_item(lambda: build(count)))
+
+        def hydrate():
+            aggregates = repository.load_all()
+            db.session.expunge_all()
+            return aggregates
+
+        print("hydrated:    %.0f bytes per aggregate" % retained_per_item(hydrate))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -1,32 +1,132 @@
-from flask import jsonify
+import re
+
+from flask import current_app, jsonify
 from flask.helpers import make_response
 
-from flaskd3.common.utils.json_utils import make_jsonify_ready
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    DefaultJSONProvider = None
+
+from flaskd3.appcore.core.schema_manager import SchemaManager
+from flaskd3.types.schema_serializer import SchemaSerializer
+from flaskd3.common.utils.json_utils import json_ready_converter, make_jsonify_ready
+
+
+def _orjson_default(obj):
+    converted = json_ready_converter.convert(obj)
+    if converted is obj:
+        raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+    return converted
+
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _escape_non_ascii(match):
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+
+def orjson_dumps(obj, sort_keys=True, ensure_ascii=True):
+    """
+    Encodes obj the way compact jsonify output is encoded, with a trailing new line and non ASCII characters escaped
+    when ensure_ascii is set. Values orjson does not encode itself, dates and times included, are converted like
+    make_jsonify_ready converts them. Floats in exponent notation are written in orjson's shortest form.
+    :param obj:
+    :param sort_keys:
+    :param ensure_ascii:
+    :return: bytes
+    :raise TypeError: when orjson cannot encode obj, for example for keys which are not strings
+    """
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    body = orjson.dumps(obj, default=_orjson_default, option=option)
+    if ensure_ascii and not body.isascii():
+        # Non ASCII characters are only found within strings, where escaping them is what json.dumps does.
+        body = _NON_ASCII.sub(_escape_non_ascii, body.decode("utf-8")).encode("ascii")
+    return body
+
+
+def _jsonify_settings(app):
+    """
+    :return: ensure_ascii and sort_keys as jsonify reads them for app, None when jsonify indents its output or the
+    app encodes JSON with a provider of its own
+    """
+    config = app.config
+    provider = getattr(app, "json", None)
+    if provider is not None and DefaultJSONProvider is not None and type(provider) is not DefaultJSONProvider:
+        return None
+    pretty = config.get("JSONIFY_PRETTYPRINT_REGULAR")
+    if pretty is None:
+        compact = getattr(provider, "compact", None)
+        pretty = compact is False or (compact is None and app.debug)
+    elif provider is None:
+        # Before flask 2.2 jsonify indents in debug mode whatever the setting.
+        pretty = pretty or app.debug
+    if pretty:
+        return None
+    ensure_ascii = config.get("JSON_AS_ASCII")
+    if ensure_ascii is None:
+        ensure_ascii = getattr(provider, "ensure_ascii", True)
+    sort_keys = config.get("JSON_SORT_KEYS")
+    if sort_keys is None:
+        sort_keys = getattr(provider, "sort_keys", True)
+    return dict(ensure_ascii=ensure_ascii, sort_keys=sort_keys)
 
 
 class ApiResponseBuilder(object):
+    # Encodes response bodies to bytes, None renders them with flask's jsonify.
+    json_dumps = orjson_dumps if orjson is not None else None
+
+    @classmethod
+    def render(cls, response, status_code):
+        """
+        :param response: JSON ready response body, values which are not are converted like make_jsonify_ready
+        converts them
+        :param status_code:
+        :return: flask response, rendered with jsonify when json_dumps is not set or cannot encode response, and when
+        the app's JSON settings are not ones json_dumps encodes with
+        """
+        json_dumps = cls.json_dumps
+        settings = _jsonify_settings(current_app) if json_dumps is not None else None
+        if settings is not None:
+            try:
+                body = json_dumps(response, **settings)
+            except TypeError:
+                body = None
+            if body is not None:
+                return current_app.response_class(body, status=status_code, mimetype="application/json")
+        return make_response(jsonify(make_jsonify_ready(response)), status_code)
+
     @staticmethod
     def build_success_response_from_aggregate(aggregate, schema):
-        data = schema(unknown="EXCLUDE").dump(aggregate.data())
-        response = make_jsonify_ready(
-            dict(
-                data=data,
-                errors=list(),
-                meta=dict(),
-                resourceVersion=aggregate.get_latest_version(),
-            )
+        response = dict(
+            data=SchemaSerializer.for_schema(schema).dump(aggregate.data()),
+            errors=list(),
+            meta=None,
+            resourceVersion=aggregate.get_latest_version(),
         )
-        return make_response(jsonify(response), 200)
+        return ApiResponseBuilder.render(response, 200)
 
     @staticmethod
     def build_success_response_from_aggregates(aggregates, schema, meta=None):
-        data = []
-
-        for aggregate in aggregates:
-            data.append(schema(unknown="EXCLUDE").dump(aggregate.data()))
+        data = SchemaSerializer.for_schema(schema).dump_many([aggregate.data() for aggregate in aggregates])
 
         if not meta:
             meta = dict()
+        elif meta.is_keyset:
+            meta = meta.to_dict()
+            meta["count"] = len(data)
         else:
             data_len = len(data)
             meta = dict(
@@ -35,27 +135,28 @@ class ApiResponseBuilder(object):
                 end=meta.start + data_len,
                 count=data_len,
             )
-        response = make_jsonify_ready(dict(data=data, errors=list(), meta=meta))
-        return make_response(jsonify(response), 200)
+        response = dict(data=data, errors=list(), meta=json_ready_converter.convert(meta))
+        return ApiResponseBuilder.render(response, 200)
 
     @staticmethod
     def build_success_response_from_data(data_obj, schema=None, version=None, many=False, meta=None):
         if data_obj:
+            serializer = SchemaSerializer.for_schema(schema)
             data_dict = dict(
-                data=schema(unknown="EXCLUDE").dump(data_obj, many=many),
+                data=serializer.dump_many(data_obj) if many else serializer.dump(data_obj),
                 errors=list(),
-                meta=meta.to_dict() if meta else dict(),
+                meta=json_ready_converter.convert(meta.to_dict()) if meta else None,
             )
         else:
             data_dict = dict()
         if version:
-            data_dict["resourceVersion"] = version
-        response = make_jsonify_ready(data_dict)
-        return make_response(jsonify(response), 200)
+            data_dict["resourceVersion"] = json_ready_converter.convert(version)
+        response = data_dict or None
+        return ApiResponseBuilder.render(response, 200)
 
     @staticmethod
     def build_raw(data, schema):
-        data = schema(unknown="EXCLUDE").dump(data)
+        data = SchemaManager.get_or_create_schema_obj(schema).dump(data)
         return make_response(jsonify(data), 200)
 
     @staticmethod
@@ -69,6 +170,4 @@ class ApiResponseBuilder(object):
         response = dict(data=data, errors=errors, meta=meta)
         if resource_version:
             response["resource_version"] = resource_version
-        response = make_jsonify_ready(response)
-        response = make_response(jsonify(response), status_code)
-        return response
+        return ApiResponseBuilder.render(make_jsonify_ready(response), status_code)
@@ -4,7 +4,12 @@ from functools import wraps
 from authlib.specs.rfc6749 import UnauthorizedClientError
 
 from flaskd3.appcore.core.application_core import app_core
-from flaskd3.appcore.core.request_context import get_organisation_id, set_current_user
+from flaskd3.appcore.core.request_context import (
+    clear_aggregate_identity_map,
+    get_organisation_id,
+    init_aggregate_identity_map,
+    set_current_user,
+)
 from flaskd3.common.exceptions import (
     AuthenticationException,
     AuthorizationException,
@@ -30,8 +35,10 @@ def handle_db_commits(func):
         """
         db_service_provider = app_core.get_infra_service("db_service_provider")
         domain_event_service = app_core.get_infra_service("domain_event_service")
+        started_identity_map = False
         try:
             db_service_provider.init_transaction()
+            started_identity_map = init_aggregate_identity_map()
             r_val = func(*args, **kwargs)
             domain_event_service.commit_all()
             db_service_provider.commit()
@@ -39,20 +46,28 @@ def handle_db_commits(func):
         except Exception as e:
             db_service_provider.rollback()
             raise e
+        finally:
+            if started_identity_map:
+                clear_aggregate_identity_map()
 
     return wrapper
 
 
 def call_with_db_commit(func, *args, **kwargs):
     db_service_provider = app_core.get_infra_service("db_service_provider")
+    started_identity_map = False
     try:
         db_service_provider.init_transaction()
+        started_identity_map = init_aggregate_identity_map()
         r_val = func(*args, **kwargs)
         db_service_provider.commit()
         return r_val
     except Exception as e:
         db_service_provider.rollback()
         raise e
+    finally:
+        if started_identity_map:
+            clear_aggregate_identity_map()
 
 
 def authenticate(get_user=False, allow_anonymous=False):
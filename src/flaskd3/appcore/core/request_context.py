@@ -1,6 +1,6 @@
 import os
 
-from flask import g
+from flask import g, has_app_context
 
 from flaskd3.common.constants import ApplicationEnv, SUPER_ORG_ID
 
@@ -32,6 +32,29 @@ def set_tenant_id(tenant_id):
     g.tenant_id = tenant_id
 
 
+def init_aggregate_identity_map():
+    """
+    Starts the map of aggregates loaded in the current unit of work, a map already started is kept
+    :return: True when this call started the map, only then is it cleared by the caller
+    """
+    if not has_app_context() or g.get("aggregate_identity_map") is not None:
+        return False
+    g.aggregate_identity_map = dict()
+    return True
+
+
+def get_aggregate_identity_map():
+    """Aggregates loaded in the current unit of work, None outside of one"""
+    if not has_app_context():
+        return None
+    return g.get("aggregate_identity_map")
+
+
+def clear_aggregate_identity_map():
+    if has_app_context():
+        g.pop("aggregate_identity_map", None)
+
+
 def get_currency():
     return g.get("functional_currency")
 
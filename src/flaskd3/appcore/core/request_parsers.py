@@ -113,10 +113,10 @@ def parse_data_and_version(schema: Schema, request_types: RequestTypes, has_vers
             meta = (
                 data.get("meta")
                 if not request_type in [RequestTypes.ARGS, RequestTypes.FORM]
-                else dict(start=data["data"].get("start"), limit=data["data"].get("limit"), functionalCurrency=data["data"].get("functionalCurrency"))
+                else dict(start=data["data"].get("start"), limit=data["data"].get("limit"), cursor=data["data"].get("cursor"), functionalCurrency=data["data"].get("functionalCurrency"))
             )
             if meta and has_meta:
-                kwargs["meta"] = Meta(start=meta.get("start"), limit=meta.get("limit"))
+                kwargs["meta"] = Meta(start=meta.get("start"), limit=meta.get("limit"), cursor=meta.get("cursor"))
             if meta:
                 functional_currency = meta.get("functionalCurrency")
                 if functional_currency:
@@ -1,4 +1,5 @@
 import inspect
+import threading
 
 import marshmallow
 
@@ -16,6 +17,8 @@ class SchemaInfo:
 class SchemaManager:
 
     schema_map = dict()
+    schema_obj_by_class = dict()
+    _lock = threading.Lock()
 
     @classmethod
     def load_all_schemas(cls, serializers_modules):
@@ -28,6 +31,7 @@ class SchemaManager:
                         name = class_obj.get_name() if hasattr(class_obj, 'get_name') else class_obj.__name__
                         cls.schema_map[name] = SchemaInfo(name=name, class_obj=class_obj,
                                                           obj_instance=class_obj(unknown="EXCLUDE"))
+                        cls.schema_obj_by_class[cls._schema_key(class_obj)] = cls.schema_map[name].obj_instance
                         marshmallow_modules_found.add(name)
 
     @classmethod
@@ -50,3 +54,29 @@ class SchemaManager:
         if not schema_info:
             return None
         return schema_info.obj_instance
+
+    @staticmethod
+    def _schema_key(schema_class, many=False, only=None, exclude=()):
+        return schema_class, bool(many), None if only is None else frozenset(only), frozenset(exclude)
+
+    @classmethod
+    def get_or_create_schema_obj(cls, schema_class, many=False, only=None, exclude=()):
+        """
+        Shared instance of schema_class built with many, only and exclude. Schemas which were not loaded with
+        load_all_schemas get theirs the first time they are asked for, instead of one per call, as building a schema
+        copies all its declared fields. Each combination of the arguments has an instance of its own.
+        :param schema_class:
+        :param many:
+        :param only: names of the only fields to dump, None for all of them
+        :param exclude: names of the fields left out
+        :return:
+        """
+        key = cls._schema_key(schema_class, many, only, exclude)
+        schema_obj = cls.schema_obj_by_class.get(key)
+        if schema_obj is None:
+            with cls._lock:
+                schema_obj = cls.schema_obj_by_class.get(key)
+                if schema_obj is None:
+                    schema_obj = schema_class(many=many, only=only, exclude=exclude, unknown=marshmallow.EXCLUDE)
+                    cls.schema_obj_by_class[key] = schema_obj
+        return schema_obj
@@ -3,14 +3,31 @@ class Meta(object):
     limit = 20
     end = None
     count = None
+    cursor = None
+    next_cursor = None
 
-    def __init__(self, start: int = None, limit: int = None, end: int = None):
+    def __init__(self, start: int = None, limit: int = None, end: int = None, cursor: str = None, keyset: bool = False):
+        """
+        :param start:
+        :param limit:
+        :param end:
+        :param cursor: opaque cursor returned as next cursor of the previous page, pages by keyset instead of offset
+        :param keyset: page by keyset from the first page on
+        """
         if start:
             self.start = int(start)
         if limit:
             self.limit = int(limit)
         if end:
             self.end = int(end)
+        if cursor is not None or keyset:
+            self.cursor = cursor or ""
+
+    @property
+    def is_keyset(self):
+        return self.cursor is not None
 
     def to_dict(self):
+        if self.is_keyset:
+            return dict(limit=self.limit, count=self.count, cursor=self.cursor or None, nextCursor=self.next_cursor)
         return dict(start=self.start, limit=self.limit, end=self.end, count=self.count)
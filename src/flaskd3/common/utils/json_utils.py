@@ -2,6 +2,7 @@ import datetime
 from _pydecimal import Decimal as pyDecimal
 from decimal import Decimal
 from enum import Enum
+from functools import lru_cache
 
 from flaskd3.types.base_dto import BaseDto
 from flaskd3.types.base_entity import BaseEntity
@@ -11,41 +12,117 @@ from flaskd3.types.mutable_value_object import MutableValueObject
 from flaskd3.types.value_object import ValueObject
 from flaskd3.common.money import Money
 from flaskd3.common.utils import dateutils
+from flaskd3.common.utils.common_utils import to_camel_case
 
 
-def make_jsonify_ready(obj):
-    if isinstance(obj, (list, set)):
-        response_list = list()
-        for item in obj:
-            response_list.append(make_jsonify_ready(item))
-        return response_list
-    if isinstance(obj, dict):
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=4096)
+def _camel_case_key(key):
+    return to_camel_case(key)
+
+
+class TypeDispatchConverter(object):
+    """
+    Converts values by looking up a converter for their exact type in a table. A type missing from the table is
+    resolved once against the registered base types, in the order they were registered, and added to it. Values of
+    types matching none of them are returned as they are.
+    """
+
+    def __init__(self):
+        self._converters = {plain_type: self._keep for plain_type in _PLAIN_TYPES}
+        self._base_converters = list()
+
+    @staticmethod
+    def _keep(obj):
+        return obj
+
+    def register(self, base_type, converter):
+        """
+        :param base_type: type or tuple of types, subclasses of them are converted the same way
+        :param converter: function called with the value and returning the converted value
+        :return:
+        """
+        self._base_converters.append((base_type, converter))
+        self._converters = {plain_type: self._keep for plain_type in _PLAIN_TYPES}
+
+    def _resolve(self, obj_type):
+        converter = self._keep
+        for base_type, base_converter in self._base_converters:
+            if issubclass(obj_type, base_type):
+                converter = base_converter
+                break
+        self._converters[obj_type] = converter
+        return converter
+
+    def convert(self, obj):
+        converter = self._converters.get(type(obj))
+        if converter is None:
+            converter = self._resolve(type(obj))
+        return converter(obj)
+
+    def _convert_list(self, obj):
+        convert = self.convert
+        return [item if type(item) in _PLAIN_TYPES else convert(item) for item in obj]
+
+
+class JsonReadyConverter(TypeDispatchConverter):
+    """
+    Converts entities, value objects, collections and the other domain types to JSON ready primitives in one pass.
+    Empty dicts are converted to None, decimals of _pydecimal to floats and the others to strings. With
+    camel_case_keys the keys of every dict are converted to camel case on the way, instead of walking the result again.
+    """
+
+    def __init__(self, camel_case_keys=False):
+        super(JsonReadyConverter, self).__init__()
+        self.camel_case_keys = camel_case_keys
+        convert_data = self._convert_data
+        self.register((list, set), self._convert_list)
+        self.register(dict, self._convert_dict)
+        self.register(pyDecimal, float)
+        self.register(Decimal, str)
+        self.register(Enum, self._convert_enum)
+        self.register((ValueObject, MutableValueObject, BaseEntity), convert_data)
+        self.register(IterBase, self._convert_iter)
+        self.register((datetime.datetime, datetime.time), dateutils.to_string)
+        self.register(datetime.date, dateutils.date_to_string)
+        self.register((Money, BaseDto, MapObject), convert_data)
+
+    @staticmethod
+    def _convert_enum(obj):
+        return obj.value
+
+    def _convert_data(self, obj):
+        return self.convert(obj.data())
+
+    def _convert_iter(self, obj):
+        return self._convert_list(obj.list())
+
+    def _convert_dict(self, obj):
         if not obj:
             return None
-        response_dict = dict()
-        for key, val in obj.items():
-            response_dict[key] = make_jsonify_ready(val)
-        return response_dict
-    if isinstance(obj, pyDecimal):
-        return float(obj)
-    if isinstance(obj, Decimal):
-        return str(obj)
-    if isinstance(obj, Enum):
-        return obj.value
-    if isinstance(obj, (ValueObject, MutableValueObject)):
-        return make_jsonify_ready(obj.data())
-    if isinstance(obj, BaseEntity):
-        return make_jsonify_ready(obj.data())
-    if isinstance(obj, IterBase):
-        return make_jsonify_ready(obj.list())
-    if isinstance(obj, (datetime.datetime, datetime.time)):
-        return dateutils.to_string(obj)
-    if isinstance(obj, datetime.date):
-        return dateutils.date_to_string(obj)
-    if isinstance(obj, Money):
-        return make_jsonify_ready(obj.data())
-    if isinstance(obj, BaseDto):
-        return make_jsonify_ready(obj.data())
-    if isinstance(obj, MapObject):
-        return make_jsonify_ready(obj.data())
-    return obj
+        convert = self.convert
+        if self.camel_case_keys:
+            return {
+                _camel_case_key(key) if type(key) is str else key: val if type(val) in _PLAIN_TYPES else convert(val)
+                for key, val in obj.items()
+            }
+        return {key: val if type(val) in _PLAIN_TYPES else convert(val) for key, val in obj.items()}
+
+
+json_ready_converter = JsonReadyConverter()
+camel_case_json_ready_converter = JsonReadyConverter(camel_case_keys=True)
+
+
+def make_camel_case_jsonify_ready(obj):
+    """
+    same as convert_key_to_camel_case(make_jsonify_ready(obj)) done in a single pass
+    :param obj:
+    :return:
+    """
+    return camel_case_json_ready_converter.convert(obj)
+
+
+def make_jsonify_ready(obj):
+    return json_ready_converter.convert(obj)
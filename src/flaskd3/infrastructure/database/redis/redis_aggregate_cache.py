@@ -0,0 +1,185 @@
+import json
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PENDING_INVALIDATIONS = "aggregate_cache_invalidations"
+PENDING_ENTRIES = "aggregate_cache_entries"
+SESSION_WRITES = "aggregate_cache_session_writes"
+
+# Writes an entry unless the one stored is of a later version, so a reader which loaded an aggregate before it was
+# written can't replace the entry of the written aggregate.
+_SET_IF_NOT_OUTDATED = """
+local stored = redis.call("GET", KEYS[1])
+if stored and cjson.decode(stored)["version"] > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+return 1
+"""
+
+
+class RedisAggregateCache(object):
+    """
+    Read through cache of serialized aggregates in redis, keyed by aggregate class, tenant and primary id. Every entry
+    carries the version of the aggregate it was built from, an entry is never replaced by one of an earlier version.
+
+    Entries of written aggregates are replaced, once the transaction that wrote them commits, by a marker holding the
+    written version: older versions still read by other transactions can't be cached again, and the next load caches
+    the written one. Until then the transaction which wrote them reads them from the database. Aggregates loaded in a
+    transaction which wrote to the database are only cached once it commits. Redis failures are logged and served as
+    misses.
+    """
+
+    def __init__(self, redis_store, namespace, ttl=3600):
+        self.redis_store = redis_store
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        _listen_to_sessions()
+
+    @property
+    def store(self):
+        return self.redis_store.session
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses)
+
+    def key(self, tenant_id, aggregate_id):
+        return "aggregate:{}:{}:{}".format(self.namespace, tenant_id or "", aggregate_id)
+
+    def get_many(self, keys):
+        """
+        :param keys:
+        :return: dict of the cached entries (version and data) by key, keys which are not cached are left out
+        """
+        if not keys:
+            return dict()
+        try:
+            values = self.store.mget(keys)
+        except Exception:
+            logger.exception("Unable to read aggregates from redis cache %s", self.namespace)
+            values = [None] * len(keys)
+        entries = dict()
+        for key, value in zip(keys, values):
+            entry = json.loads(value) if value is not None else None
+            if entry is None or entry.get("data") is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            entries[key] = entry
+        return entries
+
+    def get_loaded(self, session, keys):
+        """
+        :param session:
+        :param keys:
+        :return: dict of the cached entries by key, as get_many, leaving out the aggregates written by the transaction
+        of session
+        """
+        pending = session.info.get(PENDING_INVALIDATIONS)
+        written = pending.get(self) if pending else None
+        if written:
+            keys = [key for key in keys if key not in written]
+        return self.get_many(keys)
+
+    def set(self, key, version, data):
+        """
+        caches data of the aggregate of key at version, unless a later version is cached
+        """
+        self._write(key, version, dict(version=version, data=data))
+
+    def set_loaded(self, session, key, version, data):
+        """
+        caches data of an aggregate loaded through session. Rows read by a transaction which wrote to the database
+        may never be committed, they are cached once the transaction commits and dropped if it rolls back.
+        :param session:
+        :param key:
+        :param version:
+        :param data:
+        :return:
+        """
+        if session.info.get(SESSION_WRITES) or session.info.get(PENDING_INVALIDATIONS):
+            pending = session.info.setdefault(PENDING_ENTRIES, dict())
+            pending.setdefault(self, dict())[key] = (version, data)
+        else:
+            self.set(key, version, data)
+
+    def invalidate(self, versions):
+        """
+        :param versions: dict of the version from which an aggregate may be cached again, by key
+        """
+        for key, version in versions.items():
+            self._write(key, version, dict(version=version))
+
+    def invalidate_after_commit(self, session, versions):
+        """
+        invalidates the entries of versions once the transaction of session commits, they are kept when it rolls back
+        :param session:
+        :param versions: dict of the version from which an aggregate may be cached again, by key
+        :return:
+        """
+        pending = session.info.setdefault(PENDING_INVALIDATIONS, dict()).setdefault(self, dict())
+        for key, version in versions.items():
+            pending[key] = max(version, pending.get(key, version))
+
+    def _write(self, key, version, entry):
+        try:
+            self.store.eval(_SET_IF_NOT_OUTDATED, 1, key, version, json.dumps(entry), self.ttl)
+        except Exception:
+            logger.exception("Unable to write aggregate %s to redis cache", key)
+
+
+def _discard_pending(session):
+    session.info.pop(SESSION_WRITES, None)
+    session.info.pop(PENDING_ENTRIES, None)
+    return session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+def _record_flush(session, flush_context):
+    session.info[SESSION_WRITES] = True
+
+
+def _record_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[SESSION_WRITES] = True
+
+
+def _invalidate_committed(session):
+    entries = session.info.get(PENDING_ENTRIES)
+    pending = _discard_pending(session)
+    if pending:
+        for cache, versions in pending.items():
+            cache.invalidate(versions)
+    if entries:
+        for cache, cache_entries in entries.items():
+            for key, (version, data) in cache_entries.items():
+                cache.set(key, version, data)
+
+
+def _discard_ended(session, transaction):
+    # Whatever is left when the outermost transaction ends was rolled back or closed without a commit.
+    if transaction.parent is None:
+        _discard_pending(session)
+
+
+_SESSION_LISTENERS = (
+    ("after_flush", _record_flush),
+    ("do_orm_execute", _record_statement),
+    ("after_commit", _invalidate_committed),
+    ("after_transaction_end", _discard_ended),
+)
+
+
+def _listen_to_sessions():
+    """
+    Tracks the writes and commits of all sessions once a cache is built. Any transaction may write before it first
+    loads through a cache, so sessions can't start being tracked at that load. Processes without a cache never are.
+    """
+    for identifier, listener in _SESSION_LISTENERS:
+        if not event.contains(Session, identifier, listener):
+            event.listen(Session, identifier, listener)
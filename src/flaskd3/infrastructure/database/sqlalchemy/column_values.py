@@ -0,0 +1,38 @@
+import datetime
+from decimal import Decimal
+from enum import Enum
+
+from flaskd3.common.utils import dateutils
+
+
+def dump_column_value(value):
+    """
+    JSON ready form of a column value, turned back into the column value by load_column_value
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def load_column_value(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime.datetime:
+        return dateutils.isoformat_str_to_datetime(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    if python_type is datetime.time:
+        return datetime.time.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    if issubclass(python_type, Enum):
+        return python_type(value)
+    return value
@@ -1,14 +1,16 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+from functools import partial
 from datetime import datetime
 from enum import Enum
 
 from _pydecimal import Decimal
+from sqlalchemy import inspect
 
 from flaskd3.appcore.core.request_context import get_tenant_id
 from flaskd3.types.base_dto import BaseDto
 from flaskd3.types.base_entity import BaseEntity
 from flaskd3.types.base_enum import BaseEnum
-from flaskd3.types.entity_set_object import EntitySetObject
+from flaskd3.types.entity_set_object import EntitySetObject, LazyEntitySetObject
 from flaskd3.types.list_object import ListObject
 from flaskd3.types.map_object import MapObject
 from flaskd3.types.mutable_value_object import MutableValueObject
@@ -19,7 +21,183 @@ from flaskd3.common.errors import CommonError
 from flaskd3.common.exceptions import AggregateNotFound, InvalidStateException
 from flaskd3.common.money import Money
 from flaskd3.common.utils import dateutils
-from flaskd3.common.utils.json_utils import make_jsonify_ready
+from flaskd3.common.utils.json_utils import TypeDispatchConverter, json_ready_converter
+from flaskd3.infrastructure.database.sqlalchemy.column_values import dump_column_value, load_column_value
+from flaskd3.infrastructure.database.sqlalchemy.keyset_pagination import KeysetOrder
+
+
+def _identity(obj):
+    return obj
+
+
+class EntityHydrator(object):
+    """
+    Converts models of one model class into entities of one entity class. The attribute to column mapping and the
+    per column converters are worked out once when the hydrator is built.
+    """
+
+    def __init__(self, db_adapter, entity_class, model_class, exclude_list):
+        self.db_adapter = db_adapter
+        self.entity_class = entity_class
+        self.entity_meta = entity_class.get_entity_meta()
+        exclude_keys = set(exclude_list) if exclude_list else set()
+        list_type_attribute_info = getattr(model_class, "list_type_attribute_info", dict())
+        self.list_attributes = list(list_type_attribute_info.keys())
+        column_keys = [column_attr.key for column_attr in inspect(model_class).column_attrs]
+        self.column_attributes = list()
+        self.entity_attributes = list()
+        self.one_of_attributes = list()
+        for attribute_name, attribute_meta in self.entity_meta.attribute_metas.items():
+            if attribute_name in list_type_attribute_info:
+                continue
+            column_key = attribute_name if attribute_name not in exclude_keys else None
+            if attribute_meta.is_one_of:
+                self.one_of_attributes.append((attribute_name, column_key))
+            elif attribute_meta.is_entity:
+                self.entity_attributes.append(
+                    (attribute_name, attribute_meta.type_info.class_obj, attribute_meta.many)
+                )
+            else:
+                self.column_attributes.append(
+                    (attribute_name, column_key, db_adapter.get_converter(attribute_meta.type_info))
+                )
+        skipped_keys = exclude_keys.union(self.entity_meta.attribute_metas.keys(), list_type_attribute_info.keys())
+        skipped_keys.update(("created_at", "modified_at"))
+        self.extra_keys = [column_key for column_key in column_keys if column_key not in skipped_keys]
+
+    def hydrate(self, model, query_list, models_map, is_shallow, lazy_batch=None, loaded_attributes=None):
+        model_dict = model.__dict__
+        attr = dict()
+        for attribute_name in self.list_attributes:
+            if loaded_attributes is None or attribute_name in loaded_attributes:
+                attr[attribute_name] = self.db_adapter._get_list_data(
+                    self.entity_class, attribute_name, query_list, models_map
+                )
+        for attribute_name, column_key, converter in self.column_attributes:
+            if loaded_attributes is None or attribute_name in loaded_attributes:
+                attr[attribute_name] = converter(model_dict.get(column_key) if column_key else None)
+        for attribute_name, entity_class, many in self.entity_attributes:
+            if lazy_batch is not None:
+                if many:
+                    attr[attribute_name] = LazyEntitySetObject(
+                        entity_class,
+                        partial(lazy_batch.get_entities, entity_class, query_list.copy()),
+                        self.entity_meta.attribute_metas[attribute_name].type_info.more_attr,
+                    )
+                    continue
+                lazy_batch.load(entity_class)
+            attr[attribute_name] = self.db_adapter.to_entities(
+                entity_class=entity_class,
+                query_list=query_list,
+                model_map=models_map,
+                many=many,
+            )
+        if self.one_of_attributes:
+            _, attribute_metas = self.entity_meta.resolve(model_dict)
+            for attribute_name, column_key in self.one_of_attributes:
+                if loaded_attributes is not None and attribute_name not in loaded_attributes:
+                    continue
+                class_obj = attribute_metas[attribute_name].type_info.class_obj
+                if lazy_batch is not None and issubclass(class_obj, BaseEntity):
+                    lazy_batch.load(class_obj)
+                attr[attribute_name] = self.db_adapter._get_object(
+                    attribute_metas[attribute_name].type_info,
+                    query_list,
+                    models_map,
+                    model_dict.get(column_key) if column_key else None,
+                )
+        for column_key in self.extra_keys:
+            if column_key in model_dict:
+                attr[column_key] = model_dict[column_key]
+        entity = self.entity_class.from_store(attr, is_shallow, loaded_attributes)
+        entity.reset_version_lock()
+        entity.mark_persisted()
+        return entity
+
+
+class LazyChildBatch(object):
+    """
+    Child rows of the aggregates loaded together. The rows of a child entity class, and of all the entities below it,
+    are fetched for all the aggregates at once the first time one of the aggregates needs them.
+    """
+
+    def __init__(self, db_adapter, aggregate_class, query_tuple, models_map):
+        self.db_adapter = db_adapter
+        self.aggregate_class = aggregate_class
+        self.query_tuple = query_tuple
+        self.models_map = models_map
+        self.loaded_classes = set()
+
+    def load(self, entity_class):
+        if entity_class in self.loaded_classes:
+            return
+        self.loaded_classes.add(entity_class)
+        key_list = [self.aggregate_class.get_primary_key()]
+        self.db_adapter._update_model_map(self.models_map, entity_class, self.query_tuple, key_list)
+        self.db_adapter._update_list_data_map(
+            self.models_map, entity_class, self.query_tuple, key_list + [entity_class.get_primary_key()]
+        )
+        self.db_adapter._load_all_models(entity_class, self.models_map, self.query_tuple, key_list)
+
+    def get_entities(self, entity_class, query_list):
+        self.load(entity_class)
+        return self.db_adapter.to_entities(entity_class, query_list, self.models_map, many=True)
+
+
+class DBChanges(object):
+    """
+    Statements needed to persist the changes of an entity tree.
+
+    inserts: new models to be added
+    updates: (model_class, primary data, changed column values, expected version) of rows to be updated
+    merges: models to be merged as a whole
+    list_deletes: (ListTyeDataInfo, parent keys, entries) of list type attribute rows to be deleted
+    list_inserts: models of list type attribute entries to be added
+
+    The expected version is None for rows written unconditionally, otherwise the row is written only if it still has
+    that version.
+    """
+
+    def __init__(self):
+        self.inserts = list()
+        self.updates = list()
+        self.merges = list()
+        self.list_deletes = list()
+        self.list_inserts = list()
+
+
+class DBReadyConverter(TypeDispatchConverter):
+    """
+    Converts values of entities to the values stored in the columns of their models. Entities, child entity sets,
+    maps and dtos keep their structure, value objects, dicts and the other collections are stored JSON ready.
+    """
+
+    def __init__(self):
+        super(DBReadyConverter, self).__init__()
+        self.register((list, set), self._convert_list)
+        self.register(dict, self._convert_dict)
+        self.register(Decimal, float)
+        self.register(Enum, self._convert_enum)
+        self.register(BaseEntity, lambda obj: self._convert_dict(obj.dict()))
+        self.register((ValueObject, MutableValueObject), lambda obj: json_ready_converter.convert(obj.dict()))
+        self.register(EntitySetObject, lambda obj: self._convert_list(obj.list()))
+        self.register((ListObject, SetObject), lambda obj: json_ready_converter.convert(obj.list()))
+        self.register(BaseDto, lambda obj: self.convert(obj.data()))
+        self.register(Money, lambda obj: self.convert(obj.to_dict()))
+        self.register(MapObject, lambda obj: self.convert(obj.dict()))
+
+    @staticmethod
+    def _convert_enum(obj):
+        return obj.value
+
+    @staticmethod
+    def _convert_dict(obj):
+        if not obj:
+            return None
+        return json_ready_converter.convert(obj)
+
+
+db_ready_converter = DBReadyConverter()
 
 
 class DBAdapter(object):
@@ -27,6 +205,48 @@ class DBAdapter(object):
         self.entity_map = entity_map
         self.base_repo = base_repo
         self.exclude_key_map = exclude_key_map if exclude_key_map else dict()
+        self._hydrators = dict()
+        self._converters = dict()
+
+    def get_hydrator(self, entity_class, exclude_list=None):
+        model_class = self.entity_map[entity_class.__name__]
+        hydrator_key = (entity_class, model_class, frozenset(exclude_list) if exclude_list else frozenset())
+        hydrator = self._hydrators.get(hydrator_key)
+        if hydrator is None:
+            hydrator = EntityHydrator(self, entity_class, model_class, exclude_list)
+            self._hydrators[hydrator_key] = hydrator
+        return hydrator
+
+    def get_converter(self, type_info):
+        converter = self._converters.get(type_info)
+        if converter is None:
+            converter = self._build_converter(type_info)
+            self._converters[type_info] = converter
+        return converter
+
+    @staticmethod
+    def _build_converter(type_info):
+        class_obj = type_info.class_obj
+        if not isinstance(class_obj, type):
+            return _identity
+        if issubclass(class_obj, BaseEnum):
+            if type_info.many:
+                return lambda obj: [class_obj(o) for o in obj] if obj else list()
+            return lambda obj: class_obj(obj) if obj else obj
+        if issubclass(class_obj, datetime):
+            if type_info.many:
+                return lambda obj: [dateutils.parse_datetime(o, should_localize=True) for o in obj] if obj else list()
+            return lambda obj: dateutils.parse_datetime(obj, should_localize=True)
+        if issubclass(class_obj, Money):
+            return lambda obj: Money(obj) if obj else obj
+        if type_info.mapped:
+            return lambda obj: MapObject(class_obj, obj)
+        if issubclass(class_obj, (ValueObject, MutableValueObject)):
+            from_dict = class_obj.from_dict
+            if type_info.many:
+                return lambda obj: [from_dict(entry) for entry in obj] if obj else list()
+            return lambda obj: from_dict(obj) if obj is not None else obj
+        return _identity
 
     @staticmethod
     def get_model_attributes(model, excluded_attributes):
@@ -54,6 +274,25 @@ class DBAdapter(object):
                 keys[key] = getattr(model, key)
             models_map[frozenset(keys.items())].append(model)
 
+    def _update_list_data_map(self, models_map, entity_class, query_tuple, key_list, attribute_names=None):
+        model_class = self.entity_map[entity_class.__name__]
+        list_type_attribute_info = getattr(model_class, "list_type_attribute_info", dict())
+        for attribute_name, list_data_info in list_type_attribute_info.items():
+            if attribute_names is not None and attribute_name not in attribute_names:
+                continue
+            list_model_class = list_data_info.model_class
+            query_list = [getattr(list_model_class, query_tuple[0]).in_(query_tuple[1])]
+            if getattr(list_model_class, "deleted", None):
+                query_list.append(getattr(list_model_class, "deleted") == False)
+            models = self.base_repo.filter(list_model_class, *query_list)
+            for model in models:
+                keys = dict(entity_name=entity_class.__name__, list_attribute=attribute_name)
+                for key in key_list:
+                    keys[key] = getattr(model, key)
+                models_map[frozenset(keys.items())].append(
+                    getattr(model, list_data_info.data_key)
+                )
+
     def _load_all_models(self, entity_class, models_map, query_tuple, key_list):
         key_list_copy = key_list.copy()
         key_list_copy.append(entity_class.get_primary_key())
@@ -61,10 +300,25 @@ class DBAdapter(object):
             self._update_model_map(
                 models_map, entity_class_obj, query_tuple, key_list_copy
             )
+            self._update_list_data_map(
+                models_map,
+                entity_class_obj,
+                query_tuple,
+                key_list_copy + [entity_class_obj.get_primary_key()],
+            )
             self._load_all_models(
                 entity_class_obj, models_map, query_tuple, key_list_copy
             )
 
+    @staticmethod
+    def _get_list_data(entity_class, attribute_name, query_list, models_map):
+        model_map_key = [
+            ("entity_name", entity_class.__name__),
+            ("list_attribute", attribute_name),
+        ]
+        model_map_key.extend(query_list.items())
+        return list(models_map.get(frozenset(model_map_key), list()))
+
     def _get_object(self, type_info, query_list, model_map, obj=None):
         if issubclass(type_info.class_obj, BaseEntity):
             return self.to_entities(
@@ -73,35 +327,7 @@ class DBAdapter(object):
                 model_map=model_map,
                 many=type_info.many,
             )
-        elif issubclass(type_info.class_obj, BaseEnum):
-            if type_info.many:
-                if obj:
-                    return [type_info.class_obj(o) for o in obj]
-                else:
-                    return list()
-            return type_info.class_obj(obj) if obj else obj
-        elif issubclass(type_info.class_obj, datetime):
-            if type_info.many:
-                if obj:
-                    return [dateutils.parse_datetime(o, should_localize=True) for o in obj]
-                else:
-                    return list()
-            return dateutils.parse_datetime(obj, should_localize=True)
-        elif issubclass(type_info.class_obj, Money):
-            return Money(obj) if obj else obj
-        elif type_info.mapped:
-            return MapObject(type_info.class_obj, obj)
-        elif issubclass(type_info.class_obj, (ValueObject, MutableValueObject)):
-            if type_info.many:
-                ret_obj = list()
-                if obj:
-                    for entry in obj:
-                        ret_obj.append(type_info.class_obj.from_dict(entry))
-                return ret_obj
-            else:
-                return type_info.class_obj.from_dict(obj) if obj is not None else obj
-        else:
-            return obj
+        return self.get_converter(type_info)(obj)
 
     def _get_entity(
         self,
@@ -111,69 +337,79 @@ class DBAdapter(object):
         models_map,
         exclude_list=None,
         is_shallow=False,
+        lazy_batch=None,
+        loaded_attributes=None,
     ):
-        attr = dict(is_shallow=is_shallow)
-        model_attributes = self.get_model_attributes(model, exclude_list)
-        attribute_type_info = entity_class.get_attributes(model_attributes)
-        if "created_at" not in attribute_type_info.keys():
-            model_attributes.pop("created_at", None)
-        if "modified_at" not in attribute_type_info.keys():
-            model_attributes.pop("modified_at", None)
-        list_type_attribute_info = getattr(model, "list_type_attribute_info", dict())
-        for attribute_name, type_info in list_type_attribute_info.items():
-            attr[attribute_name] = self.to_list_data(type_info, query_list)
-        for attribute_name, type_info in attribute_type_info.items():
-            if attribute_name in list_type_attribute_info.keys():
-                continue
-            obj = model_attributes.pop(attribute_name, None)
-            attr[attribute_name] = self._get_object(
-                type_info, query_list, models_map, obj
-            )
-        attr.update(model_attributes)
-        entity = entity_class(**attr)
-        entity.reset_version_lock()
-        return entity
+        return self.get_hydrator(entity_class, exclude_list).hydrate(
+            model, query_list, models_map, is_shallow, lazy_batch, loaded_attributes
+        )
 
-    def to_db_models_for_list_data(
-        self, attrib_value, list_type_attribute, parent_key_dict=None,
-            tenant_id=None
-    ):
-        models = list()
+    def to_db_models_for_list_data(self, attrib_value, list_type_attribute, parent_key_dict=None, tenant_id=None):
+        """
+        Models of all the entries of a list type attribute, as written for an entity which is not stored yet.
+
+        :param attrib_value: ListObject or SetObject
+        :param list_type_attribute: ListTyeDataInfo
+        :param parent_key_dict:
+        :param tenant_id:
+        :return: models
+        """
+        if attrib_value is None:
+            return list()
         if not parent_key_dict:
             parent_key_dict = dict()
-        current_data = self.to_list_data(list_type_attribute, parent_key_dict)
-        if getattr(list_type_attribute.model_class, "deleted", None):
-            for entry in current_data:
-                if entry not in attrib_value:
-                    model_attributes = parent_key_dict.copy()
-                    model_attributes[list_type_attribute.data_key] = entry
-                    model_attributes["deleted"] = True
-                    models.append(list_type_attribute.model_class(**model_attributes))
-                else:
-                    attrib_value.pop(entry)
+        return [self._to_list_data_model(list_type_attribute, parent_key_dict, entry, tenant_id) for entry in attrib_value]
+
+    def _to_list_data_changes(self, attrib_value, list_type_attribute, parent_key_dict, db_changes, stored_entries=None):
+        """
+        Adds the rows of a list type attribute to be written to db_changes, from the changes tracked since the entity
+        was loaded or, when stored_entries are given, from the difference with them.
+        """
+        if attrib_value is None:
+            return
+        if stored_entries is None:
+            added, removed = attrib_value.changes()
         else:
-            deleted_entries = list()
-            for entry in current_data:
-                if entry not in attrib_value:
-                    model_attributes = parent_key_dict.copy()
-                    if tenant_id:
-                        model_attributes["tenant_id"] = tenant_id
-                    model_attributes[list_type_attribute.data_key] = entry
-                    deleted_entries.append(
-                        list_type_attribute.model_class(**model_attributes)
-                    )
-                else:
-                    attrib_value.pop(entry)
-            self.base_repo.delete_all(deleted_entries)
-        for entry in attrib_value:
-            model_attributes = parent_key_dict.copy()
-            if tenant_id:
-                model_attributes["tenant_id"] = tenant_id
-            model_attributes[list_type_attribute.data_key] = entry
-            models.append(list_type_attribute.model_class(**model_attributes))
-        return models
+            entries = Counter(attrib_value)
+            stored_entries = Counter(stored_entries)
+            added = list((entries - stored_entries).elements())
+            removed = list((stored_entries - entries).elements())
+        if removed:
+            removed = set(removed)
+            db_changes.list_deletes.append((list_type_attribute, parent_key_dict, removed))
+            # Rows are deleted by entry, the occurrences of a removed entry the attribute still holds are written again.
+            added = list(added)
+            added.extend(entry for entry in attrib_value if entry in removed)
+        for entry in added:
+            db_changes.list_inserts.append(self._to_list_data_model(list_type_attribute, parent_key_dict, entry))
+
+    @staticmethod
+    def _to_list_data_model(list_type_attribute, parent_key_dict, entry, tenant_id=None):
+        model_class = list_type_attribute.model_class
+        model_attributes = parent_key_dict.copy()
+        if tenant_id:
+            model_attributes["tenant_id"] = tenant_id
+        if getattr(model_class, "deleted", None) is not None:
+            # A soft deleted row of the entry may exist, it is written back as not deleted.
+            model_attributes["deleted"] = False
+        model_attributes[list_type_attribute.data_key] = entry
+        return model_class(**model_attributes)
+
+    def to_db_models(self, entity, parent_key_dict=None, db_changes=None):
+        """
+        Models of all the rows of an entity tree.
 
-    def to_db_models(self, entity, parent_key_dict=None):
+        :param entity:
+        :param parent_key_dict:
+        :param db_changes: when given, the rows of list type attributes are not returned but added to it as the
+            entries added and removed since the entity was loaded, or since what is stored for an entity which was
+            never loaded or saved. Used to merge entities which may already be stored.
+        :return: models
+        """
+        if entity.is_partial:
+            raise InvalidStateException(
+                description="{} was partially loaded, it can only be written by update".format(entity.__class__.__name__)
+            )
         try:
             exclude_keys = self.exclude_key_map.get(entity.__class__.__name__)
             exclude_keys = exclude_keys if exclude_keys else []
@@ -190,11 +426,20 @@ class DBAdapter(object):
             for attrib_key, attrib_value in entity.dict().items():
                 if attrib_key in exclude_keys:
                     continue
-                if list_type_attribute_info.get(attrib_key):
+                list_type_attribute = list_type_attribute_info.get(attrib_key)
+                if list_type_attribute and db_changes is not None:
+                    stored_entries = None
+                    if entity.persisted_version is None:
+                        stored_entries = self.to_list_data(list_type_attribute, primary_data.copy())
+                    self._to_list_data_changes(
+                        attrib_value, list_type_attribute, primary_data, db_changes, stored_entries
+                    )
+                    continue
+                if list_type_attribute:
                     models.extend(
                         self.to_db_models_for_list_data(
                             attrib_value,
-                            list_type_attribute_info.get(attrib_key),
+                            list_type_attribute,
                             primary_data
                         )
                     )
@@ -204,10 +449,10 @@ class DBAdapter(object):
                 if issubclass(attribute_info.class_obj, BaseEntity):
                     if attribute_info.many:
                         for entry in attrib_value.list():
-                            models.extend(self.to_db_models(entry, primary_data))
+                            models.extend(self.to_db_models(entry, primary_data, db_changes))
                     else:
                         if attrib_value:
-                            models.extend(self.to_db_models(attrib_value, primary_data))
+                            models.extend(self.to_db_models(attrib_value, primary_data, db_changes))
                 else:
                     attr[attrib_key] = DBAdapter.make_db_ready(attrib_value)
             model = model_class(**attr)
@@ -223,6 +468,99 @@ class DBAdapter(object):
             )
         return models
 
+    def to_db_changes(self, entity, parent_key_dict=None, db_changes=None, check_version=False):
+        """
+        Works out the rows of a loaded entity tree to be written from the dirty tracking of its entities and
+        collections: changed columns of changed rows, new child entities and removed child entities.
+
+        :param entity:
+        :param parent_key_dict:
+        :param db_changes:
+        :param check_version: write the row of the entity only if it still has the version the entity was loaded with
+        :return: DBChanges
+        """
+        if db_changes is None:
+            db_changes = DBChanges()
+        entity_class_name = entity.__class__.__name__
+        exclude_keys = self.exclude_key_map.get(entity_class_name) or []
+        expected_version = None
+        if check_version and "version" not in exclude_keys:
+            expected_version = entity.persisted_version
+        if entity.deleted:
+            return self._to_soft_delete_changes(entity, parent_key_dict, db_changes, expected_version)
+        try:
+            model_class = self.entity_map[entity_class_name]
+            list_type_attribute_info = getattr(model_class, "list_type_attribute_info", dict())
+            primary_data = entity.primary_data.copy()
+            if parent_key_dict:
+                primary_data.update(parent_key_dict)
+            entity.update_version()
+            dirty_attributes = entity.get_dirty_attributes()
+            values = dict()
+            for attrib_key, attribute_meta in entity.get_attribute_metas().items():
+                if attrib_key in exclude_keys:
+                    continue
+                attrib_value = getattr(entity, attrib_key)
+                if attrib_key in list_type_attribute_info:
+                    if attrib_value is not None and attrib_value.is_dirty:
+                        self._to_list_data_changes(
+                            attrib_value, list_type_attribute_info[attrib_key], primary_data, db_changes
+                        )
+                    continue
+                if attribute_meta.is_entity:
+                    if attrib_value is None:
+                        continue
+                    if attribute_meta.many:
+                        added, deleted, updated = attrib_value.get_changes()
+                        for entry in added:
+                            db_changes.inserts.extend(self.to_db_models(entry, primary_data))
+                        for entry in deleted:
+                            self._to_soft_delete_changes(entry, primary_data, db_changes)
+                        for entry in updated:
+                            self.to_db_changes(entry, primary_data, db_changes)
+                    elif attrib_key in dirty_attributes:
+                        db_changes.inserts.extend(self.to_db_models(attrib_value, primary_data))
+                    elif attrib_value.is_dirty:
+                        self.to_db_changes(attrib_value, primary_data, db_changes)
+                    continue
+                if attrib_key in dirty_attributes or (
+                    attribute_meta.tracks_dirty and attrib_value is not None and attrib_value.is_dirty
+                ):
+                    values[attrib_key] = DBAdapter.make_db_ready(attrib_value)
+            if "version" not in exclude_keys:
+                values["version"] = entity.version
+            db_changes.updates.append((model_class, primary_data, values, expected_version))
+        except KeyError as e:
+            raise InvalidStateException(
+                error=CommonError.ENTITY_TO_DB_CONVERSION_MAP_MISSING,
+                description=str(e),
+            )
+        return db_changes
+
+    def _to_soft_delete_changes(self, entity, parent_key_dict, db_changes, expected_version=None):
+        primary_data = entity.primary_data.copy()
+        if parent_key_dict:
+            primary_data.update(parent_key_dict)
+        self._add_soft_delete(entity.__class__, primary_data, db_changes, expected_version, entity.version)
+        self._to_soft_delete_child_changes(entity.__class__, primary_data, db_changes)
+        return db_changes
+
+    def _to_soft_delete_child_changes(self, entity_class, parent_key_dict, db_changes):
+        # Rows of every child entity carry the keys of their parents, so all of them are matched by parent keys.
+        for child_entity_class in entity_class.get_child_entities():
+            self._add_soft_delete(child_entity_class, parent_key_dict, db_changes)
+            self._to_soft_delete_child_changes(child_entity_class, parent_key_dict, db_changes)
+
+    def _add_soft_delete(self, entity_class, key_dict, db_changes, expected_version=None, version=None):
+        # Rows are never removed, tables without a deleted column keep them as they are.
+        exclude_keys = self.exclude_key_map.get(entity_class.__name__) or []
+        model_class = self.entity_map[entity_class.__name__]
+        if "deleted" not in exclude_keys and getattr(model_class, "deleted", None) is not None:
+            db_changes.updates.append((model_class, key_dict, dict(deleted=True), expected_version))
+        elif expected_version is not None and version is not None:
+            # The version is still written, so the delete fails the same way on an outdated aggregate.
+            db_changes.updates.append((model_class, key_dict, dict(version=version), expected_version))
+
     def to_list_data(self, list_data_info, query_list):
         try:
             if getattr(list_data_info.model_class, "deleted", None):
@@ -242,18 +580,16 @@ class DBAdapter(object):
             model_map_key = [("entity_name", entity_class.__name__)]
             model_map_key.extend(query_list.items())
             models = model_map[frozenset(model_map_key)]
-            for model in models:
-                exclude_list = self.exclude_key_map.get(entity_class.__name__)
-                if not exclude_list:
-                    exclude_list = []
+            if models:
+                exclude_list = list(self.exclude_key_map.get(entity_class.__name__) or [])
                 exclude_list.extend(query_list.keys())
-                new_query_dict = query_list.copy()
+                hydrator = self.get_hydrator(entity_class, exclude_list)
                 primary_key = entity_class.get_primary_key()
+            for model in models:
+                new_query_dict = query_list.copy()
                 if primary_key:
                     new_query_dict[primary_key] = getattr(model, primary_key)
-                entity = self._get_entity(
-                    model, entity_class, new_query_dict, model_map, exclude_list
-                )
+                entity = hydrator.hydrate(model, new_query_dict, model_map, False)
                 entities.append(entity)
         except KeyError as e:
             raise InvalidStateException(
@@ -262,13 +598,15 @@ class DBAdapter(object):
             )
         return entities if many else entities[0] if len(entities) > 0 else None
 
-    def to_aggregate(self, model, aggregate_class, models_map, is_shallow):
+    def to_aggregate(self, model, aggregate_class, models_map, is_shallow, lazy_batch=None, loaded_attributes=None):
         """
 
         :param model:
         :param aggregate_class:
         :param models_map:
         :param is_shallow:
+        :param lazy_batch: LazyChildBatch fetching the child entities when they are first used
+        :param loaded_attributes: attributes of a partial aggregate, None for all
         :return:
         """
         try:
@@ -284,6 +622,8 @@ class DBAdapter(object):
             models_map,
             exclude_list=self.exclude_key_map.get(aggregate_class.__name__),
             is_shallow=is_shallow,
+            lazy_batch=lazy_batch,
+            loaded_attributes=loaded_attributes,
         )
         return aggregate
 
@@ -294,6 +634,7 @@ class DBAdapter(object):
         for_update=False,
         nowait=False,
         is_shallow=False,
+        lazy=False,
     ):
         """
 
@@ -302,6 +643,7 @@ class DBAdapter(object):
         :param for_update:
         :param nowait:
         :param is_shallow:
+        :param lazy: fetch child entities the first time they are used
         :return:
         """
         try:
@@ -320,9 +662,7 @@ class DBAdapter(object):
                 model = self.base_repo.get(model_class, **query_list)
             if not model:
                 raise AggregateNotFound(aggregate_class.entity_name(), aggregate_id)
-            return self.load_aggregates_by_models(aggregate_class, [model], is_shallow)[
-                0
-            ]
+            return self.load_aggregates_by_models(aggregate_class, [model], is_shallow, lazy)[0]
         except KeyError as e:
             raise InvalidStateException(
                 error=CommonError.ENTITY_TO_DB_CONVERSION_MAP_MISSING,
@@ -332,7 +672,7 @@ class DBAdapter(object):
         #     raise InvalidStateException(error=CommonError.ENTITY_TO_DB_CONVERSION_ERROR, description=str(e))
 
     def load_aggregates(
-        self, aggregate_class, for_update, nowait, order_by, load_shallow, queries, meta
+        self, aggregate_class, for_update, nowait, order_by, load_shallow, queries, meta, lazy=False, fields=None
     ):
         """
 
@@ -342,10 +682,17 @@ class DBAdapter(object):
         :param order_by:
         :param load_shallow:
         :param queries:
+        :param meta: the next cursor is set on meta when it pages by keyset
+        :param lazy: fetch child entities the first time they are used, in one query per entity class for all the
+            loaded aggregates
+        :param fields: attributes to be loaded, the aggregates are loaded shallow and partial, None for all
         :return:
         """
         try:
             model_class = self.entity_map[aggregate_class.__name__]
+            loaded_attributes = columns = None
+            if fields is not None:
+                loaded_attributes, columns = self._get_projection(aggregate_class, fields)
             query_list = list()
             if aggregate_class.is_multi_tenant:
                 query_list.append(getattr(model_class, "tenant_id") == get_tenant_id())
@@ -373,67 +720,121 @@ class DBAdapter(object):
                 nowait=nowait,
                 for_update=for_update,
                 order_by=order_by,
-                meta=meta
+                meta=meta,
+                columns=columns,
             )
             models = models.all()
-            return self.load_aggregates_by_models(aggregate_class, models, load_shallow)
+            if meta and meta.is_keyset:
+                meta.next_cursor = KeysetOrder(model_class, order_by).next_cursor(models, meta.limit)
+            if loaded_attributes is not None:
+                return self.load_aggregates_by_models(
+                    aggregate_class, models, True, loaded_attributes=loaded_attributes
+                )
+            return self.load_aggregates_by_models(aggregate_class, models, load_shallow, lazy)
         except KeyError as e:
             raise InvalidStateException(
                 error=CommonError.ENTITY_TO_DB_CONVERSION_MAP_MISSING,
                 description=str(e),
             )
 
-    def load_aggregates_by_models(self, aggregate_class, models, load_shallow):
+    def load_aggregates_by_models(self, aggregate_class, models, load_shallow, lazy=False, loaded_attributes=None):
         """
 
         :param aggregate_class:
         :param models:
         :param load_shallow:
+        :param lazy: fetch child entities the first time they are used
+        :param loaded_attributes: attributes of partial aggregates, None for all
         :return:
         """
         aggregates = []
+        models = list(models)
+        if not models:
+            return aggregates
         models_map = defaultdict(list)
         primary_key = aggregate_class.get_primary_key()
-        if not load_shallow:
-            self._load_all_models(
-                aggregate_class,
-                models_map,
-                (primary_key, [getattr(model, primary_key) for model in models]),
-                list(),
-            )
+        query_tuple = (primary_key, [getattr(model, primary_key) for model in models])
+        self._update_list_data_map(
+            models_map, aggregate_class, query_tuple, [primary_key], loaded_attributes
+        )
+        lazy_batch = None
+        if lazy and not load_shallow:
+            lazy_batch = LazyChildBatch(self, aggregate_class, query_tuple, models_map)
+        elif not load_shallow:
+            self._load_all_models(aggregate_class, models_map, query_tuple, list())
         for model in models:
             aggregates.append(
-                self.to_aggregate(model, aggregate_class, models_map, load_shallow)
+                self.to_aggregate(model, aggregate_class, models_map, load_shallow, lazy_batch, loaded_attributes)
             )
         return aggregates
 
+    def _get_projection(self, aggregate_class, fields):
+        """
+        :param aggregate_class:
+        :param fields: attribute names
+        :return: (attributes to be loaded, columns to be selected)
+        """
+        entity_meta = aggregate_class.get_entity_meta()
+        model_class = self.entity_map[aggregate_class.__name__]
+        list_type_attribute_info = getattr(model_class, "list_type_attribute_info", dict())
+        column_keys = {column_attr.key for column_attr in inspect(model_class).column_attrs}
+        loaded_attributes = set(fields)
+        loaded_attributes.update(entity_meta.primary_keys)
+        if any(field in entity_meta.one_of_attributes for field in fields):
+            loaded_attributes.update(entity_meta.one_of_selector_keys)
+        loaded_attributes.update(key for key in ("version", "deleted", "tenant_id") if key in entity_meta.attribute_metas)
+        for field in loaded_attributes:
+            attribute_meta = entity_meta.attribute_metas.get(field)
+            if attribute_meta is None or attribute_meta.is_entity:
+                raise InvalidStateException(
+                    description="{} can't be loaded on its own for {}".format(field, aggregate_class.__name__)
+                )
+        columns = [field for field in loaded_attributes if field in column_keys and field not in list_type_attribute_info]
+        return frozenset(loaded_attributes), columns
+
+    def to_cache_data(self, aggregate):
+        """
+        JSON ready column values and list type attribute entries of the root row of a shallow aggregate, turned back
+        into the aggregate by from_cache_data
+        :param aggregate:
+        :return:
+        """
+        aggregate_class_name = aggregate.__class__.__name__
+        exclude_keys = self.exclude_key_map.get(aggregate_class_name) or []
+        list_type_attribute_info = getattr(self.entity_map[aggregate_class_name], "list_type_attribute_info", dict())
+        row = dict()
+        lists = dict()
+        for attrib_key, attribute_meta in aggregate.get_attribute_metas().items():
+            if attrib_key in exclude_keys or attribute_meta.is_entity:
+                continue
+            attrib_value = getattr(aggregate, attrib_key)
+            if attrib_key in list_type_attribute_info:
+                entries = attrib_value if attrib_value is not None else list()
+                lists[attrib_key] = [dump_column_value(DBAdapter.make_db_ready(entry)) for entry in entries]
+            else:
+                row[attrib_key] = dump_column_value(DBAdapter.make_db_ready(attrib_value))
+        return dict(row=row, lists=lists)
+
+    def from_cache_data(self, aggregate_class, data):
+        """
+        :param aggregate_class:
+        :param data: data built by to_cache_data
+        :return: shallow aggregate
+        """
+        model_class = self.entity_map[aggregate_class.__name__]
+        columns = {column_attr.key: column_attr.columns[0] for column_attr in inspect(model_class).column_attrs}
+        row = {key: load_column_value(columns[key], value) for key, value in data["row"].items() if key in columns}
+        model = model_class(**row)
+        primary_key = aggregate_class.get_primary_key()
+        list_type_attribute_info = getattr(model_class, "list_type_attribute_info", dict())
+        models_map = defaultdict(list)
+        for attribute_name, entries in data["lists"].items():
+            list_data_info = list_type_attribute_info[attribute_name]
+            data_column = getattr(list_data_info.model_class, list_data_info.data_key).property.columns[0]
+            keys = {"entity_name": aggregate_class.__name__, "list_attribute": attribute_name, primary_key: row[primary_key]}
+            models_map[frozenset(keys.items())] = [load_column_value(data_column, entry) for entry in entries]
+        return self.to_aggregate(model, aggregate_class, models_map, True)
+
     @staticmethod
     def make_db_ready(obj):
-        if isinstance(obj, (list, set)):
-            response_list = list()
-            for item in obj:
-                response_list.append(DBAdapter.make_db_ready(item))
-            return response_list
-        if isinstance(obj, dict):
-            if not obj:
-                return None
-            return make_jsonify_ready(obj)
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, Enum):
-            return obj.value
-        if isinstance(obj, BaseEntity):
-            return DBAdapter.make_db_ready(obj.dict())
-        if isinstance(obj, (ValueObject, MutableValueObject)):
-            return make_jsonify_ready(obj.dict())
-        if isinstance(obj, EntitySetObject):
-            return DBAdapter.make_db_ready(obj.list())
-        if isinstance(obj, (ListObject, SetObject)):
-            return make_jsonify_ready(obj.list())
-        if isinstance(obj, BaseDto):
-            return DBAdapter.make_db_ready(obj.data())
-        if isinstance(obj, Money):
-            return DBAdapter.make_db_ready(obj.to_dict())
-        if isinstance(obj, MapObject):
-            return DBAdapter.make_db_ready(obj.dict())
-        return obj
+        return db_ready_converter.convert(obj)
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, inspect, or_
+from sqlalchemy.sql import operators
+
+from flaskd3.common.exceptions import InvalidStateException, ValidationException
+from flaskd3.infrastructure.database.sqlalchemy.column_values import dump_column_value, load_column_value
+
+
+class KeysetOrder(object):
+    """
+    Ordering of a keyset (seek) paginated query: the order by column followed by the primary key columns, which
+    makes the order total. A page starts right after the row given by the cursor instead of skipping rows with an
+    OFFSET, so every page costs the same whatever its depth. The order by column must not be nullable, rows with NULL in
+    it would never be reached by the comparison with the cursor.
+
+    The cursor is opaque to clients, it holds the values of the ordering columns of the last row of a page.
+    """
+
+    def __init__(self, model_class, order_by=None):
+        mapper = inspect(model_class)
+        self.keys = list()
+        if order_by is not None:
+            self.keys.append(self._order_key(mapper, order_by))
+        ordered_columns = [column for _, column, _ in self.keys]
+        for column in mapper.primary_key:
+            if not any(column.shares_lineage(ordered_column) for ordered_column in ordered_columns):
+                self.keys.append((mapper.get_property_by_column(column).key, column, False))
+
+    @staticmethod
+    def _order_key(mapper, order_by):
+        descending = False
+        if getattr(order_by, "modifier", None) in (operators.asc_op, operators.desc_op):
+            descending = order_by.modifier is operators.desc_op
+            order_by = order_by.element
+        prop = getattr(order_by, "property", None)
+        column = prop.columns[0] if prop is not None else order_by
+        try:
+            key = mapper.get_property_by_column(column).key
+        except Exception:
+            raise InvalidStateException(
+                description="Keyset pagination needs a column of {} to order by".format(mapper.class_.__name__)
+            )
+        if getattr(column, "nullable", False):
+            raise InvalidStateException(
+                description="Keyset pagination cannot order by {}.{}, it is nullable".format(mapper.class_.__name__, key)
+            )
+        return key, column, descending
+
+    def apply(self, queryset, cursor, limit):
+        """
+        :param queryset:
+        :param cursor: cursor of the previous page, empty for the first page
+        :param limit:
+        :return: queryset of the page
+        """
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode(cursor)))
+        order_by = [column.desc() if descending else column.asc() for _, column, descending in self.keys]
+        return queryset.order_by(*order_by).limit(limit)
+
+    def next_cursor(self, models, limit):
+        """
+        :param models: models of the page
+        :param limit:
+        :return: cursor of the next page, None when the page is the last one
+        """
+        if not models or len(models) < limit:
+            return None
+        last_model = models[-1]
+        return self.encode([getattr(last_model, attr_key) for attr_key, _, _ in self.keys])
+
+    def _after(self, values):
+        clauses = list()
+        for i, (_, column, descending) in enumerate(self.keys):
+            equal_clauses = [self.keys[j][1] == values[j] for j in range(i)]
+            clauses.append(and_(*equal_clauses, column < values[i] if descending else column > values[i]))
+        return or_(*clauses)
+
+    def encode(self, values):
+        data = json.dumps([dump_column_value(value) for value in values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    def decode(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError(cursor)
+            return [load_column_value(column, value) for (_, column, _), value in zip(self.keys, values)]
+        except (ValueError, TypeError, UnicodeError, binascii.Error):
+            raise ValidationException(description="Invalid pagination cursor")
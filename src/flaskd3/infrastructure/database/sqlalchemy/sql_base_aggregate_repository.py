@@ -2,12 +2,17 @@ import logging
 from datetime import datetime
 
 from sqlalchemy import and_, or_
-from sqlalchemy.orm import lazyload
+from sqlalchemy.orm import lazyload, load_only
 from sqlalchemy.orm.exc import MultipleResultsFound, NoResultFound
 
+from flaskd3.appcore.core.request_context import get_aggregate_identity_map, get_tenant_id
+from flaskd3.common.dtos.meta_dto import Meta
 from flaskd3.infrastructure.database.base_repository import BaseRepository
 from flaskd3.infrastructure.database.constants import DBType
-from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter
+from flaskd3.infrastructure.database.redis.redis_aggregate_cache import RedisAggregateCache
+from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter, DBChanges
+from flaskd3.infrastructure.database.sqlalchemy.keyset_pagination import KeysetOrder
+from flaskd3.infrastructure.database.sqlalchemy.sql_bulk_writer import SQLBulkWriter
 from flaskd3.common.exceptions import (
     AggregateNotFound,
     DatabaseError,
@@ -22,17 +27,39 @@ class SQLABaseAggregateRepository(BaseRepository):
     aggregate_class = None
     entity_map = {}
     exclude_key_map = None
+    bulk_persistence = False
+    optimistic_locking = False
+    lazy_child_loading = False
+    cache_shallow_loads = False
+    cache_ttl = 3600
+    aggregate_cache = None
+    bulk_writer = SQLBulkWriter()
 
     and_ = and_
     or_ = or_
 
     def __init__(self, db_service_provider):
         self.db = db_service_provider.get_db_service(DBType.RDS).get_db()
+        if self.cache_shallow_loads:
+            redis_store = db_service_provider.get_db_service(DBType.REDIS).get_db()
+            self.aggregate_cache = RedisAggregateCache(redis_store, self.aggregate_class.__name__, self.cache_ttl)
 
     @classmethod
     def get_name(cls):
         return cls.name
 
+    @property
+    def db_adapter(self):
+        """
+        Adapter shared by all the calls on this repository. It keeps the conversion plans it builds, so they are
+        computed once per repository instead of once per call. The adapter keeps no per request state.
+        """
+        db_adapter = self.__dict__.get("_db_adapter")
+        if db_adapter is None:
+            db_adapter = DBAdapter(self.entity_map, self, self.exclude_key_map)
+            self._db_adapter = db_adapter
+        return db_adapter
+
     def save(self, aggregate):
         """
         Saves the aggregate in DB
@@ -40,62 +67,111 @@ class SQLABaseAggregateRepository(BaseRepository):
         :param aggregate:
         """
         aggregate.validate_entity()
-        models = DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(aggregate)
+        models = self.db_adapter.to_db_models(aggregate)
         self._save_all(models)
+        aggregate.commit_changes()
+        self._add_to_identity_map(get_aggregate_identity_map(), aggregate, False)
+        self._invalidate_cache([aggregate])
 
-    def save_all(self, aggregates):
+    def save_all(self, aggregates, bulk=None):
         """
         Saves the aggregate in DB
 
         :param aggregate:
+        :param bulk: write with multi row INSERT statements, defaults to bulk_persistence of the repository
         """
         models = []
         for aggregate in aggregates:
             aggregate.validate_entity()
-            models.extend(DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(
-                aggregate))
+            models.extend(self.db_adapter.to_db_models(aggregate))
         if models:
-            self._save_all(models)
+            if self._is_bulk(bulk):
+                self._bulk_save_all(models)
+            else:
+                self._save_all(models)
+        identity_map = get_aggregate_identity_map()
+        for aggregate in aggregates:
+            aggregate.commit_changes()
+            self._add_to_identity_map(identity_map, aggregate, False)
+        self._invalidate_cache(aggregates)
 
-    def update(self, aggregate):
+    def update(self, aggregate, optimistic=None):
         """
 
         :param aggregate:
+        :param optimistic: write the aggregate only if its row still has the version it was loaded with, instead of
+            relying on the row lock taken by load(for_update=True). Defaults to optimistic_locking of the repository
+        :raises OutdatedVersion: when the aggregate was changed by someone else since it was loaded
         :return:
         """
         if not aggregate.is_dirty and not aggregate.deleted:
             return
         aggregate.update_version()
         aggregate.validate_entity()
-        models = DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(aggregate)
-        self._update_all(models)
-
-    def update_all(self, aggregates, force_update=False):
+        if aggregate.persisted_version is None:
+            # Nothing tracks what is stored of an aggregate which was not loaded or saved, it is merged as a whole.
+            list_changes = DBChanges()
+            self._update_all(self.db_adapter.to_db_models(aggregate, db_changes=list_changes))
+            self._apply_db_changes(list_changes)
+        else:
+            check_version = self.optimistic_locking if optimistic is None else optimistic
+            self._apply_db_changes(self.db_adapter.to_db_changes(aggregate, check_version=check_version))
+        aggregate.commit_changes()
+        if aggregate.deleted:
+            self._remove_from_identity_map(aggregate)
+        self._invalidate_cache([aggregate])
+
+    def update_all(self, aggregates, force_update=False, bulk=None):
         """
 
         :param aggregates:
         :param force_update:
+        :param bulk: write with UPSERT and executemany UPDATE statements, defaults to bulk_persistence of the repository
         :return:
         """
         models = []
+        db_changes = None
+        list_changes = DBChanges()
+        is_bulk = self._is_bulk(bulk)
+        written_aggregates = []
         for aggregate in aggregates:
             if not force_update and not aggregate.is_dirty:
                 continue
             aggregate.update_version()
             aggregate.validate_entity()
-            models.extend(DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(aggregate))
+            written_aggregates.append(aggregate)
+            if force_update or is_bulk or aggregate.persisted_version is None:
+                models.extend(self.db_adapter.to_db_models(aggregate, db_changes=list_changes))
+            else:
+                db_changes = self.db_adapter.to_db_changes(
+                    aggregate, db_changes=db_changes, check_version=self.optimistic_locking
+                )
+        if db_changes:
+            self._apply_db_changes(db_changes)
         if models:
-            self._update_all(models)
+            if is_bulk:
+                self._bulk_update_all(models)
+            else:
+                self._update_all(models)
+            self._apply_db_changes(list_changes)
+        for aggregate in written_aggregates:
+            aggregate.commit_changes()
+        self._invalidate_cache(aggregates)
 
     def delete(self, aggregate):
-        models = DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(aggregate)
+        models = self.db_adapter.to_db_models(aggregate)
         self._delete_all(models)
+        self._remove_from_identity_map(aggregate)
+        self._invalidate_cache([aggregate], deleted=True)
 
     def delete_all(self, aggregates):
         models = list()
         for aggregate in aggregates:
-            models.extend(DBAdapter(self.entity_map, self, self.exclude_key_map).to_db_models(aggregate))
+            models.extend(self.db_adapter.to_db_models(aggregate))
         self._delete_all(models)
+        for aggregate in aggregates:
+            self._remove_from_identity_map(aggregate)
+        self._invalidate_cache(aggregates, deleted=True)
 
     def get_or_create(self, aggregate):
         loaded_aggregate = self.load(aggregate_id=aggregate.aggregate_id)
@@ -104,12 +180,31 @@ class SQLABaseAggregateRepository(BaseRepository):
         return self.save(aggregate)
 
     def load(self, aggregate_id, version=None, for_update=False, is_shallow=False):
-        aggregate = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregate(
-            self.aggregate_class,
-            aggregate_id=aggregate_id,
-            for_update=for_update,
-            is_shallow=is_shallow,
-        )
+        """
+        Aggregates loaded within a unit of work (handle_db_commits, call_with_db_commit) are kept in its identity map,
+        loading one of them again returns the same instance without querying. A for_update load of a kept aggregate
+        still locks its row, the aggregate is reloaded when the row changed since it was loaded.
+
+        Shallow loads go through the aggregate cache of the repository when cache_shallow_loads is set.
+        """
+        identity_map = get_aggregate_identity_map()
+        aggregate = self._get_from_identity_map(identity_map, [aggregate_id], is_shallow, for_update).get(aggregate_id)
+        if aggregate is None:
+            if is_shallow and not for_update:
+                aggregate = self._get_from_cache([aggregate_id]).get(aggregate_id)
+                if aggregate is not None and version is not None and version != aggregate.version:
+                    aggregate = None
+            if aggregate is None:
+                aggregate = self.db_adapter.load_aggregate(
+                    self.aggregate_class,
+                    aggregate_id=aggregate_id,
+                    for_update=for_update,
+                    is_shallow=is_shallow,
+                    lazy=self.lazy_child_loading,
+                )
+                if is_shallow:
+                    self._add_to_cache([aggregate])
+            self._add_to_identity_map(identity_map, aggregate, is_shallow)
         if version is not None and version != aggregate.version:
             raise OutdatedVersion(self.aggregate_class.__name__, aggregate_id, aggregate.version)
         return aggregate
@@ -124,11 +219,26 @@ class SQLABaseAggregateRepository(BaseRepository):
         meta=None,
     ):
         aggregate_ids = set(aggregate_ids)
-        aggregate_model_class = self.entity_map[self.aggregate_class.__name__]
-        queries = [getattr(aggregate_model_class, self.aggregate_class.get_primary_key()).in_(aggregate_ids)]
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
-            self.aggregate_class, for_update, nowait, None, load_shallow, queries, meta
-        )
+        identity_map = get_aggregate_identity_map() if meta is None else None
+        loaded_aggregates = self._get_from_identity_map(identity_map, aggregate_ids, load_shallow, for_update, nowait)
+        if load_shallow and not for_update and meta is None:
+            cached_aggregates = self._get_from_cache(aggregate_ids.difference(loaded_aggregates))
+            for aggregate in cached_aggregates.values():
+                self._add_to_identity_map(identity_map, aggregate, load_shallow)
+            loaded_aggregates.update(cached_aggregates)
+        aggregates = list(loaded_aggregates.values())
+        missing_ids = aggregate_ids.difference(loaded_aggregates)
+        if missing_ids:
+            aggregate_model_class = self.entity_map[self.aggregate_class.__name__]
+            queries = [getattr(aggregate_model_class, self.aggregate_class.get_primary_key()).in_(missing_ids)]
+            db_aggregates = self.db_adapter.load_aggregates(
+                self.aggregate_class, for_update, nowait, None, load_shallow, queries, meta, self.lazy_child_loading
+            )
+            for aggregate in db_aggregates:
+                self._add_to_identity_map(identity_map, aggregate, load_shallow)
+                aggregates.append(aggregate)
+            if load_shallow:
+                self._add_to_cache(db_aggregates)
         if find_all and len(aggregates) != len(aggregate_ids):
             missing_ids = aggregate_ids.copy()
             for aggregate in aggregates:
@@ -136,8 +246,12 @@ class SQLABaseAggregateRepository(BaseRepository):
             raise AggregateNotFound(self.aggregate_class.entity_name(), missing_ids)
         return aggregates
 
-    def load_by_keys(self, for_update=False, no_wait=True, load_shallow=False, meta=None, **queries):
-        return DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
+    def load_by_keys(self, for_update=False, no_wait=True, load_shallow=False, meta=None, fields=None, **queries):
+        """
+        :param fields: names of the only attributes to be loaded. The aggregates are then shallow and partial, their
+            other attributes can't be updated
+        """
+        return self.db_adapter.load_aggregates(
             self.aggregate_class,
             for_update=for_update,
             nowait=no_wait,
@@ -145,11 +259,13 @@ class SQLABaseAggregateRepository(BaseRepository):
             load_shallow=load_shallow,
             queries=queries,
             meta=meta,
+            lazy=self.lazy_child_loading,
+            fields=fields,
         )
 
     def load_all(self, load_shallow=False):
         queries = dict()
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
+        aggregates = self.db_adapter.load_aggregates(
             self.aggregate_class,
             for_update=False,
             order_by=None,
@@ -157,11 +273,42 @@ class SQLABaseAggregateRepository(BaseRepository):
             load_shallow=load_shallow,
             queries=queries,
             meta=None,
+            lazy=self.lazy_child_loading,
         )
         return aggregates
 
+    def iter_aggregates(self, queries=None, chunk_size=500, load_shallow=False, order_by=None):
+        """
+        Generator over all the aggregates matching queries, for scans of whole tables. Aggregates are loaded and
+        hydrated chunk_size at a time, each chunk fetched by keyset after the previous one, so only one chunk is held
+        at a time.
+
+        :param queries: dict of attribute values or list of filter clauses, as taken by load_aggregates
+        :param chunk_size:
+        :param load_shallow:
+        :param order_by: column to scan by, the primary key is scanned by when None
+        :return:
+        """
+        meta = Meta(limit=chunk_size, keyset=True)
+        while True:
+            aggregates = self.db_adapter.load_aggregates(
+                self.aggregate_class,
+                False,
+                True,
+                order_by,
+                load_shallow,
+                queries if queries is not None else dict(),
+                meta,
+                self.lazy_child_loading,
+            )
+            for aggregate in aggregates:
+                yield aggregate
+            if meta.next_cursor is None:
+                return
+            meta = Meta(limit=chunk_size, cursor=meta.next_cursor)
+
     def load_multiple(self, **queries):
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
+        aggregates = self.db_adapter.load_aggregates(
             self.aggregate_class,
             for_update=False,
             order_by=None,
@@ -169,11 +316,18 @@ class SQLABaseAggregateRepository(BaseRepository):
             load_shallow=False,
             queries=queries,
             meta=None,
+            lazy=self.lazy_child_loading,
         )
         return aggregates
 
     def load_multiple_shallow(self, **queries):
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
+        primary_key = self.aggregate_class.get_primary_key()
+        if self.aggregate_cache is not None and list(queries) == [primary_key]:
+            aggregate_ids = queries[primary_key]
+            if not isinstance(aggregate_ids, (list, set)):
+                aggregate_ids = [aggregate_ids]
+            return self.load_many(aggregate_ids, find_all=False, load_shallow=True)
+        aggregates = self.db_adapter.load_aggregates(
             self.aggregate_class,
             for_update=False,
             order_by=None,
@@ -184,8 +338,12 @@ class SQLABaseAggregateRepository(BaseRepository):
         )
         return aggregates
 
-    def load_multiple_queries(self, for_update, nowait, order_by, load_shallow, meta, *queries):
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
+    def load_multiple_queries(self, for_update, nowait, order_by, load_shallow, meta, *queries, fields=None):
+        """
+        :param fields: names of the only attributes to be loaded. The aggregates are then shallow and partial, their
+            other attributes can't be updated
+        """
+        aggregates = self.db_adapter.load_aggregates(
             self.aggregate_class,
             for_update,
             nowait,
@@ -193,17 +351,123 @@ class SQLABaseAggregateRepository(BaseRepository):
             load_shallow,
             queries,
             meta,
+            self.lazy_child_loading,
+            fields,
         )
         return aggregates
 
     def load_multiple_queries_readonly(self, order_by, load_shallow, meta, *queries):
-        aggregates = DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates(
-            self.aggregate_class, False, True, order_by, load_shallow, queries, meta
+        aggregates = self.db_adapter.load_aggregates(
+            self.aggregate_class, False, True, order_by, load_shallow, queries, meta, self.lazy_child_loading
         )
         return aggregates
 
+    def _cache_key(self, aggregate_id):
+        tenant_id = get_tenant_id() if self.aggregate_class.is_multi_tenant else None
+        return self.aggregate_cache.key(tenant_id, aggregate_id)
+
+    def _get_from_cache(self, aggregate_ids):
+        """
+        :return: dict of the shallow aggregates of aggregate_ids found in the aggregate cache, by aggregate id
+        """
+        aggregates = dict()
+        if self.aggregate_cache is None or not aggregate_ids:
+            return aggregates
+        keys = {self._cache_key(aggregate_id): aggregate_id for aggregate_id in aggregate_ids}
+        for key, entry in self.aggregate_cache.get_loaded(self.session(), list(keys)).items():
+            aggregates[keys[key]] = self.db_adapter.from_cache_data(self.aggregate_class, entry["data"])
+        return aggregates
+
+    def _add_to_cache(self, aggregates):
+        if self.aggregate_cache is None:
+            return
+        session = self.session()
+        for aggregate in aggregates:
+            self.aggregate_cache.set_loaded(
+                session,
+                self._cache_key(aggregate.primary_id),
+                aggregate.version,
+                self.db_adapter.to_cache_data(aggregate),
+            )
+
+    def _invalidate_cache(self, aggregates, deleted=False):
+        """
+        Entries of aggregates can be cached again from the version written, or never again for deleted aggregates
+        """
+        if self.aggregate_cache is None:
+            return
+        versions = dict()
+        for aggregate in aggregates:
+            version = aggregate.version + 1 if deleted or aggregate.deleted else aggregate.version
+            versions[self._cache_key(aggregate.primary_id)] = version
+        if versions:
+            self.aggregate_cache.invalidate_after_commit(self.session(), versions)
+
+    def _identity_key(self, aggregate_id):
+        tenant_id = get_tenant_id() if self.aggregate_class.is_multi_tenant else None
+        return self.aggregate_class, tenant_id, aggregate_id
+
+    def _add_to_identity_map(self, identity_map, aggregate, is_shallow):
+        if identity_map is None:
+            return
+        identity_key = self._identity_key(aggregate.primary_id)
+        entry = identity_map.get(identity_key)
+        if entry is None or (entry[1] and not is_shallow):
+            identity_map[identity_key] = (aggregate, is_shallow)
+
+    def _remove_from_identity_map(self, aggregate):
+        identity_map = get_aggregate_identity_map()
+        if identity_map is not None:
+            identity_map.pop(self._identity_key(aggregate.primary_id), None)
+
+    def _get_from_identity_map(self, identity_map, aggregate_ids, is_shallow, for_update, nowait=False):
+        """
+        :return: dict of the aggregates of aggregate_ids kept in the identity map, by aggregate id. Shallow aggregates
+            are not returned for a full load.
+        """
+        aggregates = dict()
+        if not identity_map:
+            return aggregates
+        for aggregate_id in aggregate_ids:
+            entry = identity_map.get(self._identity_key(aggregate_id))
+            if entry is not None and (is_shallow or not entry[1]):
+                aggregates[aggregate_id] = entry[0]
+        if for_update and aggregates:
+            for aggregate_id in self._lock_rows(aggregates, nowait):
+                identity_map.pop(self._identity_key(aggregate_id))
+                aggregates.pop(aggregate_id)
+        return aggregates
+
+    def _lock_rows(self, aggregates, nowait):
+        """
+        locks the rows of aggregates loaded earlier
+        :param aggregates: dict of aggregates by aggregate id
+        :param nowait:
+        :return: ids of the aggregates whose row changed since they were loaded
+        """
+        model_class = self.entity_map[self.aggregate_class.__name__]
+        primary_key_column = getattr(model_class, self.aggregate_class.get_primary_key())
+        version_column = getattr(model_class, "version", None)
+        if version_column is None:
+            return list(aggregates)
+        rows = (
+            self.session()
+            .query(primary_key_column, version_column)
+            .filter(primary_key_column.in_(list(aggregates)))
+            .with_for_update(nowait=nowait)
+            .all()
+        )
+        versions = dict(rows)
+        return [
+            aggregate_id
+            for aggregate_id, aggregate in aggregates.items()
+            if versions.get(aggregate_id) != aggregate.persisted_version
+        ]
+
     def load_aggregates_by_models(self, models, load_shallow=False):
-        return DBAdapter(self.entity_map, self, self.exclude_key_map).load_aggregates_by_models(self.aggregate_class, models, load_shallow)
+        return self.db_adapter.load_aggregates_by_models(
+            self.aggregate_class, models, load_shallow, self.lazy_child_loading
+        )
 
     def session(self):
         """
@@ -258,18 +522,128 @@ class SQLABaseAggregateRepository(BaseRepository):
         self.session().flush()
         return items
 
-    def filter(self, model, *queries, for_update=False, nowait=True, order_by=None, meta=None):
+    def _apply_db_changes(self, db_changes):
+        """
+        writes the changes worked out from the dirty tracking of an aggregate
+        :param db_changes:
+        :return:
+        """
+        session = self.session()
+        # Version checked rows are written first, so nothing else is sent when the aggregate turns out to be outdated.
+        for model_class, primary_data, values, expected_version in db_changes.updates:
+            if expected_version is not None:
+                query = self._versioned_query(model_class, primary_data, expected_version)
+                self._check_row_count(query.update(values, synchronize_session=False), primary_data, expected_version)
+                self.bulk_writer.expire_instance(session, model_class, primary_data)
+        for item in db_changes.merges:
+            session.merge(item)
+        session.add_all(db_changes.inserts)
+        session.flush()
+        for list_type_attribute, parent_key_dict, entries in db_changes.list_deletes:
+            self.delete_list_data(list_type_attribute, parent_key_dict, entries)
+        if db_changes.list_inserts:
+            self._save_list_data(db_changes.list_inserts)
+        for model_class, primary_data, values, expected_version in db_changes.updates:
+            if expected_version is None:
+                session.query(model_class).filter_by(**primary_data).update(values, synchronize_session=False)
+                self.bulk_writer.expire_instance(session, model_class, primary_data)
+        return db_changes
+
+    def delete_list_data(self, list_type_attribute, parent_key_dict, entries):
+        """
+        deletes the rows of entries of a list type attribute with one statement, soft deleting them when the table
+        has a deleted column
+        :param list_type_attribute: ListTyeDataInfo
+        :param parent_key_dict:
+        :param entries:
+        :return: number of rows
+        """
+        model_class = list_type_attribute.model_class
+        query = (
+            self.session()
+            .query(model_class)
+            .filter_by(**parent_key_dict)
+            .filter(getattr(model_class, list_type_attribute.data_key).in_(list(entries)))
+        )
+        if getattr(model_class, "deleted", None) is not None:
+            return query.update(dict(deleted=True), synchronize_session=False)
+        return query.delete(synchronize_session=False)
+
+    def _save_list_data(self, models):
+        """
+        writes models of new list type attribute entries with multi row INSERT statements. Soft deleted rows of the
+        entries may exist in tables with a deleted column, those are upserted.
+        """
+        session = self.session()
+        insert_models = list()
+        upsert_models = list()
+        for model in models:
+            if getattr(type(model), "deleted", None) is not None:
+                upsert_models.append(model)
+            else:
+                insert_models.append(model)
+        fallback_models = self.bulk_writer.insert_all(session, insert_models)
+        session.add_all(fallback_models)
+        for model in self.bulk_writer.upsert_all(session, upsert_models):
+            session.merge(model)
+        session.flush()
+
+    def _versioned_query(self, model_class, primary_data, expected_version):
+        return self.session().query(model_class).filter_by(**primary_data).filter(model_class.version == expected_version)
+
+    def _check_row_count(self, row_count, primary_data, expected_version):
+        if row_count != 1:
+            aggregate_id = ", ".join(str(value) for value in primary_data.values())
+            raise OutdatedVersion(self.aggregate_class.__name__, aggregate_id, expected_version)
+
+    def _is_bulk(self, bulk):
+        return self.bulk_persistence if bulk is None else bulk
+
+    def _bulk_save_all(self, items):
+        """
+        inserts multiple items with multi row INSERT statements
+        :param items:
+        :return:
+        """
+        session = self.session()
+        session.flush()
+        fallback_items = self.bulk_writer.insert_all(session, items)
+        if fallback_items:
+            self._save_all(fallback_items)
+        return items
+
+    def _bulk_update_all(self, items):
+        """
+        updates multiple items with executemany UPDATE and UPSERT statements
+        :param items:
+        :return:
+        """
+        session = self.session()
+        session.flush()
+        fallback_items = self.bulk_writer.upsert_all(session, items)
+        if fallback_items:
+            self._update_all(fallback_items)
+        return items
+
+    def filter(self, model, *queries, for_update=False, nowait=True, order_by=None, meta=None, columns=None):
         """
         :param model:
         :param queries:
         :param for_update:
         :param nowait:
+        :param order_by:
+        :param meta: pages by keyset, ordered by order_by and the primary key, when meta has a cursor
+        :param columns: names of the only column attributes to be loaded, None for all
         :return:
         """
         queryset = self.session().query(model)
+        if columns is not None:
+            queryset = queryset.options(load_only(*[getattr(model, column) for column in columns]))
         queryset = queryset.filter(*queries)
         if for_update:
             queryset = queryset.with_for_update(nowait=nowait)
+        if meta and meta.is_keyset:
+            return KeysetOrder(model, order_by).apply(queryset, meta.cursor, meta.limit)
         if order_by is not None:
             queryset = queryset.order_by(order_by)
         if meta:
@@ -0,0 +1,188 @@
+import logging
+from collections import OrderedDict
+
+from sqlalchemy import and_, bindparam, inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm.util import identity_key
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWritePlan(object):
+    """
+    Column layout of a model class used to turn model instances into rows for core statements.
+    """
+
+    def __init__(self, model_class):
+        mapper = inspect(model_class)
+        self.model_class = model_class
+        self.mapper = mapper
+        self.table = mapper.local_table
+        self.is_supported = len(mapper.tables) == 1
+        self.columns = list()
+        for column_attr in mapper.column_attrs:
+            if len(column_attr.columns) == 1:
+                self.columns.append((column_attr.key, column_attr.columns[0]))
+        self.primary_key = list(mapper.primary_key)
+        self.primary_key_keys = [mapper.get_property_by_column(column).key for column in self.primary_key]
+        self.onupdate_values = dict()
+        for _, column in self.columns:
+            onupdate = column.onupdate
+            if onupdate is not None and (onupdate.is_clause_element or onupdate.is_scalar):
+                self.onupdate_values[column.key] = onupdate.arg
+
+    def to_row(self, model):
+        model_dict = model.__dict__
+        return {column.key: model_dict[attr_key] for attr_key, column in self.columns if attr_key in model_dict}
+
+    def primary_id(self, model):
+        model_dict = model.__dict__
+        primary_id = tuple(model_dict.get(key) for key in self.primary_key_keys)
+        return None if None in primary_id else primary_id
+
+
+class SQLBulkWriter(object):
+    """
+    Writes models with multi row INSERT, dialect specific UPSERT and executemany UPDATE statements instead of
+    going through the unit of work one model at a time.
+
+    Models are grouped per table and per set of populated columns. Rows already present in the session's identity
+    map are known to exist and are written with an executemany UPDATE on the primary key, the other rows are
+    inserted, or upserted when the write may hit existing rows.
+    """
+
+    upsert_dialects = ("postgresql", "sqlite", "mysql", "mariadb")
+    chunk_size = 500
+
+    def __init__(self):
+        self._plans = dict()
+
+    def get_plan(self, model_class):
+        plan = self._plans.get(model_class)
+        if plan is None:
+            plan = BulkWritePlan(model_class)
+            self._plans[model_class] = plan
+        return plan
+
+    def supports_upsert(self, session, model_class):
+        return session.get_bind(mapper=inspect(model_class)).dialect.name in self.upsert_dialects
+
+    def insert_all(self, session, models):
+        """
+        Inserts new models with one multi row INSERT per table and column set.
+        :param session:
+        :param models:
+        :return: models which cannot be written in bulk
+        """
+        fallback_models = list()
+        groups = self._group(models, fallback_models)
+        for (plan, column_keys), rows in self._sorted(groups):
+            for chunk in self._chunks(rows):
+                session.execute(plan.table.insert().values(chunk))
+        return fallback_models
+
+    def upsert_all(self, session, models):
+        """
+        Writes models which may or may not exist. Rows loaded in the session are updated with an executemany UPDATE,
+        the rest are upserted. Models of dialects without upsert support are returned to be merged by the caller.
+        :param session:
+        :param models:
+        :return: models which cannot be written in bulk
+        """
+        fallback_models = list()
+        update_models = list()
+        upsert_models = list()
+        for model in models:
+            plan = self.get_plan(type(model))
+            primary_id = plan.primary_id(model) if plan.is_supported else None
+            if primary_id is not None and identity_key(plan.model_class, primary_id) in session.identity_map:
+                update_models.append(model)
+            elif plan.is_supported and plan.primary_key and self.supports_upsert(session, plan.model_class):
+                upsert_models.append(model)
+            else:
+                fallback_models.append(model)
+        update_groups = self._group(update_models, fallback_models)
+        upsert_groups = self._group(upsert_models, fallback_models)
+        for (plan, column_keys), rows in self._sorted(upsert_groups):
+            for chunk in self._chunks(rows):
+                session.execute(self._upsert_statement(session, plan, column_keys, chunk))
+        for (plan, column_keys), rows in self._sorted(update_groups):
+            if not column_keys.difference(column.key for column in plan.primary_key):
+                continue
+            session.execute(self._update_statement(plan, column_keys), [self._bind_primary_key(plan, row) for row in rows])
+        self._expire(session, update_models)
+        return fallback_models
+
+    def _group(self, models, fallback_models):
+        groups = OrderedDict()
+        for model in models:
+            plan = self.get_plan(type(model))
+            if not plan.is_supported:
+                fallback_models.append(model)
+                continue
+            row = plan.to_row(model)
+            groups.setdefault((plan, frozenset(row.keys())), list()).append(row)
+        return groups
+
+    @staticmethod
+    def _sorted(groups):
+        def table_order(group):
+            table = group[0][0].table
+            return table.metadata.sorted_tables.index(table)
+
+        return sorted(groups.items(), key=table_order)
+
+    def _chunks(self, rows):
+        for i in range(0, len(rows), self.chunk_size):
+            yield rows[i : i + self.chunk_size]
+
+    @staticmethod
+    def _upsert_statement(session, plan, column_keys, rows):
+        dialect_name = session.get_bind(mapper=plan.mapper).dialect.name
+        primary_key_keys = {column.key for column in plan.primary_key}
+        update_keys = [key for key in column_keys if key not in primary_key_keys]
+        if dialect_name in ("mysql", "mariadb"):
+            statement = mysql.insert(plan.table).values(rows)
+            set_values = {key: statement.inserted[key] for key in update_keys}
+            for key, value in plan.onupdate_values.items():
+                set_values.setdefault(key, value)
+            if not set_values:
+                set_values = {key: statement.inserted[key] for key in primary_key_keys}
+            return statement.on_duplicate_key_update(set_values)
+        dialect_module = postgresql if dialect_name == "postgresql" else sqlite
+        statement = dialect_module.insert(plan.table).values(rows)
+        if not update_keys:
+            return statement.on_conflict_do_nothing(index_elements=plan.primary_key)
+        set_values = {key: statement.excluded[key] for key in update_keys}
+        for key, value in plan.onupdate_values.items():
+            set_values.setdefault(key, value)
+        return statement.on_conflict_do_update(index_elements=plan.primary_key, set_=set_values)
+
+    @staticmethod
+    def _update_statement(plan, column_keys):
+        primary_key_keys = {column.key for column in plan.primary_key}
+        where_clause = and_(*[column == bindparam("pk_" + column.key) for column in plan.primary_key])
+        values = {key: bindparam(key) for key in column_keys if key not in primary_key_keys}
+        return plan.table.update().where(where_clause).values(values)
+
+    @staticmethod
+    def _bind_primary_key(plan, row):
+        params = dict(row)
+        for column in plan.primary_key:
+            params["pk_" + column.key] = params.pop(column.key)
+        return params
+
+    def _expire(self, session, models):
+        for model in models:
+            self.expire_instance(session, type(model), model.__dict__)
+
+    def expire_instance(self, session, model_class, attributes):
+        """
+        Rows written with core statements are not reflected on the instances loaded in the session, so the loaded
+        instance of the row identified by attributes is expired.
+        """
+        plan = self.get_plan(model_class)
+        primary_id = tuple(attributes.get(key) for key in plan.primary_key_keys)
+        instance = session.identity_map.get(identity_key(model_class, primary_id))
+        if instance is not None:
+            session.expire(instance)
@@ -1,4 +1,3 @@
-from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter
 from flaskd3.infrastructure.domain_events.constants import DomainEventStatus
 
 
@@ -12,7 +11,7 @@ class ConsumedDomainEventRepositoryMixin(object):
         )
         if not integration_event_models:
             return []
-        aggregates = DBAdapter(self.entity_map, self).load_aggregates_by_models(self.aggregate_class, integration_event_models)
+        aggregates = self.load_aggregates_by_models(integration_event_models)
         for aggregate in aggregates:
             aggregate.status = DomainEventStatus.RETRYING
         return aggregates
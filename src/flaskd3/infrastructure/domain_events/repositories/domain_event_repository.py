@@ -1,4 +1,3 @@
-from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter
 from flaskd3.infrastructure.database.sqlalchemy.sql_base_aggregate_repository import (
     SQLABaseAggregateRepository,
 )
@@ -26,5 +25,5 @@ class DomainEventRepository(SQLABaseAggregateRepository):
         )
         if not integration_event_models:
             return []
-        aggregates = DBAdapter(self.entity_map, self).load_aggregates_by_models(self.aggregate_class, integration_event_models, False)
+        aggregates = self.load_aggregates_by_models(integration_event_models)
         return aggregates
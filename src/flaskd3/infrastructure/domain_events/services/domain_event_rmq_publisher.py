@@ -5,8 +5,7 @@ from flaskd3.infrastructure.domain_events.constants import (
     DOMAIN_EVENT_RMQ_EXCHANGE_TYPE,
 )
 from flaskd3.infrastructure.messaging.rmq.rmq_queue_service import RabbitMQQueueService
-from flaskd3.common.utils.common_utils import convert_key_to_camel_case
-from flaskd3.common.utils.json_utils import make_jsonify_ready
+from flaskd3.common.utils.json_utils import make_camel_case_jsonify_ready
 
 
 class DomainEventRMQPublisher(RabbitMQQueueService):
@@ -22,7 +21,5 @@ class DomainEventRMQPublisher(RabbitMQQueueService):
 
     def publish(self, event_aggregate):
         routing_key = "{}".format(event_aggregate.domain)
-        message = event_aggregate.message()
-        converted_message = convert_key_to_camel_case(message)
-        message = make_jsonify_ready(converted_message)
+        message = make_camel_case_jsonify_ready(event_aggregate.message())
         super().publish(message, routing_key)
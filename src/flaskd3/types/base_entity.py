@@ -1,15 +1,19 @@
+import inspect
+from types import MappingProxyType
+
 from transitions.core import MachineError
 
 from flaskd3.appcore.core.request_context import get_tenant_id
 from flaskd3.types.base_enum import BaseEnum
+from flaskd3.types.change_notifier import ChangeNotifier
 from flaskd3.types.constants import CoreDataTypes
 from flaskd3.types.entity_set_object import EntitySetObject
-from flaskd3.types.iter_base import IterBase
 from flaskd3.types.list_object import ListObject
 from flaskd3.types.map_object import MapObject
 from flaskd3.types.mutable_value_object import MutableValueObject
 from flaskd3.types.set_object import SetObject
 from flaskd3.types.type_info import TypeInfo
+from flaskd3.types.value_object import ValueObject
 from flaskd3.common.exceptions import (
     AuthorizationException,
     InvalidStateException,
@@ -17,8 +21,112 @@ from flaskd3.common.exceptions import (
 )
 from flaskd3.common.value_objects import ActionLog
 
+# Shared by all entities until their first attribute write creates their own dirty map.
+_NO_DIRTY_ATTRIBUTES = MappingProxyType(dict())
+
+
+class AttributeMeta(object):
+    """
+    Flags of an entity attribute derived once from its TypeInfo, along with the handler its writes go through.
+    """
+
+    def __init__(self, name, type_info):
+        self.name = name
+        self.type_info = type_info
+        self.many = type_info.many
+        self.mapped = type_info.mapped
+        self.hidden = type_info.hidden
+        self.is_one_of = type_info.one_of is not None
+        class_obj = type_info.class_obj
+        is_class = inspect.isclass(class_obj)
+        self.is_entity = is_class and issubclass(class_obj, BaseEntity)
+        self.is_enum = is_class and issubclass(class_obj, BaseEnum)
+        self.is_value_object = is_class and issubclass(class_obj, ValueObject)
+        self.tracks_dirty = (
+            self.many or self.mapped or self.is_entity or (is_class and issubclass(class_obj, MutableValueObject))
+        )
+        self.has_data = self.many or self.is_entity
+        self.class_obj = class_obj
+        self.allow_none = type_info.allow_none
+        self.checks_type = is_class and not self.many and not self.mapped
+        self.requires_value = is_class and not self.allow_none and self.is_entity
+        self.is_shallow_locked = is_class and issubclass(class_obj, (BaseEntity, EntitySetObject))
+        if self.is_enum:
+            self.core_type = CoreDataTypes.ENUM
+        elif hasattr(class_obj, "core_type"):
+            self.core_type = class_obj.core_type
+        else:
+            self.core_type = getattr(class_obj, "__name__", None)
+        if name == "version":
+            self.write = BaseEntity._write_read_only
+        elif self.many or self.mapped:
+            self.write = BaseEntity._write_collection
+        elif self.is_entity:
+            self.write = BaseEntity._write_entity
+        else:
+            self.write = BaseEntity._write_value
+
+
+class EntityMeta(object):
+    """
+    Attribute metadata of an entity class, built once per class and shared by all its instances.
+    """
+
+    def __init__(self, entity_class):
+        self.entity_class = entity_class
+        attributes = dict()
+        for key, type_info in entity_class._get_dict_attributes().items():
+            if isinstance(type_info, TypeInfo):
+                attributes[key] = type_info
+        declared_attributes = list(attributes.values())
+        attributes["deleted"] = TypeInfo(bool, required=False, default=False)
+        attributes["version"] = TypeInfo(int, required=False, default=1)
+        if entity_class.is_multi_tenant:
+            attributes["tenant_id"] = TypeInfo(str, required=True)
+        self.attributes = attributes
+        self.attribute_metas = {key: AttributeMeta(key, type_info) for key, type_info in attributes.items()}
+        self.primary_keys = [key for key, type_info in attributes.items() if type_info.primary_key]
+        self.one_of_attributes = [key for key, type_info in attributes.items() if type_info.one_of]
+        self.one_of_selector_keys = {attributes[key].one_of.selector_key for key in self.one_of_attributes}
+        self._resolved_attributes = dict()
+        self.child_entities = list()
+        for type_info in declared_attributes:
+            for class_obj in type_info.get_class_objects():
+                if inspect.isclass(class_obj) and issubclass(class_obj, BaseEntity):
+                    self.child_entities.append(class_obj)
 
-class BaseEntity(object):
+    @property
+    def primary_key(self):
+        if len(self.primary_keys) > 1:
+            raise AttributeError("%s can have only one primary key." % self.entity_class.__name__)
+        if not self.primary_keys:
+            raise AttributeError("%s has no primary key defined." % self.entity_class.__name__)
+        return self.primary_keys[0]
+
+    def resolve(self, kwargs):
+        """
+        Returns the attribute type info and attribute meta maps to be used by an instance built from kwargs.
+
+        One-of attributes are resolved against their selector values and the resolved maps are cached per selector
+        values. The returned maps are shared and must not be modified.
+        """
+        if not self.one_of_attributes or not kwargs:
+            return self.attributes, self.attribute_metas
+        selector_values = tuple(self.attributes[key].get_one_of_selector_value(kwargs) for key in self.one_of_attributes)
+        resolved = self._resolved_attributes.get(selector_values)
+        if resolved is None:
+            attributes = self.attributes.copy()
+            attribute_metas = self.attribute_metas.copy()
+            for key, selector_value in zip(self.one_of_attributes, selector_values):
+                type_info = self.attributes[key].resolve_one_of(selector_value)
+                attributes[key] = type_info
+                attribute_metas[key] = AttributeMeta(key, type_info)
+            resolved = (attributes, attribute_metas)
+            self._resolved_attributes[selector_values] = resolved
+        return resolved
+
+
+class BaseEntity(ChangeNotifier):
 
     _init_done = False
     _initialized = False
@@ -26,6 +134,12 @@ class BaseEntity(object):
     _primary_key = None
     _state_machine = None
     _is_shallow = False
+    _loaded_attributes = None
+    _dirty = _NO_DIRTY_ATTRIBUTES
+    # Attributes whose values told the entity they have changes, see ChangeNotifier.
+    _dirty_children = frozenset()
+    _attributes_type_info = None
+    _attribute_metas = None
     _id_prefix = ""
     _actions = None
     _parent_attributes = None
@@ -36,6 +150,12 @@ class BaseEntity(object):
     def get_attribute_type_info(self):
         return self._attributes_type_info
 
+    def get_attribute_metas(self):
+        return self._attribute_metas
+
+    def get_dirty_attributes(self):
+        return self._dirty.keys()
+
     @classmethod
     def _get_dict_attributes(cls):
         attributes = dict()
@@ -44,6 +164,17 @@ class BaseEntity(object):
             attributes.update(cls._parent_attributes)
         return attributes
 
+    @classmethod
+    def get_entity_meta(cls):
+        entity_meta = cls.__dict__.get("_entity_meta")
+        if entity_meta is None:
+            entity_meta = EntityMeta(cls)
+            cls._entity_meta = entity_meta
+            # Instances without one-of attributes use the class maps instead of holding references of their own.
+            cls._attributes_type_info = entity_meta.attributes
+            cls._attribute_metas = entity_meta.attribute_metas
+        return entity_meta
+
     @classmethod
     def get_primary_key(cls):
         cls._init_primary_key()
@@ -51,28 +182,12 @@ class BaseEntity(object):
 
     @classmethod
     def get_attributes(cls, args=None):
-        attributes_type_info = dict()
-        for key, type_info in cls._get_dict_attributes().items():
-            if isinstance(type_info, TypeInfo):
-                if args:
-                    type_info.set_class_obj_for_one_of(args)
-                attributes_type_info[key] = type_info
-        attributes_type_info["deleted"] = TypeInfo(bool, required=False, default=False)
-        attributes_type_info["version"] = TypeInfo(int, required=False, default=1)
-        if cls.is_multi_tenant:
-            attributes_type_info["tenant_id"] = TypeInfo(str, required=True)
-        return attributes_type_info
+        attributes_type_info, _ = cls.get_entity_meta().resolve(args)
+        return dict(attributes_type_info)
 
     @classmethod
     def get_child_entities(cls):
-        child_entities = list()
-        for key, type_info in cls._get_dict_attributes().items():
-            if isinstance(type_info, TypeInfo):
-                class_objs = type_info.get_class_objects()
-                for class_obj in class_objs:
-                    if issubclass(class_obj, BaseEntity):
-                        child_entities.append(class_obj)
-        return child_entities
+        return list(cls.get_entity_meta().child_entities)
 
     @classmethod
     def get_id_prefix(cls):
@@ -80,69 +195,109 @@ class BaseEntity(object):
 
     @classmethod
     def _init_primary_key(cls):
-        if cls._primary_key:
+        if "_primary_key" in cls.__dict__:
             return
-        primary_key = None
-        for key, type_info in cls._get_dict_attributes().items():
-            if isinstance(type_info, TypeInfo):
-                if type_info.primary_key:
-                    if primary_key:
-                        raise AttributeError("%s can have only one primary key." % cls.__name__)
-                    primary_key = key
-        if not primary_key:
-            raise AttributeError("%s has no primary key defined." % cls.__name__)
-        cls._primary_key = primary_key
+        cls._primary_key = cls.get_entity_meta().primary_key
 
     def __init__(self, **kwargs):
+        is_shallow = False
+        if "is_shallow" in kwargs and "is_shallow" not in type(self).get_entity_meta().attribute_metas:
+            is_shallow = kwargs.pop("is_shallow")
+        self._init_attributes(kwargs, is_shallow)
+        self.init(**kwargs)
+
+    @classmethod
+    def from_store(cls, values, is_shallow=False, loaded_attributes=None):
+        """
+        Builds an entity read from a store, for loaders only. Its attribute values are set as the constructor sets
+        them, init is called with them, but the subclass constructors are not.
+        :param values: dict of the attribute values read
+        :param is_shallow: whether the child entities were not read
+        :param loaded_attributes: names of the only attributes read, None when all of them were
+        :return:
+        """
+        entity = cls.__new__(cls)
+        entity._init_attributes(values, is_shallow, loaded_attributes)
+        entity.init(**values)
+        return entity
+
+    def _init_attributes(self, kwargs, is_shallow, loaded_attributes=None):
         cls_ = type(self)
         cls_._init_primary_key()
-        self._attributes_type_info = cls_.get_attributes(kwargs)
-        class_attr_copy = self._attributes_type_info.copy()
-        if "is_shallow" in kwargs:
-            self._is_shallow = kwargs.pop("is_shallow", False)
+        entity_meta = cls_.get_entity_meta()
+        instance_dict = self.__dict__
+        if entity_meta.one_of_attributes:
+            attributes_type_info, attribute_metas = entity_meta.resolve(kwargs)
+            instance_dict["_attributes_type_info"] = attributes_type_info
+            instance_dict["_attribute_metas"] = attribute_metas
+        else:
+            attribute_metas = entity_meta.attribute_metas
+        values = dict()
         for arg, value in kwargs.items():
-            type_info = class_attr_copy.pop(arg, None)
-            if not type_info:
+            attribute_meta = attribute_metas.get(arg)
+            if not attribute_meta:
                 raise InvalidStateException(description="Entity {} got invalid keyword argument: {}".format(self.__class__.__name__, arg))
-            if type_info.setter and not type_info.many:
+            type_info = attribute_meta.type_info
+            if type_info.setter and not attribute_meta.many:
                 value = type_info.setter(value)
-            self._validate_attribute(arg, value, type_info)
-            if type_info.many:
-                if issubclass(type_info.class_obj, BaseEntity):
-                    value = EntitySetObject(type_info.class_obj, value, type_info.more_attr) if not self._is_shallow else None
+            if attribute_meta.many and isinstance(value, EntitySetObject):
+                # Built by the loader already, possibly fetching its items lazily.
+                values[arg] = value
+                continue
+            self._validate_attribute(arg, value, type_info, is_shallow)
+            if attribute_meta.many:
+                if attribute_meta.is_entity:
+                    value = EntitySetObject(type_info.class_obj, value, type_info.more_attr) if not is_shallow else None
                 else:
                     if type_info.unique:
                         value = SetObject(type_info.class_obj, value)
                     else:
                         value = ListObject(type_info.class_obj, value)
-            elif type_info.mapped:
+            elif attribute_meta.mapped:
                 value = MapObject(type_info.class_obj, value)
-            setattr(self, arg, value)
-        for arg, type_info in class_attr_copy.items():
-            if type_info.many:
-                if issubclass(type_info.class_obj, BaseEntity):
+            values[arg] = value
+        # Values are set in attribute order so that all instances of the class share the keys of their dicts.
+        for arg, attribute_meta in attribute_metas.items():
+            if arg in values:
+                value = values[arg]
+                instance_dict[arg] = value
+                if attribute_meta.tracks_dirty and value is not None:
+                    value.set_owner(self, arg)
+                continue
+            type_info = attribute_meta.type_info
+            if attribute_meta.many:
+                if attribute_meta.is_entity:
                     value = EntitySetObject(type_info.class_obj)
                 else:
                     if type_info.unique:
                         value = SetObject(type_info.class_obj)
                     else:
                         value = ListObject(type_info.class_obj)
-            elif type_info.mapped:
+            elif attribute_meta.mapped:
                 value = MapObject(type_info.class_obj, dict())
             elif arg == "tenant_id":
                 value = get_tenant_id()
             else:
                 value = type_info.get_default_value()
-            setattr(self, arg, value)
-        self._dirty = dict()
+            instance_dict[arg] = value
+            if attribute_meta.tracks_dirty and value is not None:
+                value.set_owner(self, arg)
+        if is_shallow:
+            self._is_shallow = True
+        if loaded_attributes is not None:
+            self._loaded_attributes = frozenset(loaded_attributes)
+        # Set before any write or load adds them, for the same reason as above.
+        instance_dict["_version_updated"] = True
+        instance_dict["_persisted_version"] = None
         self._initialized = True
-        self.init(**kwargs)
 
-    def _validate_attribute(self, key, value, type_info):
+    def _validate_attribute(self, key, value, type_info, is_shallow=None):
         if not type_info:
             raise TypeError("%r is an invalid keyword argument for %s" % (key, self.__class__.__name__))
+        if is_shallow is None:
+            is_shallow = self._is_shallow
         if not value:
-            if not type_info.allow_none and not self._is_shallow and issubclass(type_info.class_obj, BaseEntity):
+            if not type_info.allow_none and not is_shallow and issubclass(type_info.class_obj, BaseEntity):
                 raise TypeError("%r cannot be none for %s" % (key, self.__class__.__name__))
         elif not type_info.many and not type_info.mapped:
             # TODO:: Add strict flag or covert in the fly
@@ -150,38 +305,72 @@ class BaseEntity(object):
                 raise TypeError("%r is invalid value for %s for %s" % (value, key, self.__class__.__name__))
 
     def __setattr__(self, name, value):
-        if self._initialized and not name.startswith("_") and name not in ["deleted"]:
-            if name in ["version"]:
-                raise AttributeError("version is a ready-only attribute")
-            type_info = self._attributes_type_info.get(name)
-            self._validate_attribute(name, value, type_info)
-
-            if self._is_shallow and issubclass(type_info.class_obj, (BaseEntity, EntitySetObject)):
-                raise AttributeError("Cannot update value of %s as its shallow" % self.__class__.__name__)
-
-            old = getattr(self, name)
-
-            if old is not None:
-                if isinstance(old, BaseEntity):
-                    raise AttributeError(
-                        "Cannot update value of %s type attribute in %s" % (type(type_info.class_obj.__name__), self.__class__.__name__)
-                    )
-                elif isinstance(old, (EntitySetObject, ListObject, SetObject, MapObject)):
-                    old.update(value)
-                    return
-            dirty_entry = self._dirty.get(name)
-            if dirty_entry:
-                old = dirty_entry.get("old")
-            if issubclass(type_info.class_obj, BaseEnum):
-                core_type = CoreDataTypes.ENUM
-            elif hasattr(type_info.class_obj, "core_type"):
-                core_type = type_info.class_obj.core_type
-            else:
-                core_type = type_info.class_obj.__name__
-            self._dirty[name] = dict(type=core_type, data=dict(old=old, new=value))
-            self.update_version()
+        if self._initialized and name[0] != "_" and name != "deleted":
+            attribute_meta = self._attribute_metas.get(name)
+            if attribute_meta is None:
+                raise TypeError("%r is an invalid keyword argument for %s" % (name, self.__class__.__name__))
+            attribute_meta.write(self, attribute_meta, value)
+            return
         self.__dict__[name] = value
 
+    def _check_write(self, attribute_meta, value):
+        if not value:
+            if attribute_meta.requires_value and not self._is_shallow:
+                raise TypeError("%r cannot be none for %s" % (attribute_meta.name, self.__class__.__name__))
+        elif attribute_meta.checks_type:
+            class_obj = attribute_meta.class_obj
+            if type(value) is not class_obj and not isinstance(value, class_obj):
+                raise TypeError("%r is invalid value for %s for %s" % (value, attribute_meta.name, self.__class__.__name__))
+        if attribute_meta.is_shallow_locked and self._is_shallow:
+            raise AttributeError("Cannot update value of %s as its shallow" % self.__class__.__name__)
+        if self._loaded_attributes is not None and attribute_meta.name not in self._loaded_attributes:
+            raise AttributeError("Cannot update %s of %s as it was not loaded" % (attribute_meta.name, self.__class__.__name__))
+
+    def _write_read_only(self, attribute_meta, value):
+        raise AttributeError("%s is a ready-only attribute" % attribute_meta.name)
+
+    def _write_collection(self, attribute_meta, value):
+        self._check_write(attribute_meta, value)
+        old = self.__dict__[attribute_meta.name]
+        if old is not None:
+            old.update(value)
+            return
+        self._write_dirty(attribute_meta, old, value)
+
+    def _write_entity(self, attribute_meta, value):
+        self._check_write(attribute_meta, value)
+        old = self.__dict__[attribute_meta.name]
+        if old is not None:
+            raise AttributeError(
+                "Cannot update value of %s type attribute in %s" % (attribute_meta.class_obj.__name__, self.__class__.__name__)
+            )
+        self._write_dirty(attribute_meta, old, value)
+        if value is not None:
+            value.set_owner(self, attribute_meta.name)
+
+    def _write_value(self, attribute_meta, value):
+        self._check_write(attribute_meta, value)
+        self._write_dirty(attribute_meta, self.__dict__[attribute_meta.name], value)
+        if attribute_meta.tracks_dirty and value is not None:
+            value.set_owner(self, attribute_meta.name)
+
+    def _write_dirty(self, attribute_meta, old, value):
+        instance_dict = self.__dict__
+        name = attribute_meta.name
+        dirty = self._dirty
+        if dirty is _NO_DIRTY_ATTRIBUTES:
+            dirty = instance_dict["_dirty"] = dict()
+            self.notify_owner()
+        else:
+            dirty_entry = dirty.get(name)
+            if dirty_entry:
+                old = dirty_entry["data"]["old"]
+        dirty[name] = dict(type=attribute_meta.core_type, data=dict(old=old, new=value))
+        if not self._version_updated:
+            instance_dict["version"] += 1
+            instance_dict["_version_updated"] = True
+        instance_dict[name] = value
+
     def update(self, update_data):
         for key, value in update_data.items():
             setattr(self, key, value)
@@ -199,51 +388,81 @@ class BaseEntity(object):
     def reset_version_lock(self):
         self._version_updated = False
 
+    @property
+    def persisted_version(self):
+        """
+        Version of the entity as last read from or written to the store, None when it was never persisted
+        """
+        return self.__dict__.get("_persisted_version")
+
+    def mark_persisted(self):
+        self.__dict__["_persisted_version"] = self.version
+
+    def commit_changes(self):
+        """
+        Forgets the changes tracked in the entity tree once they were written, the entity is then as if it was loaded
+        with its current values. Only the changed children are visited, except for an entity which was never
+        persisted, all of its tree is new.
+        :return:
+        """
+        instance_dict = self.__dict__
+        attribute_metas = self._attribute_metas
+        if self.persisted_version is None:
+            changed_attributes = attribute_metas
+        else:
+            changed_attributes = set(self._dirty).union(self._dirty_children)
+        for arg in changed_attributes:
+            attribute_meta = attribute_metas.get(arg)
+            if attribute_meta is not None and attribute_meta.tracks_dirty:
+                value = instance_dict.get(arg)
+                if value is not None:
+                    value.commit_changes()
+        instance_dict.pop("_dirty", None)
+        instance_dict.pop("_dirty_children", None)
+        self.reset_version_lock()
+        self.mark_persisted()
+
     def init(self, **kwargs):
         pass
 
+    def child_changed(self, key):
+        dirty_children = self._dirty_children
+        if key in dirty_children:
+            return
+        if not dirty_children:
+            dirty_children = self.__dict__["_dirty_children"] = set()
+        dirty_children.add(key)
+        self.notify_owner()
+
     @property
     def is_dirty(self):
         if self._dirty:
             return True
-        for arg, type_info in self._attributes_type_info.items():
-            value = getattr(self, arg)
-            if value is not None and isinstance(
-                value,
-                (
-                    BaseEntity,
-                    ListObject,
-                    SetObject,
-                    EntitySetObject,
-                    MutableValueObject,
-                    MapObject,
-                ),
-            ):
-                if value.is_dirty:
-                    return True
+        instance_dict = self.__dict__
+        for arg in self._dirty_children:
+            value = instance_dict.get(arg)
+            if value is not None and value.is_dirty:
+                return True
         return False
 
     def dirty(self):
+        own_dirty = self._dirty
+        dirty_children = self._dirty_children
+        if not own_dirty and not dirty_children:
+            return None
         dirty_dict = dict(id=self.primary_id, type=self.core_type.value, name=self.entity_name())
         data = dict()
-        for arg, type_info in self._attributes_type_info.items():
-            value = getattr(self, arg)
-            if value and isinstance(
-                value,
-                (
-                    BaseEntity,
-                    ListObject,
-                    SetObject,
-                    EntitySetObject,
-                    MutableValueObject,
-                    MapObject,
-                ),
-            ):
-                arg_dirty_dict = value.dirty()
+        instance_dict = self.__dict__
+        for arg, attribute_meta in self._attribute_metas.items():
+            if arg not in own_dirty and arg not in dirty_children:
+                continue
+            value = instance_dict.get(arg)
+            if attribute_meta.tracks_dirty and value is not None:
+                arg_dirty_dict = value.dirty() if arg in dirty_children else None
                 if arg_dirty_dict:
                     data[arg] = arg_dirty_dict
             else:
-                dirty_val = self._dirty.get(arg)
+                dirty_val = own_dirty.get(arg)
                 if dirty_val:
                     data[arg] = dirty_val
         if not data:
@@ -255,18 +474,19 @@ class BaseEntity(object):
     def dict(self):
         self.update_version()
         response = dict()
-        for arg, type_info in self._attributes_type_info.items():
+        for arg in self._attribute_metas:
             response[arg] = getattr(self, arg)
         return response
 
     def data(self):
         self.update_version()
         response = dict()
-        for arg, type_info in self._attributes_type_info.items():
-            if type_info.hidden:
+        loaded_attributes = self._loaded_attributes
+        for arg, attribute_meta in self._attribute_metas.items():
+            if attribute_meta.hidden or (loaded_attributes is not None and arg not in loaded_attributes):
                 continue
             obj = getattr(self, arg)
-            if isinstance(obj, (BaseEntity, IterBase)):
+            if attribute_meta.has_data and obj is not None:
                 obj = obj.data()
             response[arg] = obj
         response.pop("deleted", None)
@@ -274,15 +494,24 @@ class BaseEntity(object):
         if additional_attributes:
             response.update(additional_attributes)
         if self.state_machine_factory is not None:
-            if not self._state_machine:
-                self._state_machine = self.state_machine_factory.build(self)
-            response["transitions"] = self._state_machine.get_visible_transitions()
+            response["transitions"] = self.state_machine_factory.get_visible_transitions()
         return response
 
     @property
     def primary_key(self):
         return self._primary_key
 
+    @property
+    def is_partial(self):
+        """
+        True when only some of the attributes were loaded, the others can't be updated
+        """
+        return self._loaded_attributes is not None
+
+    @property
+    def loaded_attributes(self):
+        return self._loaded_attributes
+
     @property
     def primary_id(self):
         return getattr(self, self._primary_key)
@@ -296,14 +525,18 @@ class BaseEntity(object):
 
     def delete(self):
         self.deleted = True
-        for arg, type_info in self._attributes_type_info.items():
+        for arg, attribute_meta in self._attribute_metas.items():
+            if not attribute_meta.is_entity:
+                continue
             value = getattr(self, arg)
-            if value and isinstance(value, (BaseEntity, EntitySetObject)):
+            if value:
                 value.delete()
 
     def update_one_of_attribute(self, selector_update, attribute_update):
         setattr(self, selector_update[0], selector_update[1])
-        self._attributes_type_info[attribute_update[0]].set_class_obj_for_one_of(dict([selector_update]))
+        entity_meta = self.get_entity_meta()
+        selectors = {key: getattr(self, key) for key in entity_meta.one_of_selector_keys}
+        self._attributes_type_info, self._attribute_metas = entity_meta.resolve(selectors)
         setattr(self, attribute_update[0], attribute_update[1])
 
     @property
@@ -332,7 +565,7 @@ class BaseEntity(object):
             self.action_log.add(action_request)
         old_state = getattr(self, self._state_machine.state_key)
         try:
-            getattr(self._state_machine, action_request.action.value)()
+            self._state_machine.trigger(action_request.action)
         except MachineError as e:
             raise ValidationException(message="Invalid state transition", description=str(e))
         self._actions.append(
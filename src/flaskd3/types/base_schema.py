@@ -9,12 +9,8 @@ from flaskd3.types.base_entity import BaseEntity
 from flaskd3.types.base_enum import BaseEnum
 from flaskd3.types.value_object import BitMaskValueObject, ValueObject
 from flaskd3.common.exceptions import InvalidStateException
-from flaskd3.common.utils.common_utils import (
-    convert_key_to_camel_case,
-    convert_key_to_snake_case,
-    to_camel_case,
-)
-from flaskd3.common.utils.json_utils import make_jsonify_ready
+from flaskd3.common.utils.common_utils import convert_key_to_snake_case, to_camel_case
+from flaskd3.common.utils.json_utils import make_camel_case_jsonify_ready
 
 
 class BaseSchema(Schema):
@@ -94,7 +90,7 @@ class EnumField(fields.Field):
 #@ma_plugin.map_to_openapi_type(fields.Raw)
 class RawField(fields.Field):
     def _serialize(self, value, attr, data, **kwargs):
-        return convert_key_to_camel_case(make_jsonify_ready(value))
+        return make_camel_case_jsonify_ready(value)
 
     def _deserialize(self, value, attr, data, **kwargs):
         return convert_key_to_snake_case(value)
@@ -0,0 +1,33 @@
+class ChangeNotifier(object):
+    """
+    Base of the objects whose changes are tracked inside an entity. The object holding one, its owner, is told when
+    it gets changes, so owners know which of their children to look at instead of checking all of them.
+    """
+
+    _owner = None
+    _owner_key = None
+
+    def set_owner(self, owner, key):
+        """
+        :param owner: entity or collection holding this object, its child_changed(key) is called on changes
+        :param key: key of this object in owner
+        :return:
+        """
+        self._owner = owner
+        self._owner_key = key
+        if self.is_dirty:
+            owner.child_changed(key)
+
+    def notify_owner(self):
+        owner = self._owner
+        if owner is not None:
+            owner.child_changed(self._owner_key)
+
+    def child_changed(self, key):
+        self.notify_owner()
+
+    def commit_changes(self):
+        """
+        Forgets the changes tracked so far, called once they were written to the store
+        :return:
+        """
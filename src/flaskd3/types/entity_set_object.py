@@ -9,22 +9,26 @@ from flaskd3.types.base_enum import BaseEnum
 
 
 class EntitySetObject(IterBase):
+    """
+    Set of child entities keyed by primary id. Live items, the ids of those added since the set was loaded and the
+    removed loaded items are kept apart, so reading the live items never goes through the removed ones.
+    """
 
     core_type = CoreDataTypes.ENTITY_LIST
 
+    # Ids of the loaded items which reported changes of their own, in the order they changed.
+    _changed_ids = None
+
     class EntryType(BaseEnum):
         NEW = "new"
         DELETED = "deleted"
         OLD = "old"
 
-    class ItemEntry(object):
-        def __init__(self, item, entry_type):
-            self.item = item
-            self.entry_type = entry_type
-
     def __init__(self, class_obj, items=None, more_attr=None):
         self._class_obj = class_obj
         self._items = dict()
+        self._new_ids = dict()
+        self._deleted = dict()
         self._max_id_salt = 0
         if more_attr:
             self.id_parts = more_attr.get("id_parts")
@@ -32,6 +36,9 @@ class EntitySetObject(IterBase):
                 self.id_parts = 2
         else:
             self.id_parts = 2
+        self._init_items(items)
+
+    def _init_items(self, items):
         if items:
             for item in items:
                 if not isinstance(item, self._class_obj):
@@ -41,15 +48,11 @@ class EntitySetObject(IterBase):
                     self._max_id_salt = max(id_salt, self._max_id_salt)
                 else:
                     self._max_id_salt += 1
-                self._items[item.primary_id] = EntitySetObject.ItemEntry(item, EntitySetObject.EntryType.OLD)
+                self._items[item.primary_id] = item
+                item.set_owner(self, item.primary_id)
 
     def get(self, primary_id):
-        entry = self._items.get(primary_id)
-        if not entry:
-            return None
-        if entry and entry.entry_type == EntitySetObject.EntryType.DELETED:
-            return None
-        return entry.item
+        return self._items.get(primary_id)
 
     def add(self, item):
         if isinstance(item, dict):
@@ -60,16 +63,16 @@ class EntitySetObject(IterBase):
             raise AttributeError("Items can only be of type %s in ListObject" % self._class_obj.__name__)
         self._max_id_salt += 1
         primary_id = item.primary_id
-        entry = self._items.get(primary_id)
-        if entry:
-            if entry.entry_type in [
-                EntitySetObject.EntryType.OLD,
-                EntitySetObject.EntryType.NEW,
-            ]:
-                raise ValueError("Item already present in the list")
-            entry.entry_type = EntitySetObject.EntryType.OLD
+        if primary_id in self._items:
+            raise ValueError("Item already present in the list")
+        if self._deleted.pop(primary_id, None) is None:
+            self._new_ids[primary_id] = True
         else:
-            self._items[primary_id] = EntitySetObject.ItemEntry(item, EntitySetObject.EntryType.NEW)
+            # Adding back a removed loaded item undoes its removal, its row was never touched.
+            item.deleted = False
+        self._items[primary_id] = item
+        item.set_owner(self, primary_id)
+        self.notify_owner()
         return item
 
     @property
@@ -77,49 +80,39 @@ class EntitySetObject(IterBase):
         return self._max_id_salt
 
     def remove(self, item_id):
-        entry = self._items.get(item_id)
-        if not entry:
+        item = self._items.pop(item_id, None)
+        if item is None:
             raise ValueError("Item not present in the list")
-        if entry.entry_type == EntitySetObject.EntryType.NEW:
-            self._items[item_id] = None
-        else:
-            entry.item.delete()
-            entry.entry_type = EntitySetObject.EntryType.DELETED
-        return entry.item
+        if self._new_ids.pop(item_id, None) is None:
+            item.delete()
+            self._deleted[item_id] = item
+        self.notify_owner()
+        return item
 
     def remove_missing(self, id_set):
-        key_ids = list(self._items.keys())
-        for i in key_ids:
-            item_obj = self._items.get(i)
-            if item_obj.entry_type != EntitySetObject.EntryType.DELETED:
-                if item_obj.item.primary_id not in id_set:
-                    self.remove(item_obj.item.primary_id)
+        for item_id in list(self._items):
+            if item_id not in id_set:
+                self.remove(item_id)
 
     def __iter__(self):
-        for i in self._items.values():
-            if i.entry_type != EntitySetObject.EntryType.DELETED:
-                yield i.item
+        # Over a copy, items may be removed while iterating.
+        return iter(list(self._items.values()))
 
     def get_next_id(self):
         return simple_id_generator(self._max_id_salt + 1, self.id_parts)
 
     def list(self):
-        return [entry.item for entry in self._items.values()]
+        """
+        :return: live items followed by the removed loaded items
+        """
+        return list(self._items.values()) + list(self._deleted.values())
 
     def data(self):
-        data = list()
-        for i in self._items.values():
-            if i.entry_type != EntitySetObject.EntryType.DELETED:
-                data.append(i.item.data())
-        return data
+        return [item.data() for item in self._items.values()]
 
     def clear(self):
-        for entry_id in self._items:
-            if self._items[entry_id].entry_type == EntitySetObject.EntryType.NEW:
-                self._items[entry_id] = None
-            else:
-                self._items[entry_id].item.delete()
-                self._items[entry_id].entry_type = EntitySetObject.EntryType.DELETED
+        for item_id in list(self._items):
+            self.remove(item_id)
 
     def update(self, update_data):
         primary_key = self._class_obj.get_primary_key()
@@ -135,34 +128,58 @@ class EntitySetObject(IterBase):
             id_set.add(item_id)
         self.remove_missing(id_set)
 
+    def child_changed(self, key):
+        if self._changed_ids is None:
+            self._changed_ids = dict()
+        if key not in self._changed_ids:
+            self._changed_ids[key] = True
+            self.notify_owner()
+
+    def commit_changes(self):
+        # Items added since the set was loaded are written as a whole, their own tracking goes too.
+        for item_id in self._new_ids:
+            self._items[item_id].commit_changes()
+        for item_id in self._changed_ids or ():
+            item = self._items.get(item_id)
+            if item is not None:
+                item.commit_changes()
+        self._new_ids = dict()
+        self._deleted = dict()
+        self.__dict__.pop("_changed_ids", None)
+
+    def _changed_items(self):
+        if not self._changed_ids:
+            return
+        for item_id in self._changed_ids:
+            item = self._items.get(item_id)
+            if item is not None and item_id not in self._new_ids and item.is_dirty:
+                yield item
+
     @property
     def is_dirty(self):
-        for entry in self._items.values():
-            if entry.entry_type in [
-                EntitySetObject.EntryType.NEW,
-                EntitySetObject.EntryType.DELETED,
-            ]:
-                return True
-            if entry.item.is_dirty:
-                return True
+        if self._new_ids or self._deleted:
+            return True
+        for _ in self._changed_items():
+            return True
         return False
 
+    def get_changes(self):
+        """
+        :return: (added, deleted, updated) items, updated are the kept items with changes of their own
+        """
+        added = [self._items[item_id] for item_id in self._new_ids]
+        return added, list(self._deleted.values()), list(self._changed_items())
+
     def delete(self):
         self.clear()
 
     def dirty(self):
-        added = []
-        deleted = []
+        added, deleted, updated_items = self.get_changes()
         updated = []
-        for entry in self._items.values():
-            if entry.entry_type == EntitySetObject.EntryType.NEW:
-                added.append(entry.item)
-            elif entry.entry_type == EntitySetObject.EntryType.DELETED:
-                deleted.append(entry.item)
-            else:
-                dirty = entry.item.dirty()
-                if dirty:
-                    updated.append(dirty)
+        for item in updated_items:
+            dirty = item.dirty()
+            if dirty:
+                updated.append(dirty)
         if not added and not deleted and not updated:
             return None
         return dict(
@@ -171,8 +188,74 @@ class EntitySetObject(IterBase):
         )
 
     def __len__(self):
-        size = 0
-        for i in self._items.values():
-            if i.entry_type != EntitySetObject.EntryType.DELETED:
-                size += 1
-        return size
+        return len(self._items)
+
+
+class LazyEntitySetObject(EntitySetObject):
+    """
+    EntitySetObject whose items are fetched with loader the first time they are read or changed. Until then it has
+    no changes to be persisted.
+    """
+
+    def __init__(self, class_obj, loader, more_attr=None):
+        super(LazyEntitySetObject, self).__init__(class_obj, None, more_attr)
+        self._loader = loader
+
+    @property
+    def is_loaded(self):
+        return self._loader is None
+
+    def _load(self):
+        if self._loader is not None:
+            loader = self._loader
+            self._loader = None
+            self._init_items(loader())
+
+    def get(self, primary_id):
+        self._load()
+        return super(LazyEntitySetObject, self).get(primary_id)
+
+    def add(self, item):
+        self._load()
+        return super(LazyEntitySetObject, self).add(item)
+
+    @property
+    def max_salt(self):
+        self._load()
+        return self._max_id_salt
+
+    def remove(self, item_id):
+        self._load()
+        return super(LazyEntitySetObject, self).remove(item_id)
+
+    def remove_missing(self, id_set):
+        self._load()
+        super(LazyEntitySetObject, self).remove_missing(id_set)
+
+    def __iter__(self):
+        self._load()
+        return super(LazyEntitySetObject, self).__iter__()
+
+    def get_next_id(self):
+        self._load()
+        return super(LazyEntitySetObject, self).get_next_id()
+
+    def list(self):
+        self._load()
+        return super(LazyEntitySetObject, self).list()
+
+    def data(self):
+        self._load()
+        return super(LazyEntitySetObject, self).data()
+
+    def clear(self):
+        self._load()
+        super(LazyEntitySetObject, self).clear()
+
+    def update(self, update_data):
+        self._load()
+        super(LazyEntitySetObject, self).update(update_data)
+
+    def __len__(self):
+        self._load()
+        return super(LazyEntitySetObject, self).__len__()
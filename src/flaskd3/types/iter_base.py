@@ -1,9 +1,10 @@
 import abc
 
 from flaskd3.common.exceptions import InvalidStateException
+from flaskd3.types.change_notifier import ChangeNotifier
 
 
-class IterBase(object):
+class IterBase(ChangeNotifier):
     @abc.abstractmethod
     def add(self, item):
         raise InvalidStateException("add Method Not implemented for Iter object {}".format(self.__class__.__name__))
@@ -32,6 +33,10 @@ class IterBase(object):
     def data(self):
         raise InvalidStateException("data Method Not implemented for Iter object {}".format(self.__class__.__name__))
 
+    @abc.abstractmethod
+    def changes(self):
+        raise InvalidStateException("changes Method Not implemented for Iter object {}".format(self.__class__.__name__))
+
     @property
     def is_dirty(self):
         raise InvalidStateException("is_dirty Method Not implemented for Iter object {}".format(self.__class__.__name__))
@@ -1,3 +1,5 @@
+from collections import Counter
+
 from flaskd3.types.constants import CoreDataTypes
 from flaskd3.types.iter_base import IterBase
 from flaskd3.common.utils.common_utils import convert_to_type
@@ -34,20 +36,22 @@ class ListObject(IterBase):
         else:
             self._new_entries.append(item)
         self._items.append(item)
+        self.notify_owner()
 
     def remove(self, item):
         if not isinstance(item, self._class_obj):
             raise AttributeError("Items can only be of type %s in ListObject" % self._class_obj.__name__)
+        self._items.remove(item)
         try:
             self._new_entries.remove(item)
         except ValueError:
-            self._items.remove(item)
             self._deleted_entries.append(item)
+        self.notify_owner()
 
     def clear(self):
-        self._deleted_entries.clear()
-        self._deleted_entries = self._items
+        self._deleted_entries.extend(self._items)
         self._items = list()
+        self.notify_owner()
 
     def __iter__(self):
         for i in self._items:
@@ -59,6 +63,19 @@ class ListObject(IterBase):
     def data(self):
         return self._items
 
+    def changes(self):
+        """
+        :return: (added, removed) items since the list was created, an item appears as many times as it was added or
+            removed
+        """
+        new_entries = Counter(self._new_entries)
+        deleted_entries = Counter(self._deleted_entries)
+        return list((new_entries - deleted_entries).elements()), list((deleted_entries - new_entries).elements())
+
+    def commit_changes(self):
+        self._new_entries = list()
+        self._deleted_entries = list()
+
     def dirty(self):
         if not self.is_dirty:
             return None
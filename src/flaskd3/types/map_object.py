@@ -1,12 +1,15 @@
 from flaskd3.types.base_enum import BaseEnum
+from flaskd3.types.change_notifier import ChangeNotifier
 from flaskd3.types.constants import CoreDataTypes
 from flaskd3.common.utils.common_utils import convert_to_type
 
 
-class MapObject(object):
+class MapObject(ChangeNotifier):
 
     core_type = CoreDataTypes.MAP
 
+    _changed = False
+
     class EntryType(BaseEnum):
         NEW = "new"
         DELETED = "deleted"
@@ -50,6 +53,7 @@ class MapObject(object):
         else:
             self._meta_data[key] = MapObject.ItemEntry(MapObject.EntryType.UPDATED, self._items[key])
         self._items[key] = value
+        self._on_change()
 
     def __delitem__(self, key):
         item = self._items.get(key)
@@ -58,6 +62,11 @@ class MapObject(object):
         else:
             self._meta_data[key] = MapObject.ItemEntry(MapObject.EntryType.DELETED, item)
             del self._items[key]
+            self._on_change()
+
+    def _on_change(self):
+        self._changed = True
+        self.notify_owner()
 
     def __len__(self):
         return len(self._items)
@@ -66,6 +75,11 @@ class MapObject(object):
         for key, value in self._items.items():
             yield key, value.item
 
+    def commit_changes(self):
+        old_entry = MapObject.ItemEntry(MapObject.EntryType.OLD)
+        self._meta_data = {key: old_entry for key in self._items}
+        self.__dict__.pop("_changed", None)
+
     def dirty(self):
         added = dict()
         deleted = dict()
@@ -85,6 +99,8 @@ class MapObject(object):
 
     @property
     def is_dirty(self):
+        if not self._changed:
+            return False
         dirty = self.dirty()
         return dirty["data"]["deleted"] or dirty["data"]["added"] or dirty["data"]["updated"]
 
@@ -1,4 +1,5 @@
 import abc
+from flaskd3.types.change_notifier import ChangeNotifier
 from flaskd3.types.constants import CoreDataTypes
 from flaskd3.types.list_object import ListObject
 from flaskd3.types.map_object import MapObject
@@ -6,7 +7,7 @@ from flaskd3.types.set_object import SetObject
 from flaskd3.types.value_object import ValueObject
 
 
-class MutableValueObject(ValueObject):
+class MutableValueObject(ValueObject, ChangeNotifier):
 
     core_type = CoreDataTypes.MUTABLE_VALUE_OBJECT
 
@@ -16,10 +17,15 @@ class MutableValueObject(ValueObject):
         return object.__new__(cls)
 
     def __setattr__(self, key, value):
-        if not key.startswith("_"):
-            if self._is_frozen:
-                self._is_dirty = True
+        if key.startswith("_"):
+            object.__setattr__(self, key, value)
+            return
         object.__setattr__(self, key, value)
+        if isinstance(value, ChangeNotifier):
+            value.set_owner(self, key)
+        if self._is_frozen:
+            self._is_dirty = True
+            self.notify_owner()
 
     @property
     def is_dirty(self):
@@ -32,6 +38,12 @@ class MutableValueObject(ValueObject):
                     return True
         return False
 
+    def commit_changes(self):
+        object.__setattr__(self, "_is_dirty", False)
+        for value in self.dict().values():
+            if isinstance(value, ChangeNotifier):
+                value.commit_changes()
+
     def dirty(self):
         if self._is_dirty:
             return self.dict()
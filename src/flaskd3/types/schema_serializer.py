@@ -0,0 +1,140 @@
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+from flaskd3.appcore.core.schema_manager import SchemaManager
+from flaskd3.types.base_enum import BaseEnum
+from flaskd3.types.base_schema import EnumField, RawField
+from flaskd3.common.utils.json_utils import (
+    camel_case_json_ready_converter,
+    json_ready_converter,
+)
+
+
+class SchemaSerializer(object):
+    """
+    Dumps objects with a marshmallow schema straight to JSON ready primitives, giving what
+    make_jsonify_ready(schema.dump(obj)) gives in a single pass. The fields of the schema are compiled once, on the
+    first dump, to the function writing their values, the common field types are written without going through
+    marshmallow and any other field is dumped by the field itself.
+
+    Schemas with pre or post dump hooks or their own get_attribute are dumped by marshmallow and converted after.
+    """
+
+    _serializers = dict()
+
+    def __init__(self, schema_class):
+        self.schema = SchemaManager.get_or_create_schema_obj(schema_class)
+        self._fields = None
+        self._dump_with_schema = False
+
+    @classmethod
+    def for_schema(cls, schema_class):
+        """
+        :param schema_class: marshmallow schema class
+        :return: SchemaSerializer of schema_class, built once per class
+        """
+        serializer = cls._serializers.get(schema_class)
+        if serializer is None:
+            serializer = cls(schema_class)
+            cls._serializers[schema_class] = serializer
+        return serializer
+
+    def _compile(self):
+        schema = self.schema
+        self._dump_with_schema = bool(
+            schema._hooks[PRE_DUMP]
+            or schema._hooks[POST_DUMP]
+            or type(schema).get_attribute is not Schema.get_attribute
+        )
+        compiled_fields = list()
+        if not self._dump_with_schema:
+            for name, field in schema.dump_fields.items():
+                key = field.data_key if field.data_key is not None else name
+                attribute = field.attribute if field.attribute is not None else name
+                if "." in attribute or not field._CHECK_ATTRIBUTE:
+                    attribute = None
+                compiled_fields.append((name, key, attribute, field, self._compile_field(field)))
+        self._fields = compiled_fields
+
+    @classmethod
+    def _compile_field(cls, field):
+        """
+        :param field: bound marshmallow field
+        :return: function(value, attr, obj) writing a value of field as JSON ready primitives
+        """
+        convert = json_ready_converter.convert
+        serialize = field._serialize
+        field_type = type(field)
+
+        def write_value(value, attr, obj):
+            return convert(serialize(value, attr, obj))
+
+        if field_type is fields.String:
+            return lambda value, attr, obj: value if type(value) is str else serialize(value, attr, obj)
+        if field_type is fields.Integer and not field.as_string:
+            return lambda value, attr, obj: value if type(value) is int else serialize(value, attr, obj)
+        if field_type is fields.Float and not field.as_string:
+            return lambda value, attr, obj: value if type(value) is float else serialize(value, attr, obj)
+        if field_type is fields.Boolean:
+            return lambda value, attr, obj: value if type(value) is bool else serialize(value, attr, obj)
+        if field_type is EnumField:
+            if field.many:
+                return write_value
+            return lambda value, attr, obj: value.value if isinstance(value, BaseEnum) else write_value(value, attr, obj)
+        if field_type is RawField:
+            return lambda value, attr, obj: camel_case_json_ready_converter.convert(value)
+        if field_type is fields.List:
+            write_item = cls._compile_field(field.inner)
+            return lambda value, attr, obj: (
+                None if value is None else [write_item(item, attr, obj) for item in value]
+            )
+        if field_type is fields.Nested:
+            nested_schema = field.schema
+            nested = cls.for_schema(type(nested_schema))
+            if list(nested.schema.dump_fields) != list(nested_schema.dump_fields):
+                return write_value
+            if nested_schema.many or field.many:
+                return lambda value, attr, obj: None if value is None else nested.dump_many(value)
+            return lambda value, attr, obj: None if value is None else nested.dump(value)
+        return write_value
+
+    def dump(self, obj):
+        """
+        :param obj: dict or object to dump
+        :return: JSON ready dict of obj, None when it is empty
+        """
+        if self._fields is None:
+            self._compile()
+        if self._dump_with_schema:
+            return json_ready_converter.convert(self.schema.dump(obj))
+        get_attribute = self.schema.get_attribute
+        is_dict = type(obj) is dict
+        data = dict()
+        for name, key, attribute, field, write_value in self._fields:
+            if is_dict and attribute is not None:
+                value = obj.get(attribute, missing)
+            elif attribute is not None:
+                value = field.get_value(obj, name, accessor=get_attribute)
+            else:
+                value = missing
+            if value is missing:
+                # Defaults and fields not reading an attribute are left to the field.
+                value = field.serialize(name, obj, accessor=get_attribute)
+                if value is missing:
+                    continue
+                data[key] = json_ready_converter.convert(value)
+            else:
+                data[key] = write_value(value, name, obj)
+        return data or None
+
+    def dump_many(self, objs):
+        """
+        :param objs: iterable of dicts or objects to dump
+        :return: list of the JSON ready dicts of objs
+        """
+        if self._fields is None:
+            self._compile()
+        if self._dump_with_schema:
+            return json_ready_converter.convert(self.schema.dump(objs, many=True))
+        dump = self.dump
+        return [dump(obj) for obj in objs]
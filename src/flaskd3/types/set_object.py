@@ -7,6 +7,8 @@ class SetObject(IterBase):
 
     core_type = CoreDataTypes.SET
 
+    _changed = False
+
     def __init__(self, class_obj, items=None):
         self._class_obj = class_obj
         self._items = set()
@@ -23,20 +25,24 @@ class SetObject(IterBase):
         if not isinstance(item, self._class_obj):
             raise AttributeError("Items can only be of type %s in SetObject" % self._class_obj.__name__)
         self._items.add(item)
+        self._on_change()
 
     def replace(self, item):
         if not isinstance(item, self._class_obj):
             raise AttributeError("Items can only be of type %s in SetObject" % self._class_obj.__name__)
         self._items.discard(item)
         self._items.add(item)
+        self._on_change()
 
     def remove(self, item):
         if not isinstance(item, self._class_obj):
             raise AttributeError("Items can only be of type %s in SetObject" % self._class_obj.__name__)
         self._items.remove(item)
+        self._on_change()
 
     def discard(self, item):
         self._items.discard(item)
+        self._on_change()
 
     def issubset(self, other):
         if isinstance(other, SetObject):
@@ -68,12 +74,27 @@ class SetObject(IterBase):
 
     def clear(self):
         self._items.clear()
+        self._on_change()
+
+    def _on_change(self):
+        self._changed = True
+        self.notify_owner()
 
     def _compute_dirty(self):
         added = self._items.difference(self._old)
         removed = self._old.difference(self._items)
         return added, removed
 
+    def changes(self):
+        """
+        :return: (added, removed) items since the set was created
+        """
+        return self._compute_dirty()
+
+    def commit_changes(self):
+        self._old = self._items.copy()
+        self.__dict__.pop("_changed", None)
+
     def dirty(self):
         added, removed = self._compute_dirty()
         if not added and not removed:
@@ -82,5 +103,7 @@ class SetObject(IterBase):
 
     @property
     def is_dirty(self):
+        if not self._changed:
+            return False
         added, removed = self._compute_dirty()
         return added or removed
@@ -1,4 +1,6 @@
-from transitions import Machine
+from functools import partial
+
+from transitions.core import MachineError
 
 from flaskd3.types.base_enum import BaseEnum
 from flaskd3.types.type_info import ValueObjectField
@@ -23,29 +25,71 @@ class StateTransition(ValueObject):
         )
 
 
+class StateTransitionTable(object):
+    """
+    Transitions of a state machine compiled once and shared by all the entities using it: the destination of each
+    trigger from each source state and the user roles authorised for each trigger, keyed by values.
+    """
+
+    def __init__(self, transitions):
+        self.transitions = transitions
+        self.visible_transitions = [transition for transition in transitions if not transition.is_hidden]
+        self.authorised_user_roles = dict()
+        self.destinations = dict()
+        for transition in transitions:
+            trigger = transition.trigger.value
+            if trigger not in self.authorised_user_roles:
+                self.authorised_user_roles[trigger] = frozenset(transition.authorised_user_roles.data())
+            for source in transition.source:
+                self.destinations.setdefault((trigger, source.value), transition.destination.value)
+
+    def has_trigger(self, trigger):
+        return trigger in self.authorised_user_roles
+
+
 class StateMachine(object):
-    def __init__(self, state_key, transitions, parent, state_type):
+    """
+    State machine bound to one entity, the state is read from and written to the entity attribute state_key.
+    Triggers are also available as methods named by trigger value.
+    """
+
+    def __init__(self, state_key, table, parent, state_type):
         self.state_key = state_key
-        self.transitions = transitions
+        self.table = table
+        self.transitions = table.transitions
         self.parent = parent
         self.state_type = state_type
-        self._machine = Machine(
-            model=self,
-            states=self.state_type.all(),
-            initial=getattr(self.parent, self.state_key).value,
-            transitions=[entry.parsed_data() for entry in self.transitions],
-            after_state_change="update_state",
-        )
 
-    def update_state(self):
-        setattr(self.parent, self.state_key, self.state_type(self.state))
+    def __getattr__(self, name):
+        table = self.__dict__.get("table")
+        if table is None or not table.has_trigger(name):
+            raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, name))
+        return partial(self.trigger, name)
+
+    @property
+    def state(self):
+        return getattr(self.parent, self.state_key).value
+
+    def trigger(self, trigger):
+        """
+        Moves the entity to the destination of trigger from its current state
+        :param trigger: trigger enum or value
+        :return:
+        """
+        trigger = getattr(trigger, "value", trigger)
+        if not self.table.has_trigger(trigger):
+            raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, trigger))
+        state = self.state
+        destination = self.table.destinations.get((trigger, state))
+        if destination is None:
+            raise MachineError("Can't trigger event %s from state %s!" % (trigger, state))
+        setattr(self.parent, self.state_key, self.state_type(destination))
+        return True
 
     def is_authorised(self, trigger, user_roles=None):
-        transistion = [transistion for transistion in self.transitions if trigger == transistion.trigger]
-        if not transistion:
+        authorised_user_roles = self.table.authorised_user_roles.get(getattr(trigger, "value", trigger))
+        if authorised_user_roles is None:
             raise DCException(description=f"Transition for state {trigger.value} is not present.")
-        transistion = transistion[0]
-        authorised_user_roles = transistion.authorised_user_roles.data()
         if not authorised_user_roles:
             return True
         if not user_roles:
@@ -53,20 +97,31 @@ class StateMachine(object):
         user_role_ids = [user_role.role_id for user_role in user_roles]
         if (SUPER_ADMIN_ROLE_ID in user_role_ids) or (SYSTEM_ROLE_ID in user_role_ids):
             return True
-        return len(authorised_user_roles.intersection(user_role_ids)) > 0
+        return not authorised_user_roles.isdisjoint(user_role_ids)
 
     def get_visible_transitions(self):
-        return [t for t in self.transitions if not t.is_hidden]
+        return list(self.table.visible_transitions)
 
 
 class StateMachineFactory(object):
     def __init__(self, state_key, transitions):
         self.state_key = state_key
         self.transitions = transitions
+        self.table = StateTransitionTable(transitions)
+        self._state_types = dict()
 
-    def build(self, parent):
-        state_type = parent._attributes_type_info[self.state_key].class_obj
-        if not issubclass(state_type, BaseEnum):
-            raise InvalidStateException("State machine key should be of type enum")
+    def get_state_type(self, parent):
+        entity_class = type(parent)
+        state_type = self._state_types.get(entity_class)
+        if state_type is None:
+            state_type = parent.get_attribute_type_info()[self.state_key].class_obj
+            if not issubclass(state_type, BaseEnum):
+                raise InvalidStateException("State machine key should be of type enum")
+            self._state_types[entity_class] = state_type
+        return state_type
 
-        return StateMachine(self.state_key, self.transitions, parent, state_type)
+    def get_visible_transitions(self):
+        return list(self.table.visible_transitions)
+
+    def build(self, parent):
+        return StateMachine(self.state_key, self.table, parent, self.get_state_type(parent))
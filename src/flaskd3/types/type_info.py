@@ -1,4 +1,5 @@
 import inspect
+from copy import copy
 
 from flaskd3.types.base_enum import BaseEnum
 
@@ -43,12 +44,20 @@ class TypeInfo(object):
             value = self.default
         return value
 
-    def set_class_obj_for_one_of(self, kwargs):
-        if self.one_of:
-            value = kwargs[self.one_of.selector_key]
-            if isinstance(value, BaseEnum):
-                value = value.value
-            self.class_obj = self.one_of.mapping[value]
+    def get_one_of_selector_value(self, kwargs):
+        value = kwargs[self.one_of.selector_key]
+        if isinstance(value, BaseEnum):
+            value = value.value
+        return value
+
+    def resolve_one_of(self, selector_value):
+        """
+        Returns a copy of this type info bound to the class mapped to selector_value. The type info declared on the
+        class is never modified so it can be shared across instances and threads.
+        """
+        resolved_type_info = copy(self)
+        resolved_type_info.class_obj = self.one_of.mapping[selector_value]
+        return resolved_type_info
 
     def get_class_objects(self):
         return [self.class_obj] if not self.one_of else self.one_of.mapping.values()
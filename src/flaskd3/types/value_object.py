@@ -1,6 +1,8 @@
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from copy import copy
 from datetime import datetime, time
+from decimal import Decimal
+from enum import Enum
 from functools import wraps
 
 from flaskd3.types.base_enum import BaseEnum
@@ -9,15 +11,87 @@ from flaskd3.types.list_object import ListObject
 from flaskd3.types.map_object import MapObject
 from flaskd3.types.set_object import SetObject
 from flaskd3.types.type_info import ValueObjectField
-from flaskd3.common.exceptions import ValidationException
+from flaskd3.common.exceptions import InvalidStateException, ValidationException
 from flaskd3.common.utils.dateutils import parse_datetime, parse_time
 
 
+_MISSING = object()
+# Types whose equal values are the same value, interning keys hold them as they are along with their type.
+_EXACT_INTERN_TYPES = frozenset([str, int, bool, type(None)])
+
+
+def _intern_value_key(value):
+    """
+    :return: key telling apart values which compare equal but differ, such as 1, 1.0 and True or Decimal("1.0") and
+    Decimal("1.00")
+    :raise TypeError: when the value cannot be keyed that way
+    """
+    value_type = type(value)
+    if value_type in _EXACT_INTERN_TYPES or isinstance(value, Enum):
+        return value_type, value
+    if value_type is Decimal or value_type is float:
+        return value_type, repr(value)
+    if value_type is list or value_type is tuple:
+        return value_type, tuple([_intern_value_key(item) for item in value])
+    raise TypeError("%r cannot be part of an interning key" % value_type)
+
+
+class ValueObjectInternCache(object):
+    """
+    Bounded least recently used map of keys to the shared instances of an interned value object class.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._instances = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        instance = self._instances.get(key)
+        if instance is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._instances.move_to_end(key)
+        except KeyError:
+            pass
+        return instance
+
+    def set(self, key, instance):
+        self._instances[key] = instance
+        while len(self._instances) > self.max_size:
+            try:
+                self._instances.popitem(last=False)
+            except KeyError:
+                break
+
+    def clear(self):
+        self._instances.clear()
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses, size=len(self._instances))
+
+
 class ValueObject(object):
     _is_frozen = False
     _init_overridden = False
     _parent_attributes = None
     core_type = CoreDataTypes.VALUE_OBJECT
+    # Interned classes share one instance per distinct value built through from_dict, their instances must never be
+    # changed. Unless the class compares its instances itself, they are compared and hashed by their fields.
+    interned = False
+    intern_cache_size = 1024
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.interned:
+            if cls.core_type == CoreDataTypes.MUTABLE_VALUE_OBJECT:
+                raise InvalidStateException(description="Mutable value object {} cannot be interned".format(cls.__name__))
+            if cls.__eq__ is object.__eq__:
+                cls.__eq__ = ValueObject._fields_eq
+                cls.__hash__ = ValueObject._fields_hash
 
     @classmethod
     def get_name(cls):
@@ -26,6 +100,17 @@ class ValueObject(object):
 
     @classmethod
     def get_attributes(cls):
+        return dict(cls._get_fields())
+
+    @classmethod
+    def _get_fields(cls):
+        """
+        Fields of the class in declaration order, built once per class and shared by all its instances
+        :return:
+        """
+        fields = cls.__dict__.get("_fields")
+        if fields is not None:
+            return fields
         attributes_type_info = dict()
         attributes = dict()
         attributes.update(cls.__dict__)
@@ -34,8 +119,13 @@ class ValueObject(object):
         for key, field in attributes.items():
             if isinstance(field, ValueObjectField):
                 attributes_type_info[key] = field
+        cls._fields = attributes_type_info
         return attributes_type_info
 
+    @property
+    def _attributes_type_info(self):
+        return type(self)._get_fields()
+
     @staticmethod
     def init_decorator(func):
         @wraps(func)
@@ -55,9 +145,9 @@ class ValueObject(object):
         return instance
 
     def __init__(self, **kwargs):
-        cls_ = type(self)
-        self._attributes_type_info = cls_.get_attributes()
-        class_attr_copy = self._attributes_type_info.copy()
+        fields = type(self)._get_fields()
+        class_attr_copy = fields.copy()
+        attribute_values = dict()
         for arg, value in kwargs.items():
             field_info = class_attr_copy.pop(arg, None)
             if not field_info:
@@ -79,7 +169,7 @@ class ValueObject(object):
                     value = field_info.get_default_value()
                 elif not field_info.allow_none:
                     raise ValidationException("{} cannot be null for {}".format(arg, self.__class__.__name__))
-            setattr(self, arg, value)
+            attribute_values[arg] = value
         for arg, field_info in class_attr_copy.items():
             if field_info.mapped:
                 value = MapObject(field_info.class_obj)
@@ -94,7 +184,10 @@ class ValueObject(object):
                 value = field_info.get_default_value()
             if not value and not field_info.allow_none:
                 raise ValidationException("{} cannot be null for {}".format(arg, self.__class__.__name__))
-            setattr(self, arg, value)
+            attribute_values[arg] = value
+        # Set in declaration order so that all instances of the class share the keys of their attribute dicts.
+        for arg in fields:
+            setattr(self, arg, attribute_values[arg])
         self.init(**kwargs)
         self._is_frozen = True
 
@@ -117,6 +210,68 @@ class ValueObject(object):
             return None
         return field_info.class_obj(value)
 
+    def _field_values(self):
+        fields = type(self)._get_fields()
+        instance_dict = self.__dict__
+        if fields:
+            return tuple(instance_dict[key] for key in fields)
+        return tuple(value for key, value in instance_dict.items() if not key.startswith("_"))
+
+    def _fields_eq(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._field_values() == other._field_values()
+
+    def _fields_hash(self):
+        return hash(self._field_values())
+
+    @classmethod
+    def get_intern_cache(cls):
+        intern_cache = cls.__dict__.get("_intern_cache")
+        if intern_cache is None:
+            intern_cache = ValueObjectInternCache(cls.intern_cache_size)
+            cls._intern_cache = intern_cache
+        return intern_cache
+
+    @classmethod
+    def intern(cls, key, build):
+        """
+        :param key: hashable key of the value, the value is built every time when it is None or not hashable
+        :param build: function building the instance on a miss
+        :return: shared instance of the value
+        """
+        if key is None:
+            return build()
+        intern_cache = cls.get_intern_cache()
+        try:
+            instance = intern_cache.get(key)
+        except TypeError:
+            return build()
+        if instance is None:
+            instance = build()
+            intern_cache.set(key, instance)
+        return instance
+
+    @classmethod
+    def _intern_key(cls, dict_obj):
+        """
+        :return: key of the value, None when it holds values which cannot be keyed and is not interned
+        """
+        try:
+            if not isinstance(dict_obj, dict):
+                return _intern_value_key(dict_obj)
+            fields = cls._get_fields()
+            if fields and dict_obj.keys() <= fields.keys():
+                # Key on the field values in declaration order, whatever the order of the given keys.
+                return tuple(
+                    [_MISSING if name not in dict_obj else _intern_value_key(dict_obj[name]) for name in fields]
+                )
+            return dict, tuple(sorted((key, _intern_value_key(value)) for key, value in dict_obj.items()))
+        except TypeError:
+            return None
+
     def __setattr__(self, key, value):
         if self._is_frozen and not key.startswith("_"):
             raise AttributeError("cannot set attribute in value object %s" % self.__class__.__name__)
@@ -151,6 +306,12 @@ class ValueObject(object):
     def from_dict(cls, dict_obj):
         if dict_obj is None:
             return None
+        if cls.interned:
+            return cls.intern(cls._intern_key(dict_obj), lambda: cls._build_from_dict(dict_obj))
+        return cls._build_from_dict(dict_obj)
+
+    @classmethod
+    def _build_from_dict(cls, dict_obj):
         if isinstance(dict_obj, dict):
             return cls(**dict_obj)
         return cls(dict_obj)
@@ -208,6 +369,12 @@ class BitMaskValueObject(ValueObject):
 
     @classmethod
     def from_dict(cls, values):
+        if cls.interned:
+            return cls.intern(cls._intern_key(values), lambda: cls._build_from_values(values))
+        return cls._build_from_values(values)
+
+    @classmethod
+    def _build_from_values(cls, values):
         if isinstance(values, int):
             values = [item for item in cls.enum_class if values & item.bit_mask > 0]
         return cls(values)
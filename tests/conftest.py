@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from flask import Flask  # noqa: E402
+
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def order_repository(app):
+    from tests.domain import OrderRepository, RepositoryProvider
+
+    return OrderRepository(RepositoryProvider())
+
+
+@pytest.fixture
+def statements(app):
+    """SQL statements sent to the database while the test runs"""
+    sent = list()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(db.engine, "before_cursor_execute", record)
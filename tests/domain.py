@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from flaskd3.infrastructure.database.constants import DBType
+from flaskd3.infrastructure.database.sqlalchemy.orm_base import DeleteMixin, ListTyeDataInfo, VersionMixin
+from flaskd3.infrastructure.database.sqlalchemy.sql_base_aggregate_repository import SQLABaseAggregateRepository
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+from flaskd3.types.base_entity import BaseEntity
+from flaskd3.types.base_enum import BaseEnum
+from flaskd3.types.type_info import TypeInfo, ValueObjectField
+from flaskd3.types.value_object import ValueObject
+
+
+class OrderStatus(BaseEnum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class Size(ValueObject):
+    width = ValueObjectField(int)
+    height = ValueObjectField(int, required=False, default=0)
+
+
+class OrderTagModel(db.Model):
+    __tablename__ = "test_order_tag"
+    order_id = db.Column(db.String(64), primary_key=True)
+    tag = db.Column(db.String(64), primary_key=True)
+
+
+class OrderNoteModel(db.Model):
+    __tablename__ = "test_order_note"
+    note_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    order_id = db.Column(db.String(64))
+    note = db.Column(db.String(64))
+
+
+class OrderModel(db.Model, DeleteMixin, VersionMixin):
+    __tablename__ = "test_order"
+    order_id = db.Column(db.String(64), primary_key=True)
+    name = db.Column(db.String(64))
+    status = db.Column(db.String(64))
+    size = db.Column(db.JSON)
+    created = db.Column(db.DateTime)
+    list_type_attribute_info = {
+        "tags": ListTyeDataInfo(OrderTagModel, "tag"),
+        "notes": ListTyeDataInfo(OrderNoteModel, "note"),
+    }
+
+
+class OrderItemModel(db.Model, DeleteMixin, VersionMixin):
+    __tablename__ = "test_order_item"
+    order_id = db.Column(db.String(64), primary_key=True)
+    item_id = db.Column(db.String(64), primary_key=True)
+    quantity = db.Column(db.Integer)
+
+
+class OrderItem(BaseEntity):
+    item_id = TypeInfo(str, primary_key=True)
+    quantity = TypeInfo(int)
+
+
+class Order(BaseEntity):
+    order_id = TypeInfo(str, primary_key=True)
+    name = TypeInfo(str)
+    status = TypeInfo(OrderStatus, default=OrderStatus.OPEN)
+    size = TypeInfo(Size, required=False)
+    created = TypeInfo(datetime, required=False)
+    tags = TypeInfo(str, many=True, unique=True)
+    notes = TypeInfo(str, many=True)
+    items = TypeInfo(OrderItem, many=True)
+
+
+class _DBService(object):
+    def __init__(self, database):
+        self.database = database
+
+    def get_db(self):
+        return self.database
+
+
+class RepositoryProvider(object):
+    def __init__(self, redis_store=None):
+        self.redis_store = redis_store
+
+    def get_db_service(self, db_type):
+        if db_type == DBType.REDIS:
+            return _DBService(self.redis_store)
+        return _DBService(db)
+
+
+class OrderRepository(SQLABaseAggregateRepository):
+    name = "test_order_repository"
+    aggregate_class = Order
+    entity_map = {Order.__name__: OrderModel, OrderItem.__name__: OrderItemModel}
+
+
+class CachedOrderRepository(OrderRepository):
+    cache_shallow_loads = True
+
+
+def make_order(order_id="o1", item_count=2, tags=("red",), notes=("first",)):
+    return Order(
+        order_id=order_id,
+        name="order",
+        size=Size(width=1, height=2),
+        created=datetime(2020, 1, 1),
+        tags=list(tags),
+        notes=list(notes),
+        items=[OrderItem(item_id="{}-{}".format(order_id, index), quantity=index) for index in range(1, item_count + 1)],
+    )
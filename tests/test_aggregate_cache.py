@@ -0,0 +1,187 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import ANY
+
+import pytest
+
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import CachedOrderRepository, RepositoryProvider, make_order
+
+
+class FakeRedis(object):
+    """Keeps values in a dict, eval runs the version checked write of RedisAggregateCache"""
+
+    def __init__(self):
+        self.values = dict()
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def eval(self, script, numkeys, key, version, value, ttl):
+        stored = self.values.get(key)
+        if stored is not None and json.loads(stored)["version"] > version:
+            return 0
+        self.values[key] = value
+        return 1
+
+
+class FakeRedisStore(object):
+    def __init__(self):
+        self.session = FakeRedis()
+
+
+@pytest.fixture
+def redis_store():
+    return FakeRedisStore()
+
+
+@pytest.fixture
+def repository(app, redis_store):
+    repository = CachedOrderRepository(RepositoryProvider(redis_store))
+    repository.save_all([make_order("o1"), make_order("o2")])
+    db.session.commit()
+    db.session.expunge_all()
+    return repository
+
+
+def _cached_version(repository, redis_store, order_id):
+    value = redis_store.session.values.get(repository._cache_key(order_id))
+    return json.loads(value) if value is not None else None
+
+
+def _cached_order_ids(repository):
+    keys = {repository._cache_key(order_id): order_id for order_id in ("o1", "o2")}
+    return sorted(keys[key] for key in repository.aggregate_cache.get_many(list(keys)))
+
+
+def test_shallow_loads_read_through_cache(repository):
+    repository.load("o1", is_shallow=True)
+    order = repository.load("o1", is_shallow=True)
+
+    assert order.order_id == "o1"
+    assert repository.aggregate_cache.stats() == dict(hits=1, misses=1)
+
+
+def test_update_replaces_entry_once_committed(repository, redis_store):
+    repository.load("o1", is_shallow=True)
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+
+    assert _cached_version(repository, redis_store, "o1")["data"] is not None
+    db.session.commit()
+    assert _cached_version(repository, redis_store, "o1") == dict(version=order.version)
+    assert repository.load("o1", is_shallow=True).name == "changed"
+    assert _cached_version(repository, redis_store, "o1")["version"] == order.version
+
+
+def test_outdated_aggregate_is_not_cached_again(repository, redis_store):
+    stale_order = repository.load("o1", is_shallow=True)
+    db.session.expunge_all()
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+    db.session.commit()
+
+    # A reader which loaded the aggregate before the commit caches it after the invalidation.
+    repository._add_to_cache([stale_order])
+
+    assert _cached_version(repository, redis_store, "o1") == dict(version=order.version)
+    assert repository.load("o1", is_shallow=True).name == "changed"
+
+
+def test_loads_of_rolled_back_transaction_are_not_cached(repository, redis_store):
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+    repository.load("o1", is_shallow=True)
+    repository.load("o2", is_shallow=True)
+
+    assert _cached_order_ids(repository) == []
+    db.session.rollback()
+    assert _cached_order_ids(repository) == []
+
+
+def test_loads_of_writing_transaction_are_cached_on_commit(repository, redis_store):
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+    repository.load("o2", is_shallow=True)
+
+    assert _cached_order_ids(repository) == []
+    db.session.commit()
+    assert _cached_order_ids(repository) == ["o2"]
+
+
+def test_deleted_aggregate_is_not_cached_again(repository, redis_store):
+    stale_order = repository.load("o1", is_shallow=True)
+    db.session.expunge_all()
+    order = repository.load("o1")
+    order.delete()
+    repository.update(order)
+    db.session.commit()
+
+    repository._add_to_cache([stale_order])
+
+    assert repository.aggregate_cache.get_many([repository._cache_key("o1")]) == dict()
+
+
+def test_written_aggregate_is_invalidated_once_committed(repository, redis_store):
+    cached = repository.load("o1", is_shallow=True)
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+
+    assert _cached_version(repository, redis_store, "o1") == dict(version=cached.version, data=ANY)
+    # The writing transaction reads its own write, not the entry it invalidates once it commits.
+    assert repository.load("o1", is_shallow=True).name == "changed"
+    assert _cached_version(repository, redis_store, "o1")["version"] == cached.version
+    db.session.commit()
+    # The load of the written version in the transaction is cached once the entry of the earlier one is invalidated.
+    entry = _cached_version(repository, redis_store, "o1")
+    assert entry["version"] == order.version
+    assert entry["data"]["row"]["name"] == "changed"
+    db.session.expunge_all()
+    assert repository.load("o1", is_shallow=True).name == "changed"
+
+
+def test_rolled_back_update_keeps_entry(repository, redis_store):
+    cached = repository.load("o1", is_shallow=True)
+    entry = _cached_version(repository, redis_store, "o1")
+    order = repository.load("o1")
+    order.name = "changed"
+    repository.update(order)
+    repository.load("o1", is_shallow=True)
+    db.session.rollback()
+
+    assert _cached_version(repository, redis_store, "o1") == entry
+    db.session.expunge_all()
+    hits = repository.aggregate_cache.hits
+    assert repository.load("o1", is_shallow=True).name == "order"
+    assert repository.aggregate_cache.hits == hits + 1
+    db.session.commit()
+    assert _cached_version(repository, redis_store, "o1") == entry
+    assert entry["version"] == cached.version
+
+
+def test_sessions_are_tracked_only_once_a_cache_is_built():
+    script = "\n".join(
+        [
+            "import sys",
+            "sys.path.insert(0, %r)" % os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"),
+            "from sqlalchemy import event",
+            "from sqlalchemy.orm import Session",
+            "from flaskd3.infrastructure.database.redis import redis_aggregate_cache as cache_module",
+            "def listening():",
+            "    return [event.contains(Session, name, listener) for name, listener in cache_module._SESSION_LISTENERS]",
+            "assert listening() == [False] * 4, listening()",
+            "cache_module.RedisAggregateCache(None, 'orders')",
+            "cache_module.RedisAggregateCache(None, 'items')",
+            "assert listening() == [True] * 4, listening()",
+        ]
+    )
+
+    subprocess.run([sys.executable, "-c", script], check=True)
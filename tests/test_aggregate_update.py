@@ -0,0 +1,100 @@
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderItem, OrderItemModel, OrderModel, OrderTagModel, make_order
+
+
+def _reload(order_repository, order_id="o1"):
+    db.session.commit()
+    db.session.expunge_all()
+    return order_repository.load(order_id)
+
+
+def _item_rows(order_id="o1"):
+    rows = db.session.query(OrderItemModel).filter_by(order_id=order_id, deleted=False)
+    return sorted((row.item_id, row.quantity) for row in rows)
+
+
+def test_save_clears_change_tracking(order_repository):
+    order = make_order()
+    order_repository.save(order)
+
+    assert not order.is_dirty
+    assert not order.items.is_dirty
+    assert not order.tags.is_dirty
+    assert order.persisted_version == order.version
+
+
+def test_update_after_save_writes_only_new_children(order_repository):
+    order = make_order()
+    order_repository.save(order)
+    order.items.add(OrderItem(item_id="o1-3", quantity=3))
+    order_repository.update(order)
+    order.items.add(OrderItem(item_id="o1-4", quantity=4))
+    order_repository.update(order)
+
+    assert _item_rows() == [("o1-1", 1), ("o1-2", 2), ("o1-3", 3), ("o1-4", 4)]
+    assert len(_reload(order_repository).items.list()) == 4
+
+
+def test_repeated_update_of_loaded_aggregate(order_repository):
+    order_repository.save(make_order())
+    order = _reload(order_repository)
+
+    order.items.add(OrderItem(item_id="o1-3", quantity=3))
+    order.name = "first"
+    order_repository.update(order)
+    order.items.add(OrderItem(item_id="o1-4", quantity=4))
+    order.items.remove("o1-1")
+    order_repository.update(order)
+    order.tags.add("blue")
+    order_repository.update(order)
+
+    assert not order.is_dirty
+    assert _item_rows() == [("o1-2", 2), ("o1-3", 3), ("o1-4", 4)]
+    assert sorted(row.tag for row in db.session.query(OrderTagModel)) == ["blue", "red"]
+    reloaded = _reload(order_repository)
+    assert reloaded.name == "first"
+    assert reloaded.version == order.version
+
+
+def test_update_of_clean_aggregate_writes_nothing(order_repository):
+    order_repository.save(make_order())
+    order = _reload(order_repository)
+    version = order.version
+
+    order_repository.update(order)
+
+    assert order.version == version
+    assert db.session.get(OrderModel, "o1").version == version
+
+
+def test_update_of_unsaved_aggregate_merges_it(order_repository):
+    order = make_order()
+    order.name = "merged"
+
+    order_repository.update(order)
+
+    assert order.persisted_version == order.version
+    assert _item_rows() == [("o1-1", 1), ("o1-2", 2)]
+    assert _reload(order_repository).name == "merged"
+
+
+def test_removed_child_is_soft_deleted(order_repository):
+    order_repository.save(make_order())
+    order = _reload(order_repository)
+
+    order.items.remove("o1-2")
+    order_repository.update(order)
+
+    assert db.session.query(OrderItemModel).filter_by(item_id="o1-2").one().deleted
+
+
+def test_removed_child_is_kept_when_deleted_is_not_written(order_repository):
+    order_repository.exclude_key_map = {OrderItem.__name__: ["deleted"]}
+    order_repository.save(make_order())
+    order = _reload(order_repository)
+
+    order.items.remove("o1-2")
+    order_repository.update(order)
+
+    assert db.session.query(OrderItemModel).filter_by(item_id="o1-2").one().deleted is False
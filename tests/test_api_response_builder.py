@@ -0,0 +1,89 @@
+import datetime
+from _pydecimal import Decimal as PyDecimal
+from decimal import Decimal
+
+import pytest
+from flask import jsonify
+
+from flaskd3.appcore.core.api_response_builder import ApiResponseBuilder, orjson_dumps
+from flaskd3.common.money import Money
+from flaskd3.common.utils.json_utils import make_jsonify_ready
+
+from tests.domain import OrderStatus, Size, make_order
+
+pytest.importorskip("orjson")
+
+BODIES = [
+    dict(name="Zoë", city="Düsseldorf", emoji="😀 ok", tabs="a\tb c"),
+    {"ключ": ["значение", "Zoë"]},
+    dict(
+        created=datetime.datetime(2020, 1, 2, 3, 4, 5),
+        day=datetime.date(2020, 1, 1),
+        at=datetime.time(1, 2),
+    ),
+    dict(status=OrderStatus.OPEN, statuses=[OrderStatus.OPEN, OrderStatus.CLOSED]),
+    dict(size=Size(width=1, height=2), sizes=[Size(width=3)]),
+    dict(order=make_order(tags=("red", "blue")), data=make_order().data()),
+    dict(amount=Decimal("1.10"), ratio=PyDecimal("2.5"), price=Money(PyDecimal("12.5"), "INR")),
+    dict(b=1, a=[1.5, True, None, "x"], c=dict(z=1, y=2)),
+    [1, "two", 3.25],
+]
+
+NON_STR_KEYS = [
+    {1: "a", 2: "b"},
+    {10: "a", 9: "b"},
+    {True: "a", False: "b"},
+    dict(nested={2: "b", 1: "a"}),
+]
+
+
+def _jsonify_body(body):
+    return jsonify(make_jsonify_ready(body)).get_data()
+
+
+def _render_body(body):
+    return ApiResponseBuilder.render(body, 200).get_data()
+
+
+@pytest.mark.parametrize("body", BODIES)
+def test_orjson_dumps_matches_jsonify(app, body):
+    assert orjson_dumps(body) == _jsonify_body(body)
+
+
+@pytest.mark.parametrize("body", BODIES + NON_STR_KEYS)
+def test_render_matches_jsonify(app, body):
+    response = ApiResponseBuilder.render(body, 201)
+
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.get_data() == _jsonify_body(body)
+
+
+def test_non_ascii_text_is_escaped(app):
+    assert _render_body(dict(name="Zoë", emoji="😀")) == b'{"emoji":"\\ud83d\\ude00","name":"Zo\\u00eb"}\n'
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [("JSON_AS_ASCII", False), ("JSON_SORT_KEYS", False), ("JSONIFY_PRETTYPRINT_REGULAR", True)],
+)
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("body", BODIES)
+def test_render_follows_app_json_settings(app, key, value, body):
+    app.config[key] = value
+
+    assert _render_body(body) == _jsonify_body(body)
+
+
+@pytest.mark.parametrize("body", BODIES)
+def test_render_indents_in_debug_mode_like_jsonify(app, body):
+    app.debug = True
+
+    assert _render_body(body) == _jsonify_body(body)
+
+
+def test_render_without_json_dumps_uses_jsonify(app, monkeypatch):
+    monkeypatch.setattr(ApiResponseBuilder, "json_dumps", None)
+    body = dict(name="Zoë", status=OrderStatus.OPEN)
+
+    assert _render_body(body) == _jsonify_body(body)
@@ -0,0 +1,91 @@
+from flaskd3.types.base_entity import BaseEntity
+from flaskd3.types.type_info import TypeInfo
+
+from tests.domain import make_order
+
+
+class Leaf(BaseEntity):
+    leaf_id = TypeInfo(str, primary_key=True)
+    value = TypeInfo(int)
+
+
+class Branch(BaseEntity):
+    branch_id = TypeInfo(str, primary_key=True)
+    leaves = TypeInfo(Leaf, many=True)
+
+
+class Tree(BaseEntity):
+    tree_id = TypeInfo(str, primary_key=True)
+    branch = TypeInfo(Branch)
+
+
+def _saved_tree():
+    tree = Tree(tree_id="t", branch=Branch(branch_id="b", leaves=[Leaf(leaf_id="b-1", value=1)]))
+    tree.commit_changes()
+    return tree
+
+
+def _leaf_change(tree):
+    return tree.dirty()["data"]["branch"]["data"]["leaves"]["data"]["updated"]
+
+
+def test_dirty_child_marks_its_owner_dirty():
+    order = make_order()
+    order.commit_changes()
+
+    order.items.get("o1-1").quantity = 7
+
+    assert order.items.get("o1-1").is_dirty
+    assert order.items.is_dirty
+    assert order.is_dirty
+    assert order.dirty()["data"]["items"]["data"]["updated"] == [
+        dict(id="o1-1", type="entity", name="orderitem", data=dict(quantity=dict(type="int", data=dict(old=1, new=7))))
+    ]
+
+
+def test_changed_collection_marks_its_owner_dirty():
+    order = make_order()
+    order.commit_changes()
+
+    order.tags.add("blue")
+
+    assert order.is_dirty
+    assert order.dirty()["data"] == dict(tags=dict(type="set", data=dict(added={"blue"}, removed=set())))
+
+
+def test_dirty_leaf_marks_the_whole_owner_chain_dirty():
+    tree = _saved_tree()
+    assert not tree.is_dirty
+
+    tree.branch.leaves.get("b-1").value = 2
+
+    assert tree.branch.leaves.is_dirty
+    assert tree.branch.is_dirty
+    assert tree.is_dirty
+    assert _leaf_change(tree)[0]["data"] == dict(value=dict(type="int", data=dict(old=1, new=2)))
+
+
+def test_commit_changes_clears_the_owner_chain():
+    tree = _saved_tree()
+    leaf = tree.branch.leaves.get("b-1")
+    leaf.value = 2
+
+    tree.commit_changes()
+
+    assert not leaf.is_dirty
+    assert not tree.branch.leaves.is_dirty
+    assert not tree.branch.is_dirty
+    assert not tree.is_dirty
+    assert tree.dirty() is None
+
+
+def test_changes_after_commit_are_tracked_again():
+    tree = _saved_tree()
+    leaf = tree.branch.leaves.get("b-1")
+    leaf.value = 2
+    tree.commit_changes()
+
+    leaf.value = 3
+
+    assert tree.is_dirty
+    assert _leaf_change(tree)[0]["data"] == dict(value=dict(type="int", data=dict(old=2, new=3)))
@@ -0,0 +1,57 @@
+import pytest
+
+from flaskd3.common.exceptions import InvalidStateException
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderModel, OrderTagModel, Size, make_order
+
+
+@pytest.fixture
+def saved_orders(order_repository):
+    order_repository.save_all([make_order("o1"), make_order("o2")])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _select_statements(statements, table_name):
+    return [statement for statement in statements if statement.startswith("SELECT") and table_name in statement]
+
+
+def test_only_named_columns_are_selected(order_repository, saved_orders, statements):
+    (order,) = order_repository.load_by_keys(fields=["name"], order_id="o1")
+
+    assert order.is_partial
+    assert order.name == "order"
+    (select,) = _select_statements(statements, OrderModel.__tablename__)
+    assert "test_order.name" in select
+    assert "test_order.size" not in select
+    assert _select_statements(statements, OrderTagModel.__tablename__) == []
+
+
+def test_unloaded_attributes_are_not_writable(order_repository, saved_orders):
+    (order,) = order_repository.load_by_keys(fields=["name", "tags"], order_id="o1")
+
+    assert list(order.tags) == ["red"]
+    with pytest.raises(AttributeError):
+        order.size = Size(width=2)
+    assert "size" not in order.data()
+
+
+def test_partial_aggregate_is_updated_by_loaded_attributes(order_repository, saved_orders):
+    order = order_repository.load_multiple_queries(False, True, None, False, None, fields=["name"])[0]
+    order.name = "changed"
+    order_repository.update(order)
+    db.session.commit()
+    db.session.expunge_all()
+
+    reloaded = order_repository.load(order.order_id)
+    assert reloaded.name == "changed"
+    assert reloaded.size.width == 1
+    assert len(reloaded.items.list()) == 2
+
+
+def test_partial_aggregate_is_not_written_as_a_whole(order_repository, saved_orders):
+    (order,) = order_repository.load_by_keys(fields=["name"], order_id="o1")
+
+    with pytest.raises(InvalidStateException):
+        order_repository.update_all([order], force_update=True)
@@ -0,0 +1,135 @@
+import datetime
+from _pydecimal import Decimal as PyDecimal
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+
+from flaskd3.common.money import Money
+from flaskd3.common.utils import dateutils
+from flaskd3.common.utils.json_utils import make_jsonify_ready
+from flaskd3.infrastructure.database.sqlalchemy.db_adapter import DBAdapter
+from flaskd3.types.base_dto import BaseDto
+from flaskd3.types.base_entity import BaseEntity
+from flaskd3.types.entity_set_object import EntitySetObject
+from flaskd3.types.iter_base import IterBase
+from flaskd3.types.list_object import ListObject
+from flaskd3.types.map_object import MapObject
+from flaskd3.types.mutable_value_object import MutableValueObject
+from flaskd3.types.set_object import SetObject
+from flaskd3.types.value_object import ValueObject
+
+from tests.domain import OrderStatus, Size, make_order
+
+
+def isinstance_chain_jsonify_ready(obj):
+    """make_jsonify_ready as it was before it dispatched on types"""
+    if isinstance(obj, (list, set)):
+        return [isinstance_chain_jsonify_ready(item) for item in obj]
+    if isinstance(obj, dict):
+        if not obj:
+            return None
+        return {key: isinstance_chain_jsonify_ready(val) for key, val in obj.items()}
+    if isinstance(obj, PyDecimal):
+        return float(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (ValueObject, MutableValueObject)):
+        return isinstance_chain_jsonify_ready(obj.data())
+    if isinstance(obj, BaseEntity):
+        return isinstance_chain_jsonify_ready(obj.data())
+    if isinstance(obj, IterBase):
+        return isinstance_chain_jsonify_ready(obj.list())
+    if isinstance(obj, (datetime.datetime, datetime.time)):
+        return dateutils.to_string(obj)
+    if isinstance(obj, datetime.date):
+        return dateutils.date_to_string(obj)
+    if isinstance(obj, Money):
+        return isinstance_chain_jsonify_ready(obj.data())
+    if isinstance(obj, BaseDto):
+        return isinstance_chain_jsonify_ready(obj.data())
+    if isinstance(obj, MapObject):
+        return isinstance_chain_jsonify_ready(obj.data())
+    return obj
+
+
+def isinstance_chain_db_ready(obj):
+    """DBAdapter.make_db_ready as it was before it dispatched on types"""
+    if isinstance(obj, (list, set)):
+        return [isinstance_chain_db_ready(item) for item in obj]
+    if isinstance(obj, dict):
+        if not obj:
+            return None
+        return isinstance_chain_jsonify_ready(obj)
+    if isinstance(obj, PyDecimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseEntity):
+        return isinstance_chain_db_ready(obj.dict())
+    if isinstance(obj, (ValueObject, MutableValueObject)):
+        return isinstance_chain_jsonify_ready(obj.dict())
+    if isinstance(obj, EntitySetObject):
+        return isinstance_chain_db_ready(obj.list())
+    if isinstance(obj, (ListObject, SetObject)):
+        return isinstance_chain_jsonify_ready(obj.list())
+    if isinstance(obj, BaseDto):
+        return isinstance_chain_db_ready(obj.data())
+    if isinstance(obj, Money):
+        return isinstance_chain_db_ready(obj.to_dict())
+    if isinstance(obj, MapObject):
+        return isinstance_chain_db_ready(obj.dict())
+    return obj
+
+
+class Flag(Enum):
+    ON = 1
+
+
+def _order():
+    order = make_order(item_count=3, tags=("red", "blue"), notes=("first", "first"))
+    order.items.remove("o1-2")
+    return order
+
+
+VALUES = [
+    _order(),
+    _order().data(),
+    _order().dict(),
+    _order().items,
+    _order().tags,
+    _order().notes,
+    Size(width=1),
+    Money(PyDecimal("12.5"), "INR"),
+    [OrderStatus.OPEN, Flag.ON, {}, []],
+    {
+        "a": Decimal("1.1"),
+        "b": PyDecimal("2.2"),
+        "c": datetime.time(1, 2),
+        "d": datetime.date(2020, 1, 1),
+        "e": datetime.datetime(2020, 1, 2, 3, 4, 5),
+        "f": {"g": {}},
+    },
+    Decimal("3.3"),
+    PyDecimal("4.4"),
+    (1, OrderStatus.OPEN),
+    {1, 2},
+    "text",
+    1,
+    1.5,
+    True,
+    None,
+    {},
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_make_jsonify_ready_matches_isinstance_chain(value):
+    assert make_jsonify_ready(value) == isinstance_chain_jsonify_ready(value)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_make_db_ready_matches_isinstance_chain(value):
+    assert DBAdapter.make_db_ready(value) == isinstance_chain_db_ready(value)
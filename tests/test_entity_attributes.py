@@ -0,0 +1,152 @@
+import pytest
+
+from flaskd3.common.exceptions import InvalidStateException
+from flaskd3.types.base_entity import BaseEntity
+from flaskd3.types.type_info import TypeInfo
+
+from tests.domain import Order, OrderStatus, Size, make_order
+
+
+class Snapshot(BaseEntity):
+    snapshot_id = TypeInfo(str, primary_key=True)
+    is_shallow = TypeInfo(bool, required=False, default=False)
+    loaded_attributes = TypeInfo(str, many=True)
+
+
+def test_attributes_named_like_loader_flags_keep_their_values():
+    snapshot = Snapshot(snapshot_id="s1", is_shallow=True, loaded_attributes=["name"])
+
+    assert snapshot.is_shallow is True
+    assert list(snapshot.loaded_attributes) == ["name"]
+    assert not snapshot.is_partial
+    assert snapshot.data()["is_shallow"] is True
+
+
+def test_from_store_sets_loader_flags():
+    order = Order.from_store(dict(order_id="o1", name="order"), is_shallow=True, loaded_attributes=["order_id", "name"])
+
+    assert order.is_partial
+    assert set(order.data()) == {"order_id", "name"}
+    with pytest.raises(AttributeError, match="shallow"):
+        order.items = []
+    with pytest.raises(AttributeError):
+        order.status = order.status
+
+
+def test_constructor_does_not_take_loaded_attributes():
+    with pytest.raises(InvalidStateException):
+        Order(order_id="o1", name="order", loaded_attributes=["name"])
+
+
+def test_constructor_still_takes_is_shallow():
+    order = Order(order_id="o1", name="order", is_shallow=True, items=[])
+
+    assert order.items is None
+    with pytest.raises(AttributeError, match="shallow"):
+        order.items = []
+
+
+class Address(BaseEntity):
+    address_id = TypeInfo(str, primary_key=True)
+    city = TypeInfo(str)
+
+
+class Shipment(BaseEntity):
+    shipment_id = TypeInfo(str, primary_key=True)
+    address = TypeInfo(Address, required=False)
+    origin = TypeInfo(Address, allow_none=False)
+
+
+def _saved_order():
+    order = make_order()
+    order.commit_changes()
+    return order
+
+
+def test_value_write_is_tracked_with_its_first_old_value():
+    order = _saved_order()
+
+    order.name = "first"
+    order.name = "second"
+
+    assert order.name == "second"
+    assert order.is_dirty
+    assert order.dirty()["data"] == dict(name=dict(type="str", data=dict(old="order", new="second")))
+    assert order.version == 2
+
+
+def test_enum_and_value_object_writes_are_type_checked():
+    order = _saved_order()
+
+    order.status = OrderStatus.CLOSED
+    order.size = Size(width=5)
+
+    assert order.status == OrderStatus.CLOSED
+    assert order.size.width == 5
+    assert set(order.dirty()["data"]) == {"status", "size"}
+    with pytest.raises(TypeError):
+        order.size = dict(width=6)
+    with pytest.raises(TypeError):
+        order.name = 5
+    assert order.size.width == 5
+    assert order.name == "order"
+
+
+def test_rejected_writes_leave_entity_clean():
+    order = _saved_order()
+
+    with pytest.raises(AttributeError):
+        order.version = 7
+    with pytest.raises(TypeError):
+        order.missing = 1
+    with pytest.raises(TypeError):
+        order.created = "2020-01-01"
+
+    assert order.version == 1
+    assert not order.is_dirty
+    assert order.dirty() is None
+
+
+def test_collection_write_updates_collection_in_place():
+    order = _saved_order()
+    tags = order.tags
+    items = order.items
+
+    order.tags = ["red", "blue"]
+    order.items = [dict(item_id="o1-1", quantity=5), dict(quantity=9)]
+
+    assert order.tags is tags
+    assert sorted(order.tags) == ["blue", "red"]
+    assert order.items is items
+    assert order.items.get("o1-1").quantity == 5
+    assert order.items.get("o1-2") is None
+    assert sorted(item.quantity for item in order.items) == [5, 9]
+    assert set(order.dirty()["data"]) == {"tags", "items"}
+
+
+def test_entity_write_sets_owner_once():
+    shipment = Shipment(shipment_id="s1", origin=Address(address_id="a1", city="x"))
+    shipment.commit_changes()
+    address = Address(address_id="a2", city="y")
+
+    shipment.address = address
+
+    assert shipment.address is address
+    assert shipment.is_dirty
+    with pytest.raises(AttributeError):
+        shipment.address = Address(address_id="a3", city="z")
+    with pytest.raises(TypeError):
+        shipment.origin = None
+    with pytest.raises(TypeError):
+        Shipment(shipment_id="s2", address=address, origin=None)
+    address.city = "changed"
+    assert shipment.dirty()["data"]["address"]["data"] == dict(city=dict(type="str", data=dict(old="y", new="changed")))
+
+
+def test_deleted_is_written_without_tracking():
+    order = _saved_order()
+
+    order.deleted = True
+
+    assert order.deleted
+    assert not order.is_dirty
@@ -0,0 +1,90 @@
+import pytest
+
+from tests.domain import OrderItem, make_order
+
+
+def _saved_items():
+    order = make_order()
+    order.commit_changes()
+    return order.items
+
+
+def test_added_item_is_reported_as_added():
+    items = _saved_items()
+
+    item = items.add(OrderItem(item_id="o1-3", quantity=3))
+
+    assert items.get_changes() == ([item], [], [])
+    assert len(items) == 3
+    assert items.is_dirty
+
+
+def test_removing_an_added_item_leaves_no_changes():
+    items = _saved_items()
+    items.add(OrderItem(item_id="o1-3", quantity=3))
+
+    item = items.remove("o1-3")
+
+    assert items.get_changes() == ([], [], [])
+    assert not items.is_dirty
+    assert not item.deleted
+    assert len(items) == 2
+    assert items.get("o1-3") is None
+
+
+def test_re_added_new_item_is_added_again():
+    items = _saved_items()
+    item = items.add(OrderItem(item_id="o1-3", quantity=3))
+    items.remove("o1-3")
+
+    items.add(item)
+
+    assert items.get_changes() == ([item], [], [])
+    assert items.get("o1-3") is item
+    assert len(items) == 3
+
+
+def test_removed_loaded_item_is_reported_as_deleted():
+    items = _saved_items()
+
+    item = items.remove("o1-1")
+
+    assert items.get_changes() == ([], [item], [])
+    assert item.deleted
+    assert items.is_dirty
+    assert len(items) == 1
+    assert [entry.item_id for entry in items] == ["o1-2"]
+    assert items.list() == [items.get("o1-2"), item]
+
+
+def test_re_added_loaded_item_undoes_its_removal():
+    items = _saved_items()
+    item = items.remove("o1-1")
+
+    items.add(item)
+
+    assert items.get_changes() == ([], [], [])
+    assert not items.is_dirty
+    assert not item.deleted
+    assert items.get("o1-1") is item
+    assert len(items) == 2
+
+
+def test_re_added_loaded_item_keeps_its_own_changes():
+    items = _saved_items()
+    item = items.remove("o1-1")
+    items.add(item)
+
+    item.quantity = 8
+
+    assert items.get_changes() == ([], [], [item])
+
+
+def test_adding_a_present_id_is_rejected():
+    items = _saved_items()
+
+    with pytest.raises(ValueError):
+        items.add(OrderItem(item_id="o1-1", quantity=5))
+    with pytest.raises(ValueError):
+        items.remove("o1-9")
+    assert items.get_changes() == ([], [], [])
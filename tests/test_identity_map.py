@@ -0,0 +1,82 @@
+import pytest
+
+from flaskd3.appcore.core.request_context import (
+    clear_aggregate_identity_map,
+    get_aggregate_identity_map,
+    init_aggregate_identity_map,
+)
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import make_order
+
+
+@pytest.fixture
+def saved_order(order_repository):
+    order_repository.save(make_order())
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_map_is_started_once(app):
+    assert init_aggregate_identity_map() is True
+    identity_map = get_aggregate_identity_map()
+
+    assert init_aggregate_identity_map() is False
+    assert get_aggregate_identity_map() is identity_map
+    clear_aggregate_identity_map()
+    assert get_aggregate_identity_map() is None
+
+
+def test_map_needs_app_context():
+    assert init_aggregate_identity_map() is False
+    assert get_aggregate_identity_map() is None
+
+
+def test_load_returns_same_instance_within_unit_of_work(order_repository, saved_order):
+    init_aggregate_identity_map()
+    try:
+        order = order_repository.load("o1")
+        assert order_repository.load("o1") is order
+        assert order_repository.load_many(["o1"])[0] is order
+    finally:
+        clear_aggregate_identity_map()
+
+    assert order_repository.load("o1") is not order
+
+
+def test_shallow_load_is_not_returned_for_full_load(order_repository, saved_order):
+    init_aggregate_identity_map()
+    try:
+        shallow_order = order_repository.load("o1", is_shallow=True)
+        order = order_repository.load("o1")
+        assert order is not shallow_order
+        assert order_repository.load("o1", is_shallow=True) is order
+    finally:
+        clear_aggregate_identity_map()
+
+
+class _DBServiceProvider(object):
+    def init_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_nested_unit_of_work_keeps_outer_map(app, monkeypatch):
+    decorators = pytest.importorskip("flaskd3.appcore.core.decorators")
+    monkeypatch.setattr(decorators.app_core, "get_infra_service", lambda name: _DBServiceProvider())
+
+    def inner():
+        return get_aggregate_identity_map()
+
+    def outer():
+        identity_map = get_aggregate_identity_map()
+        assert decorators.call_with_db_commit(inner) is identity_map
+        return get_aggregate_identity_map() is identity_map
+
+    assert decorators.call_with_db_commit(outer) is True
+    assert get_aggregate_identity_map() is None
@@ -0,0 +1,82 @@
+import gc
+import re
+import weakref
+
+import pytest
+
+from flaskd3.appcore.core.request_context import (
+    clear_aggregate_identity_map,
+    get_aggregate_identity_map,
+    init_aggregate_identity_map,
+)
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderModel, make_order
+
+ORDER_IDS = ["o%d" % index for index in range(1, 8)]
+
+
+@pytest.fixture
+def saved_orders(order_repository):
+    order_repository.save_all([make_order(order_id) for order_id in ORDER_IDS])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _order_selects(statements):
+    from_orders = re.compile(r"FROM {}\b".format(OrderModel.__tablename__))
+    return [statement for statement in statements if statement.startswith("SELECT") and from_orders.search(statement)]
+
+
+def test_every_aggregate_is_yielded_once_across_chunks(order_repository, saved_orders, statements):
+    order_ids = [order.order_id for order in order_repository.iter_aggregates(chunk_size=3)]
+
+    assert order_ids == ORDER_IDS
+    # Chunks of 3, 3 and a partial last one of 1.
+    assert len(_order_selects(statements)) == 3
+
+
+def test_chunks_are_hydrated_whole(order_repository, saved_orders):
+    orders = list(order_repository.iter_aggregates(chunk_size=3))
+
+    assert [len(order.items.list()) for order in orders] == [2] * len(ORDER_IDS)
+    assert [sorted(order.tags) for order in orders] == [["red"]] * len(ORDER_IDS)
+
+
+def test_chunk_size_larger_than_table(order_repository, saved_orders, statements):
+    assert [order.order_id for order in order_repository.iter_aggregates(chunk_size=50)] == ORDER_IDS
+    assert len(_order_selects(statements)) == 1
+
+
+def test_soft_deleted_aggregates_are_skipped(order_repository, saved_orders):
+    for order_id in ("o1", "o3", "o4"):
+        order = order_repository.load(order_id)
+        order.delete()
+        order_repository.update(order)
+    db.session.commit()
+    db.session.expunge_all()
+
+    order_ids = [order.order_id for order in order_repository.iter_aggregates(chunk_size=2)]
+
+    assert order_ids == ["o2", "o5", "o6", "o7"]
+
+
+def test_queries_filter_the_scan(order_repository, saved_orders):
+    orders = order_repository.iter_aggregates(queries=dict(order_id=["o2", "o5", "o7"]), chunk_size=2)
+
+    assert [order.order_id for order in orders] == ["o2", "o5", "o7"]
+
+
+def test_yielded_chunks_are_not_kept_alive(order_repository, saved_orders):
+    init_aggregate_identity_map()
+    try:
+        scan = order_repository.iter_aggregates(chunk_size=3)
+        first_chunk = [weakref.ref(next(scan)) for _ in range(3)]
+        # Moving on to the next chunk releases the previous one.
+        next(scan)
+        gc.collect()
+
+        assert [ref() for ref in first_chunk] == [None] * 3
+        assert get_aggregate_identity_map() == dict()
+    finally:
+        clear_aggregate_identity_map()
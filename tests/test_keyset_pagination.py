@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from marshmallow import Schema, fields
+
+from flaskd3.appcore.core.api_response_builder import ApiResponseBuilder
+from flaskd3.common.dtos.meta_dto import Meta
+from flaskd3.common.exceptions import InvalidStateException, ValidationException
+from flaskd3.infrastructure.database.sqlalchemy.keyset_pagination import KeysetOrder
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderModel, make_order
+
+
+class OrderIdSchema(Schema):
+    order_id = fields.String()
+
+
+@pytest.fixture
+def orders(order_repository):
+    order_repository.save_all([make_order("o{}".format(index)) for index in range(1, 6)])
+    db.session.commit()
+
+
+def _load_page(order_repository, meta):
+    aggregates = order_repository.load_multiple_queries(False, True, OrderModel.order_id.desc(), False, meta)
+    return [aggregate.order_id for aggregate in aggregates]
+
+
+def test_pages_follow_cursor(order_repository, orders):
+    pages = list()
+    meta = Meta(limit=2, keyset=True)
+    while True:
+        pages.append(_load_page(order_repository, meta))
+        if meta.next_cursor is None:
+            break
+        meta = Meta(limit=2, cursor=meta.next_cursor)
+
+    assert pages == [["o5", "o4"], ["o3", "o2"], ["o1"]]
+
+
+def test_iter_aggregates_scans_in_chunks(order_repository, orders):
+    order_ids = [aggregate.order_id for aggregate in order_repository.iter_aggregates(chunk_size=2)]
+
+    assert order_ids == ["o1", "o2", "o3", "o4", "o5"]
+
+
+def test_nullable_order_column_is_rejected():
+    with pytest.raises(InvalidStateException):
+        KeysetOrder(OrderModel, OrderModel.name)
+
+
+def test_invalid_cursor_is_rejected(order_repository, orders):
+    with pytest.raises(ValidationException):
+        _load_page(order_repository, Meta(limit=2, cursor="not a cursor"))
+
+
+def test_keyset_response_leaves_meta_unchanged(order_repository, orders):
+    meta = Meta(limit=2, keyset=True)
+    aggregates = order_repository.load_multiple_queries(False, True, OrderModel.order_id.desc(), False, meta)
+
+    response = ApiResponseBuilder.build_success_response_from_aggregates(aggregates, OrderIdSchema, meta)
+
+    assert meta.count is None
+    body = json.loads(response.get_data())
+    assert body["meta"] == dict(limit=2, count=2, cursor=None, nextCursor=meta.next_cursor)
+    assert [entry["order_id"] for entry in body["data"]] == ["o5", "o4"]
@@ -0,0 +1,50 @@
+import pytest
+
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderItem, OrderItemModel, make_order
+
+
+@pytest.fixture
+def lazy_repository(order_repository):
+    order_repository.lazy_child_loading = True
+    order_repository.save_all([make_order("o1"), make_order("o2", item_count=3)])
+    db.session.commit()
+    db.session.expunge_all()
+    return order_repository
+
+
+def _item_statements(statements):
+    return [statement for statement in statements if OrderItemModel.__tablename__ in statement]
+
+
+def test_children_are_loaded_on_first_read(lazy_repository, statements):
+    orders = {order.order_id: order for order in lazy_repository.load_all()}
+
+    assert not orders["o1"].items.is_loaded
+    assert _item_statements(statements) == []
+    assert len(orders["o2"].items.list()) == 3
+    assert len(orders["o1"].items.list()) == 2
+    # The children of every aggregate of the load are fetched with one query.
+    assert len(_item_statements(statements)) == 1
+
+
+def test_update_of_unloaded_children_writes_root_only(lazy_repository, statements):
+    order = lazy_repository.load("o1")
+    order.name = "changed"
+    lazy_repository.update(order)
+
+    assert not order.items.is_loaded
+    assert _item_statements(statements) == []
+    db.session.expunge_all()
+    reloaded = lazy_repository.load("o1")
+    assert reloaded.name == "changed"
+    assert len(reloaded.items.list()) == 2
+
+
+def test_change_of_lazy_children_is_written(lazy_repository):
+    order = lazy_repository.load("o1")
+    order.items.add(OrderItem(item_id="o1-3", quantity=3))
+    lazy_repository.update(order)
+
+    assert db.session.query(OrderItemModel).filter_by(order_id="o1").count() == 3
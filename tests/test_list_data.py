@@ -0,0 +1,74 @@
+import pytest
+
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+from flaskd3.types.list_object import ListObject
+
+from tests.domain import OrderNoteModel, OrderTagModel, make_order
+
+
+def _saved_order(order_repository, notes=("first",)):
+    order_repository.save(make_order(notes=notes))
+    db.session.commit()
+    db.session.expunge_all()
+    return order_repository.load("o1")
+
+
+def _notes():
+    return sorted(row.note for row in db.session.query(OrderNoteModel).filter_by(order_id="o1"))
+
+
+def test_list_changes_count_repeated_items():
+    notes = ListObject(str, ["a", "a", "b"])
+    notes.add("a")
+    notes.remove("b")
+    notes.add("c")
+    notes.remove("c")
+
+    assert notes.changes() == (["a"], ["b"])
+    notes.remove("a")
+    notes.remove("a")
+    added, removed = notes.changes()
+    assert (added, sorted(removed)) == ([], ["a", "b"])
+
+
+def test_repeated_update_writes_each_entry_once(order_repository):
+    order = _saved_order(order_repository)
+
+    order.notes.add("second")
+    order_repository.update(order)
+    order.notes.add("second")
+    order_repository.update(order)
+
+    assert _notes() == ["first", "second", "second"]
+
+
+def test_removing_one_of_repeated_entries_keeps_the_others(order_repository):
+    order = _saved_order(order_repository, notes=("first", "first", "second"))
+
+    order.notes.remove("first")
+    order_repository.update(order)
+
+    assert _notes() == ["first", "second"]
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_forced_update_all_writes_only_added_entries(order_repository, bulk):
+    order = _saved_order(order_repository)
+
+    order.notes.add("second")
+    order.tags.remove("red")
+    order.tags.add("blue")
+    order_repository.update_all([order], force_update=True, bulk=bulk)
+
+    assert _notes() == ["first", "second"]
+    assert [row.tag for row in db.session.query(OrderTagModel)] == ["blue"]
+
+
+def test_update_of_unsaved_aggregate_diffs_stored_entries(order_repository):
+    _saved_order(order_repository, notes=("first", "second"))
+    order = make_order(notes=("second", "third"))
+    order.name = "merged"
+
+    order_repository.update(order)
+
+    assert _notes() == ["second", "third"]
@@ -0,0 +1,66 @@
+import pytest
+
+from flaskd3.common.exceptions import OutdatedVersion
+from flaskd3.infrastructure.database.sqlalchemy.sql_db_service import db
+
+from tests.domain import OrderItem, OrderItemModel, OrderModel, make_order
+
+
+def _load_saved_order(order_repository):
+    order_repository.save(make_order())
+    db.session.commit()
+    db.session.expunge_all()
+    return order_repository.load("o1")
+
+
+def _write_concurrently(order_id="o1"):
+    db.session.query(OrderModel).filter_by(order_id=order_id).update(
+        {"version": OrderModel.version + 1}, synchronize_session=False
+    )
+
+
+def test_update_of_outdated_aggregate_raises(order_repository):
+    order = _load_saved_order(order_repository)
+    _write_concurrently()
+
+    order.name = "changed"
+    order.items.add(OrderItem(item_id="o1-3", quantity=3))
+    with pytest.raises(OutdatedVersion):
+        order_repository.update(order, optimistic=True)
+
+    # The version checked row is written first, nothing else of the aggregate was sent.
+    assert db.session.query(OrderItemModel).filter_by(item_id="o1-3").count() == 0
+
+
+def test_repeated_optimistic_updates_follow_written_version(order_repository):
+    order = _load_saved_order(order_repository)
+
+    order.name = "first"
+    order_repository.update(order, optimistic=True)
+    order.name = "second"
+    order_repository.update(order, optimistic=True)
+
+    row = db.session.get(OrderModel, "o1")
+    assert (row.name, row.version) == ("second", order.version)
+    assert order.persisted_version == order.version
+
+
+def test_repository_optimistic_locking_default(order_repository):
+    order_repository.optimistic_locking = True
+    order = _load_saved_order(order_repository)
+    _write_concurrently()
+
+    order.name = "changed"
+    with pytest.raises(OutdatedVersion):
+        order_repository.update(order)
+    order_repository.update(order, optimistic=False)
+
+
+def test_delete_of_outdated_aggregate_raises(order_repository):
+    order = _load_saved_order(order_repository)
+    _write_concurrently()
+
+    order.delete()
+    with pytest.raises(OutdatedVersion):
+        order_repository.update(order, optimistic=True)
+    assert not db.session.get(OrderModel, "o1").deleted
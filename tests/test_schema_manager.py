@@ -0,0 +1,81 @@
+import threading
+
+from marshmallow import EXCLUDE, fields
+
+from flaskd3.appcore.core.schema_manager import SchemaManager
+from flaskd3.types.base_schema import BaseSchema
+
+
+class ItemSchema(BaseSchema):
+    itemId = fields.String(attribute="item_id")
+    quantity = fields.Integer()
+    note = fields.String()
+
+
+class OtherItemSchema(ItemSchema):
+    pass
+
+
+ITEM = dict(item_id="o1-1", quantity=2, note="first")
+
+
+def test_same_schema_class_shares_one_instance():
+    schema = SchemaManager.get_or_create_schema_obj(ItemSchema)
+
+    assert SchemaManager.get_or_create_schema_obj(ItemSchema) is schema
+    assert schema.unknown == EXCLUDE
+    assert schema.dump(ITEM) == dict(itemId="o1-1", quantity=2, note="first")
+
+
+def test_schema_classes_do_not_share_instances():
+    schema = SchemaManager.get_or_create_schema_obj(ItemSchema)
+    other = SchemaManager.get_or_create_schema_obj(OtherItemSchema)
+
+    assert type(schema) is ItemSchema
+    assert type(other) is OtherItemSchema
+
+
+def test_differing_arguments_do_not_share_instances():
+    schema = SchemaManager.get_or_create_schema_obj(ItemSchema)
+    many = SchemaManager.get_or_create_schema_obj(ItemSchema, many=True)
+    only = SchemaManager.get_or_create_schema_obj(ItemSchema, only=("quantity",))
+    exclude = SchemaManager.get_or_create_schema_obj(ItemSchema, exclude=("note",))
+
+    assert len({id(schema), id(many), id(only), id(exclude)}) == 4
+    assert many.dump([ITEM]) == [dict(itemId="o1-1", quantity=2, note="first")]
+    assert only.dump(ITEM) == dict(quantity=2)
+    assert exclude.dump(ITEM) == dict(itemId="o1-1", quantity=2)
+    assert schema.dump(ITEM) == dict(itemId="o1-1", quantity=2, note="first")
+
+
+def test_same_arguments_share_one_instance():
+    only = SchemaManager.get_or_create_schema_obj(ItemSchema, only=["itemId", "quantity"])
+
+    assert SchemaManager.get_or_create_schema_obj(ItemSchema, only=("quantity", "itemId")) is only
+    assert SchemaManager.get_or_create_schema_obj(ItemSchema, exclude=["note"]) is SchemaManager.get_or_create_schema_obj(
+        ItemSchema, exclude=("note",)
+    )
+    assert SchemaManager.get_or_create_schema_obj(ItemSchema, only=()) is not SchemaManager.get_or_create_schema_obj(
+        ItemSchema
+    )
+
+
+def test_concurrent_first_use_shares_one_instance():
+    class FreshSchema(ItemSchema):
+        pass
+
+    start = threading.Barrier(8)
+    schemas = list()
+
+    def get_schema():
+        start.wait()
+        schemas.append(SchemaManager.get_or_create_schema_obj(FreshSchema))
+
+    threads = [threading.Thread(target=get_schema) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(schemas) == 8
+    assert all(schema is schemas[0] for schema in schemas)
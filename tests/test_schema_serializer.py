@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from _pydecimal import Decimal as PyDecimal
+from marshmallow import EXCLUDE, fields, post_dump
+
+from flaskd3.common.utils.json_utils import make_jsonify_ready
+from flaskd3.types.base_schema import BaseSchema, EnumField, RawField
+from flaskd3.types.schema_serializer import SchemaSerializer
+
+from tests.domain import OrderItem, OrderStatus, make_order
+
+
+class SizeSchema(BaseSchema):
+    width = fields.Integer()
+    height = fields.Integer()
+
+
+class OrderItemSchema(BaseSchema):
+    itemId = fields.String(attribute="item_id")
+    quantity = fields.Integer()
+    note = fields.String(attribute="missing_note", dump_default="none")
+
+
+class OrderSchema(BaseSchema):
+    orderId = fields.String(attribute="order_id")
+    name = fields.String()
+    status = EnumField(OrderStatus)
+    size = fields.Nested(SizeSchema, allow_none=True)
+    created = fields.DateTime()
+    tags = fields.List(fields.String())
+    items = fields.Nested(OrderItemSchema, many=True)
+    extra = RawField()
+    total = fields.Method("get_total")
+    version = fields.Integer()
+    flag = fields.Boolean()
+
+    def get_total(self, obj):
+        return {"total_amount": Decimal("1.5")}
+
+
+class ProjectedOrderSchema(BaseSchema):
+    items = fields.Nested(OrderItemSchema, many=True, only=("quantity",))
+    size = fields.Nested("SizeSchema")
+
+
+class HookSchema(BaseSchema):
+    quantity = fields.Integer()
+
+    @post_dump
+    def add_price(self, data, **kwargs):
+        data["price"] = PyDecimal("2.5")
+        return data
+
+
+def _order_data():
+    order = make_order(tags=("red", "blue"))
+    order.items.add(OrderItem(item_id="o1-3", quantity=0))
+    return order.data()
+
+
+DATA = [
+    _order_data(),
+    dict(
+        _order_data(),
+        size=None,
+        flag=1,
+        extra={"snake_key": [{"in_er": OrderStatus.OPEN, "day": date(2020, 1, 1)}], "empty": {}},
+    ),
+    dict(order_id=None, items=[], tags=[], created=datetime(2020, 1, 2, 3, 4, 5)),
+    dict(items=None),
+]
+
+
+@pytest.mark.parametrize("data", DATA)
+def test_dump_matches_marshmallow_dump(data):
+    expected = make_jsonify_ready(OrderSchema(unknown=EXCLUDE).dump(data))
+
+    assert SchemaSerializer.for_schema(OrderSchema).dump(data) == expected
+
+
+def test_dump_many_matches_marshmallow_dump():
+    expected = make_jsonify_ready(OrderSchema(unknown=EXCLUDE).dump(DATA, many=True))
+
+    assert SchemaSerializer.for_schema(OrderSchema).dump_many(DATA) == expected
+
+
+@pytest.mark.parametrize("data", DATA)
+def test_nested_only_matches_marshmallow_dump(data):
+    expected = make_jsonify_ready(ProjectedOrderSchema().dump(data))
+
+    assert SchemaSerializer.for_schema(ProjectedOrderSchema).dump(data) == expected
+
+
+def test_schema_with_hooks_is_dumped_by_marshmallow():
+    expected = make_jsonify_ready(HookSchema().dump(dict(quantity=1)))
+
+    assert SchemaSerializer.for_schema(HookSchema).dump(dict(quantity=1)) == expected
+    assert expected == dict(quantity=1, price=2.5)
+
+
+def test_serializer_is_built_once_per_schema():
+    assert SchemaSerializer.for_schema(OrderSchema) is SchemaSerializer.for_schema(OrderSchema)
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+from transitions import Machine
+from transitions.core import MachineError
+
+from flaskd3.common.constants import RelationshipAction, RelationshipStatus
+from flaskd3.common.exceptions import AuthorizationException, ValidationException
+from flaskd3.common.value_objects import ActionRequest
+from flaskd3.types.base_entity import BaseEntity
+from flaskd3.types.relationship_entity import RelationshipEntity
+from flaskd3.types.state_machine import StateMachineFactory, StateTransition
+from flaskd3.types.type_info import TypeInfo
+
+UserRole = namedtuple("UserRole", "role_id")
+
+
+class Review(BaseEntity):
+    review_id = TypeInfo(str, primary_key=True)
+    status = TypeInfo(RelationshipStatus)
+
+    state_machine_factory = StateMachineFactory(
+        state_key="status",
+        transitions=[
+            StateTransition(
+                trigger=RelationshipAction.APPROVE,
+                source=[RelationshipStatus.IN_REVIEW],
+                destination=RelationshipStatus.APPROVED,
+                authorised_user_roles=["reviewer"],
+            ),
+            StateTransition(
+                trigger=RelationshipAction.REJECT,
+                source=[RelationshipStatus.IN_REVIEW],
+                destination=RelationshipStatus.REJECTED,
+                is_hidden=True,
+            ),
+        ],
+    )
+
+
+def _machine_destination(transitions, trigger, state):
+    model = type("Model", (object,), dict())()
+    Machine(
+        model=model,
+        states=[status.value for status in RelationshipStatus],
+        transitions=[transition.parsed_data() for transition in transitions],
+        initial=state.value,
+        auto_transitions=False,
+    )
+    try:
+        getattr(model, trigger.value)()
+    except MachineError as e:
+        return str(e)
+    return model.state
+
+
+@pytest.mark.parametrize("state", list(RelationshipStatus))
+@pytest.mark.parametrize("trigger", list(RelationshipAction))
+def test_table_matches_transitions_machine(trigger, state):
+    factory = RelationshipEntity.state_machine_factory
+    review = Review(review_id="r1", status=state)
+    state_machine = factory.build(review)
+
+    try:
+        state_machine.trigger(trigger)
+        result = review.status.value
+    except MachineError as e:
+        result = str(e)
+
+    assert result == _machine_destination(factory.transitions, trigger, state)
+    assert state_machine.state == review.status.value
+
+
+def test_triggers_are_methods():
+    review = Review(review_id="r1", status=RelationshipStatus.IN_REVIEW)
+    state_machine = Review.state_machine_factory.build(review)
+
+    state_machine.approve()
+
+    assert review.status == RelationshipStatus.APPROVED
+    with pytest.raises(AttributeError):
+        state_machine.activate
+
+
+def test_authorised_user_roles():
+    state_machine = Review.state_machine_factory.build(Review(review_id="r1", status=RelationshipStatus.IN_REVIEW))
+
+    assert state_machine.is_authorised(RelationshipAction.APPROVE, [UserRole("reviewer")])
+    assert not state_machine.is_authorised(RelationshipAction.APPROVE, [UserRole("guest")])
+    assert not state_machine.is_authorised(RelationshipAction.APPROVE)
+    assert state_machine.is_authorised(RelationshipAction.REJECT)
+
+
+def test_hidden_transitions_are_not_visible():
+    transitions = Review.state_machine_factory.get_visible_transitions()
+
+    assert [transition.trigger for transition in transitions] == [RelationshipAction.APPROVE]
+
+
+def test_act_checks_roles_and_transition():
+    review = Review(review_id="r1", status=RelationshipStatus.APPROVED)
+
+    with pytest.raises(AuthorizationException):
+        review.act(_action_request(RelationshipAction.APPROVE), [UserRole("guest")])
+    with pytest.raises(ValidationException):
+        review.act(_action_request(RelationshipAction.REJECT))
+    review.status = RelationshipStatus.IN_REVIEW
+    review.act(_action_request(RelationshipAction.REJECT))
+    assert review.status == RelationshipStatus.REJECTED
+
+
+def _action_request(action):
+    return ActionRequest(action=action, action_datetime=datetime(2020, 1, 1), payload=dict())
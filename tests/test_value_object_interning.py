@@ -0,0 +1,121 @@
+from decimal import Decimal
+
+import pytest
+
+from flaskd3.common.exceptions import InvalidStateException
+from flaskd3.common.value_objects import GeoLocation, Name
+from flaskd3.types.base_enum import BaseEnum
+from flaskd3.types.mutable_value_object import MutableValueObject
+from flaskd3.types.type_info import ValueObjectField
+from flaskd3.types.value_object import ValueObject
+
+
+class Unit(BaseEnum):
+    KM = "km"
+    MILE = "mile"
+
+
+class Coordinates(ValueObject):
+    interned = True
+
+    latitude = ValueObjectField(str)
+    longitude = ValueObjectField(str)
+
+
+class Quantity(ValueObject):
+    interned = True
+
+    amount = ValueObjectField(Decimal)
+    count = ValueObjectField(int, required=False)
+    unit = ValueObjectField(Unit, required=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_intern_caches():
+    yield
+    Coordinates.get_intern_cache().clear()
+    Quantity.get_intern_cache().clear()
+
+
+def test_equal_values_share_one_instance():
+    first = Coordinates.from_dict(dict(latitude="1", longitude="2"))
+    second = Coordinates.from_dict(dict(longitude="2", latitude="1"))
+
+    assert first is second
+    assert Coordinates.get_intern_cache().stats() == dict(hits=1, misses=1, size=1)
+
+
+def test_interned_instances_compare_and_hash_by_fields():
+    interned = Coordinates.from_dict(dict(latitude="1", longitude="2"))
+    built = Coordinates(latitude="1", longitude="2")
+
+    assert interned is not built
+    assert interned == built
+    assert hash(interned) == hash(built)
+    assert interned != Coordinates(latitude="1", longitude="3")
+    assert len({interned, built}) == 1
+
+
+def test_instances_are_frozen():
+    interned = Coordinates.from_dict(dict(latitude="1", longitude="2"))
+
+    with pytest.raises(AttributeError):
+        interned.latitude = "3"
+
+
+def test_values_equal_but_of_other_types_are_not_merged():
+    from_int = Coordinates.from_dict(dict(latitude=1, longitude=2))
+    from_float = Coordinates.from_dict(dict(latitude=1.0, longitude=2))
+    from_bool = Coordinates.from_dict(dict(latitude=True, longitude=2))
+
+    assert from_int.latitude == "1"
+    assert from_float.latitude == "1.0"
+    assert from_bool.latitude == "True"
+    assert Quantity.from_dict(dict(amount=Decimal(1), count=True)).count is True
+    assert type(Quantity.from_dict(dict(amount=Decimal(1), count=1)).count) is int
+
+
+def test_decimals_of_other_exponents_are_not_merged():
+    tenths = Quantity.from_dict(dict(amount=Decimal("1.0")))
+    hundredths = Quantity.from_dict(dict(amount=Decimal("1.00")))
+
+    assert str(tenths.amount) == "1.0"
+    assert str(hundredths.amount) == "1.00"
+    assert Quantity.from_dict(dict(amount=Decimal("1.00"))) is hundredths
+
+
+def test_enum_values_are_keyed_by_member():
+    km = Quantity.from_dict(dict(amount=Decimal(1), unit=Unit.KM))
+
+    assert Quantity.from_dict(dict(amount=Decimal(1), unit=Unit.KM)) is km
+    assert Quantity.from_dict(dict(amount=Decimal(1), unit="km")).unit == Unit.KM
+    assert Quantity.from_dict(dict(amount=Decimal(1), unit=Unit.MILE)).unit == Unit.MILE
+
+
+class Label(str):
+    pass
+
+
+def test_values_which_cannot_be_keyed_are_built_every_time():
+    first = Coordinates.from_dict(dict(latitude=Label("1"), longitude="2"))
+    second = Coordinates.from_dict(dict(latitude=Label("1"), longitude="2"))
+
+    assert first is not second
+    assert first == second
+    assert Coordinates.get_intern_cache().stats()["size"] == 0
+
+
+def test_interning_is_opt_in():
+    assert Name.from_dict(dict(first_name="a")) is not Name.from_dict(dict(first_name="a"))
+    assert GeoLocation.from_dict(dict(latitude="1", longitude="2")) is not GeoLocation.from_dict(
+        dict(latitude="1", longitude="2")
+    )
+
+
+def test_mutable_value_objects_cannot_be_interned():
+    with pytest.raises(InvalidStateException):
+
+        class Counter(MutableValueObject):
+            interned = True
+
+            count = ValueObjectField(int)